@@ -0,0 +1,318 @@
+import csv
+import io
+import os
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import as_completed
+from datetime import datetime
+
+from backend.solution_export import iter_run_csv
+from backend.solve_worker import new_executor
+from backend.status_files import read_json, valid_id, write_json
+from backend.upload_store import UploadRejected
+
+
+# ==================================================
+# CONFIG
+# ==================================================
+WORKBOOK_EXTENSIONS = (".xlsx", ".xls")
+
+# Columns of summary.csv / the "summary" table, in order
+SUMMARY_COLUMNS = [
+    "name", "status", "run_id", "objective_value",
+    "production_cost", "transport_cost", "inventory_cost",
+    "total_production", "total_shipments", "total_trips", "seconds", "message",
+]
+
+_write_lock = threading.Lock()
+
+
+# ==================================================
+# STATE
+# ==================================================
+def _state_path(batch_dir: str, batch_id: str) -> str:
+    return os.path.join(batch_dir, f"{batch_id}.json")
+
+
+def save_state(batch_dir: str, state: dict) -> None:
+    """Write a batch's status file atomically (pollers never see half a file)"""
+    with _write_lock:
+        write_json(_state_path(batch_dir, state["batch_id"]), state)
+
+
+def load_state(batch_dir: str, batch_id: str) -> dict:
+    """A batch's status, or None (status files are shared by all API workers)"""
+    if not valid_id(batch_id):
+        return None
+    return read_json(_state_path(batch_dir, batch_id))
+
+
+def live_inputs(batch_dir: str) -> set:
+    """Input hashes of items of running batches not solved yet: their uploads must not be evicted"""
+    if not os.path.isdir(batch_dir):
+        return set()
+    hashes = set()
+    for name in os.listdir(batch_dir):
+        if not name.endswith(".json"):
+            continue
+        state = read_json(os.path.join(batch_dir, name))
+        if state and state.get("status") == "running":
+            hashes.update(
+                item["input_hash"] for item in state["items"]
+                if item["status"] in ("queued", "running") and item.get("input_hash")
+            )
+    return hashes
+
+
+# ==================================================
+# INTAKE
+# ==================================================
+def collect_workbooks(uploads: list, store, max_items: int) -> list:
+    """
+    One batch item per workbook: plain uploads and every workbook inside
+    uploaded zips.
+
+    Args:
+        uploads (list): (filename, binary file object) pairs
+        store: callable(filename, fileobj) -> (input hash, path); may
+            raise UploadRejected, which marks just that item "rejected"
+        max_items (int): Most workbooks accepted in one batch
+
+    Returns:
+        list: Items {"name", "status", "input_hash", "path", "message"}
+
+    Raises:
+        ValueError: if there are no workbooks, too many, or a bad zip
+    """
+    items = []
+
+    def add(name, fileobj):
+        if len(items) >= max_items:
+            raise ValueError(f"A batch holds at most {max_items} workbooks")
+        item = {"name": name, "status": "queued", "input_hash": None, "path": None, "message": None}
+        try:
+            item["input_hash"], item["path"] = store(name, fileobj)
+        except UploadRejected as e:
+            item.update(status="rejected", message=str(e))
+        items.append(item)
+
+    for filename, fileobj in uploads:
+        if filename.lower().endswith(".zip"):
+            try:
+                archive = zipfile.ZipFile(fileobj)
+            except zipfile.BadZipFile:
+                raise ValueError(f"{filename} is not a valid zip file")
+            with archive:
+                for info in archive.infolist():
+                    base = os.path.basename(info.filename)
+                    if info.is_dir() or base.startswith((".", "~$")) or "__MACOSX" in info.filename:
+                        continue
+                    if base.lower().endswith(WORKBOOK_EXTENSIONS):
+                        with archive.open(info) as member:
+                            add(base, member)
+        else:
+            add(filename, fileobj)
+
+    if not items:
+        raise ValueError("No .xlsx or .xls workbooks in the upload")
+    return items
+
+
+def new_batch(items: list, engine: str) -> dict:
+    return {
+        "batch_id": uuid.uuid4().hex[:16],
+        "engine": engine,
+        "status": "running",
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "items": items,
+        "summary": None,
+    }
+
+
+# ==================================================
+# SOLVE
+# ==================================================
+def _solve_item(path: str, engine: str, admission: dict = None) -> dict:
+    """
+    Pool worker: parse one workbook, admission-check it (if admission
+    holds estimator.admit's limits) and solve it; send back the compact
+    result with the engine used. The workbook is parsed only here.
+    """
+    from backend import estimator
+    from backend.model import SETTINGS, load_workbook, solve_clinker_model
+    from backend.solve_worker import compact_result
+
+    start = time.perf_counter()
+    decision = None
+    try:
+        sheets = load_workbook(path)
+        if admission is not None:
+            decision = estimator.admit(estimator.estimate(sheets, SETTINGS), engine, **admission)
+        if decision is not None and not decision["admitted"]:
+            result = {"success": False, "rejected": True, "message": f"Model too large: {decision['reason']}"}
+        else:
+            engine = decision["engine"] if decision else engine
+            result = solve_clinker_model(sheets, {"ENGINE": engine})
+    except Exception as e:
+        result = {"success": False, "message": f"Runtime error: {str(e)}"}
+    result = compact_result(result)
+    result["engine"] = engine
+    if decision is not None and decision["engine"] != decision["requested"]:
+        result["admission"] = decision
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def summarize(state: dict, seconds: float, workers: int) -> dict:
+    items = state["items"]
+    done = [i for i in items if i["status"] == "success"]
+    return {
+        "items": len(items),
+        "succeeded": len(done),
+        "failed": sum(i["status"] == "failed" for i in items),
+        "rejected": sum(i["status"] == "rejected" for i in items),
+        "total_objective": round(sum(i.get("objective_value") or 0 for i in done), 2),
+        "seconds": round(seconds, 3),
+        "plans_per_minute": round(60 * len(done) / seconds, 2) if seconds > 0 else None,
+        "workers": workers,
+    }
+
+
+def run_batch(batch_dir: str, state: dict, workers: int, on_result,
+              max_tasks: int = None, memory_limit_mb: float = None, admission: dict = None) -> dict:
+    """
+    Solve every queued item over a process pool, saving status as each
+    item finishes. Items are never solved in the calling process.
+
+    Whatever goes wrong (the pool cannot start, a status write fails),
+    the batch still ends: items not yet finished are marked "failed" and
+    the batch "failed", so pollers never wait on it forever.
+
+    Args:
+        batch_dir (str): Where status files live
+        state (dict): Batch from new_batch()
+        workers (int): Pool size (None = one per core)
+        on_result: callable(item, result) -> dict of fields to merge into
+            the item (formats the response, saves the run, ...); the
+            result carries the "engine" it was solved with, "rejected"
+            if admission turned it down and "admission" if rerouted
+        max_tasks (int): Solves per worker before it is replaced
+        memory_limit_mb (float): Address-space cap of each worker
+        admission (dict): estimator.admit limits (memory_budget_mb,
+            max_integers, fallback), checked in the worker on the parsed
+            workbook before it is built; None = no check
+
+    Returns:
+        dict: Final state
+    """
+    queued = [i for i in state["items"] if i["status"] == "queued"]
+    workers = min(workers or os.cpu_count() or 1, len(queued)) or 1
+    start = time.perf_counter()
+
+    try:
+        _solve_queued(batch_dir, state, queued, workers, on_result, max_tasks, memory_limit_mb, admission)
+        state["status"] = "done"
+    except Exception as e:
+        for item in state["items"]:
+            if item["status"] in ("queued", "running"):
+                item.update(status="failed", message=f"Batch error: {str(e)}")
+        state.update(status="failed", message=f"Batch error: {str(e)}")
+
+    for item in state["items"]:
+        item.pop("path", None)
+    state["summary"] = summarize(state, time.perf_counter() - start, workers)
+    save_state(batch_dir, state)
+    return state
+
+
+def _solve_queued(batch_dir: str, state: dict, queued: list, workers: int, on_result,
+                  max_tasks: int, memory_limit_mb: float, admission: dict) -> None:
+    def finish(item, result):
+        try:
+            item.update(on_result(item, result))
+        except Exception as e:
+            item.update(status="failed", message=f"Could not save result: {str(e)}")
+        item.pop("path", None)
+        save_state(batch_dir, state)
+
+    for item in queued:
+        item["status"] = "running"
+    save_state(batch_dir, state)
+    if not queued:
+        return
+
+    with new_executor(workers, max_tasks, memory_limit_mb) as pool:
+        futures = {
+            pool.submit(_solve_item, item["path"], state["engine"], admission): item
+            for item in queued
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"success": False, "message": f"Worker error: {str(e)}", "engine": state["engine"]}
+            finish(futures[future], result)
+
+
+def start_batch(batch_dir: str, state: dict, workers: int, on_result, **pool_options) -> None:
+    """Save the batch and solve it on a background thread (pool_options: see run_batch)"""
+    save_state(batch_dir, state)
+    threading.Thread(
+        target=run_batch, args=(batch_dir, state, workers, on_result), kwargs=pool_options, daemon=True,
+    ).start()
+
+
+# ==================================================
+# RESULTS
+# ==================================================
+def summary_rows(state: dict) -> list:
+    """One row per item with the SUMMARY_COLUMNS"""
+    rows = []
+    for item in state["items"]:
+        costs = item.get("cost_breakdown") or {}
+        totals = item.get("summary") or {}
+        rows.append({
+            "name": item["name"],
+            "status": item["status"],
+            "run_id": item.get("run_id"),
+            "objective_value": item.get("objective_value"),
+            "production_cost": costs.get("production"),
+            "transport_cost": costs.get("transport"),
+            "inventory_cost": costs.get("inventory"),
+            "total_production": totals.get("total_production"),
+            "total_shipments": totals.get("total_shipments"),
+            "total_trips": totals.get("total_trips"),
+            "seconds": item.get("seconds"),
+            "message": item.get("message"),
+        })
+    return rows
+
+
+def write_archive(out, archive_dir: str, state: dict, runs: dict) -> None:
+    """
+    Zip the batch: summary.csv plus one plan CSV per solved workbook,
+    streamed from the run archive.
+
+    Args:
+        out: Binary file object to write the zip to
+        archive_dir (str): Run archive root
+        state (dict): Finished batch
+        runs (dict): History record per run id
+    """
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        text = io.StringIO()
+        writer = csv.DictWriter(text, fieldnames=SUMMARY_COLUMNS)
+        writer.writeheader()
+        writer.writerows(summary_rows(state))
+        archive.writestr("summary.csv", text.getvalue())
+
+        for index, item in enumerate(state["items"], start=1):
+            run = runs.get(item.get("run_id"))
+            if item["status"] != "success" or run is None:
+                continue
+            stem = os.path.splitext(item["name"])[0]
+            with archive.open(f"{index:03d}_{stem}_run{run['id']}.csv", "w") as member:
+                for chunk in iter_run_csv(archive_dir, run):
+                    member.write(chunk)
@@ -1,9 +1,11 @@
 # For configuring solver paths based on environment
 
 import os
-from pyomo.environ import SolverFactory
 
 def get_solver():
+    # Pyomo imported on first use: keeps it off the API's import path
+    from pyomo.environ import SolverFactory
+
     # 1. Look for a manual path set in the terminal (For YOU)
     manual_path = os.getenv("SOLVER_PATH")
     
@@ -22,4 +24,56 @@ BASE_DIR = os.path.dirname(__file__)
 DATA_DIR = os.path.join(BASE_DIR, "data")
 UPLOAD_DIR = os.path.join(BASE_DIR, "uploads")
 
-DEFAULT_EXCEL_PATH = os.path.join(BASE_DIR, "dataset.xlsx")
+# Bundled sample workbook: preloaded at startup for /debug and input_id=default
+DEFAULT_EXCEL_PATH = os.getenv("DEFAULT_EXCEL_PATH", os.path.join(DATA_DIR, "dataset.xlsx"))
+
+# Run history (SQLite, WAL mode — safe to share between uvicorn workers)
+HISTORY_DB_PATH = os.getenv("HISTORY_DB_PATH", os.path.join(BASE_DIR, "runs", "history.db"))
+
+# Days to keep runs; unset or empty = keep forever
+HISTORY_TTL_DAYS = float(os.getenv("HISTORY_TTL_DAYS")) if os.getenv("HISTORY_TTL_DAYS") else None
+
+# Per-run Parquet archive of production / shipments / inventory
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(BASE_DIR, "runs", "archive"))
+
+# Content-addressed upload store (<UPLOAD_DIR>/<sha256>.<ext>)
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", 50 * 1024 * 1024))
+# Total size of stored uploads; least recently used are evicted beyond it
+UPLOAD_BUDGET_BYTES = int(os.getenv("UPLOAD_BUDGET_BYTES", 1024 * 1024 * 1024))
+# Declared uncompressed size an .xlsx may unpack to (zip-bomb guard)
+UPLOAD_MAX_UNCOMPRESSED = int(os.getenv("UPLOAD_MAX_UNCOMPRESSED", 500 * 1024 * 1024))
+
+# Batch optimization: per-batch status files and the solve pool size
+BATCH_DIR = os.getenv("BATCH_DIR", os.path.join(BASE_DIR, "runs", "batches"))
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS")) if os.getenv("BATCH_WORKERS") else None
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", 50))
+
+# Submitted optimizations (POST /jobs): status / result files, solves at
+# once per API process, and how long finished jobs are kept
+JOB_DIR = os.getenv("JOB_DIR", os.path.join(BASE_DIR, "runs", "jobs"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+JOB_TTL_SECONDS = float(os.getenv("JOB_TTL_SECONDS", 24 * 3600))
+
+# Solve engines accepted by /optimize, /jobs and /batch (see model.SETTINGS)
+ENGINES = ("cbc", "network", "hierarchical")
+
+# Admission control (backend/estimator.py): a solve predicted to need
+# more memory or integer variables than this is routed to
+# ADMISSION_FALLBACK if that engine fits, else rejected with 413.
+# Empty ADMISSION_FALLBACK = always reject.
+MAX_MODEL_MEMORY_MB = float(os.getenv("MAX_MODEL_MEMORY_MB", 4096))
+MAX_INTEGER_VARS = int(os.getenv("MAX_INTEGER_VARS", 100_000))
+ADMISSION_FALLBACK = os.getenv("ADMISSION_FALLBACK", "hierarchical") or None
+
+# Solve worker processes (backend/solve_worker.py): solves at once, solves
+# before a worker is replaced, its address-space cap (CBC included) and
+# the RSS after a solve beyond which it is retired early.
+# SOLVE_WORKERS=0 solves inside the API process.
+SOLVE_WORKERS = int(os.getenv("SOLVE_WORKERS", 2))
+SOLVE_MAX_TASKS_PER_CHILD = int(os.getenv("SOLVE_MAX_TASKS_PER_CHILD", 20))
+SOLVE_MEMORY_LIMIT_MB = float(os.getenv("SOLVE_MEMORY_LIMIT_MB", 8192))
+SOLVE_RECYCLE_RSS_MB = float(os.getenv("SOLVE_RECYCLE_RSS_MB", 1024))
+
+# Background warm-up on startup: import pandas / Pyomo, preload the
+# default workbook and run a one-lane solve so the first request is fast
+WARMUP = os.getenv("WARMUP", "1") != "0"
@@ -0,0 +1,253 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from backend.network_index import intern
+
+
+# ==================================================
+# CONFIG
+# ==================================================
+# BOUND TYPEID → which side of the limit the value sets
+BOUND_TYPES = {"L": "ub", "G": "lb", "E": "eq"}
+
+# VALUE TYPEID "C" = quantity in tons; anything else is not modelled yet
+SUPPORTED_VALUE_TYPES = {"C"}
+
+# Slack when snapping a single-lane limit to whole trips (tons / trip capacity)
+TRIP_TOL = 1e-9
+
+_BLANK_CODES = {"", "nan", "none", "NaN", "None"}
+
+
+# ==================================================
+# HELPERS
+# ==================================================
+def _code_column(series: pd.Series) -> pd.Series:
+    """Strip codes and turn blanks into None (= wildcard)"""
+    codes = series.astype(str).str.strip()
+    return codes.where(~codes.isin(_BLANK_CODES), None)
+
+
+def _arc_periods(inputs: dict) -> pd.DataFrame:
+    """
+    One row per model X variable: its codes (from, to, mode, period) to
+    match sheets on, and its index (arc id, period position)
+    """
+    index = inputs["index"]
+    arcs = pd.DataFrame({
+        "from": index["nodes"][index["arc_from"]],
+        "to": index["nodes"][index["arc_to"]],
+        "mode": index["modes"][index["arc_mode"]],
+        "arc": np.arange(len(index["arc_from"])),
+    })
+    periods = pd.DataFrame({"period": inputs["T"], "k": np.arange(len(inputs["T"]))})
+    return arcs.merge(periods, how="cross")
+
+
+def _limits(sense: pd.Series, values: pd.Series) -> pd.DataFrame:
+    """Translate L/G/E + value into lb/ub columns (NaN = unbounded)"""
+    return pd.DataFrame({
+        "lb": values.where(sense.isin(["lb", "eq"])),
+        "ub": values.where(sense.isin(["ub", "eq"])),
+    })
+
+
+# ==================================================
+# CORE FUNCTION
+# ==================================================
+def compile_constraints(inputs: dict, constraint_df: pd.DataFrame = None,
+                        closing_df: pd.DataFrame = None) -> dict:
+    """
+    Compile IUGUConstraint and IUGUClosingStock rows into bounds and rows.
+
+    Each IUGUConstraint row pins down an IU, a period and optionally a
+    transport mode and destination; blanks are wildcards. Rows that
+    match exactly one X variable become variable bounds; rows that
+    match several (e.g. IU+mode across destinations) become one sparse
+    aggregated row over just those variables. Matching is done with
+    one merge per wildcard pattern, not per constraint, on codes; the
+    results are keyed by model index (arc id / node id, period position).
+
+    When inputs has trip_cap (Trips are integer), single-lane limits are
+    snapped to whole trips, since X is always a multiple of the lane's
+    QUANTITY MULTIPLIER; a limit with no whole number of trips inside it
+    (e.g. E 4500 on a 3000 t lane) would make the model infeasible, so
+    it is skipped and reported in "warnings" instead.
+
+    Args:
+        inputs (dict): Output of model.prepare_inputs (needs T, N, index;
+            trip_cap optional)
+        constraint_df (DataFrame): IUGUConstraint sheet, or None
+        closing_df (DataFrame): IUGUClosingStock sheet, or None
+
+    Returns:
+        dict: {
+            "x_bounds":   {(arc, k): (lb, ub)}   tons, None = free
+            "inv_bounds": {(node, k): (lb, ub)}  tons, None = free
+            "rows":       [{"vars": [(arc, k), ...], "lb", "ub"}]
+            "stats":      counts of bounds, rows and skipped entries
+            "warnings":   messages for limits that were skipped
+        }
+    """
+    compiled = {
+        "x_bounds": {},
+        "inv_bounds": {},
+        "rows": [],
+        "stats": {"x_bounds": 0, "inv_bounds": 0, "rows": 0, "skipped": 0},
+        "warnings": [],
+    }
+
+    if constraint_df is not None and not constraint_df.empty:
+        _compile_lane_constraints(inputs, constraint_df, compiled)
+
+    if closing_df is not None and not closing_df.empty:
+        _compile_closing_stock(inputs, closing_df, compiled)
+
+    return compiled
+
+
+def _compile_lane_constraints(inputs: dict, constraint_df: pd.DataFrame, compiled: dict) -> None:
+    cons = pd.DataFrame({
+        "from": _code_column(constraint_df["IU CODE"]),
+        "mode": _code_column(constraint_df["TRANSPORT CODE"]),
+        "to": _code_column(constraint_df["IUGU CODE"]),
+        "period": constraint_df["TIME PERIOD"],
+        "sense": constraint_df["BOUND TYPEID"].astype(str).str.strip().str.upper().map(BOUND_TYPES),
+        "value_type": constraint_df["VALUE TYPEID"].astype(str).str.strip().str.upper(),
+        "value": pd.to_numeric(constraint_df["Value"], errors="coerce"),
+    })
+    valid = (
+        cons["from"].notna() & cons["sense"].notna() & cons["value"].notna()
+        & cons["value_type"].isin(SUPPORTED_VALUE_TYPES)
+    )
+    compiled["stats"]["skipped"] += int((~valid).sum())
+    cons = cons[valid].reset_index(drop=True)
+    cons["cid"] = cons.index
+    if cons.empty:
+        return
+
+    # Match every constraint to the X variables it covers, one merge
+    # per wildcard pattern (mode given?, destination given?)
+    arc_periods = _arc_periods(inputs)
+    matches = []
+    for (has_mode, has_to), group in cons.groupby([cons["mode"].notna(), cons["to"].notna()]):
+        keys = ["from", "period"] + (["mode"] if has_mode else []) + (["to"] if has_to else [])
+        matches.append(group[keys + ["cid"]].merge(arc_periods, on=keys, how="inner"))
+    matched = pd.concat(matches, ignore_index=True)[["cid", "arc", "k"]]
+
+    sizes = matched.groupby("cid").size()
+    compiled["stats"]["skipped"] += int(len(cons) - len(sizes))
+
+    limits = _limits(cons["sense"], cons["value"])
+    cons = pd.concat([cons, limits], axis=1)
+
+    # Single-variable restrictions → bounds (tightest wins)
+    single = matched[matched["cid"].isin(sizes.index[sizes == 1])].merge(
+        cons[["cid", "lb", "ub"]], on="cid"
+    )
+    if not single.empty:
+        bounds = single.groupby(["arc", "k"]).agg(lb=("lb", "max"), ub=("ub", "min"))
+        trip_cap = inputs.get("trip_cap")
+        for key, (lb, ub) in zip(bounds.index, bounds.itertuples(index=False)):
+            key = tuple(map(int, key))
+            lb = None if pd.isna(lb) else float(lb)
+            ub = None if pd.isna(ub) else float(ub)
+            if trip_cap is not None:
+                lb, ub = _whole_trips(lb, ub, float(trip_cap[key[0]]))
+                if lb is not None and ub is not None and lb > ub:
+                    compiled["stats"]["skipped"] += 1
+                    compiled["warnings"].append(_off_trip_message(inputs, key, trip_cap[key[0]]))
+                    continue
+            compiled["x_bounds"][key] = (lb, ub)
+        compiled["stats"]["x_bounds"] = len(compiled["x_bounds"])
+
+    # Aggregated restrictions → sparse rows over just the matched vars
+    multi = matched[matched["cid"].isin(sizes.index[sizes > 1])]
+    if not multi.empty:
+        members = multi.groupby("cid")[["arc", "k"]].apply(
+            lambda g: [(int(a), int(k)) for a, k in g.itertuples(index=False, name=None)]
+        )
+        row_limits = cons.set_index("cid").loc[members.index, ["lb", "ub"]]
+        for var_keys, (lb, ub) in zip(members.tolist(), row_limits.itertuples(index=False)):
+            compiled["rows"].append({
+                "vars": var_keys,
+                "lb": None if pd.isna(lb) else float(lb),
+                "ub": None if pd.isna(ub) else float(ub),
+            })
+        compiled["stats"]["rows"] = len(compiled["rows"])
+
+
+def _whole_trips(lb, ub, cap):
+    """Tighten a lane's (lb, ub) in tons to whole trips of cap tons"""
+    if cap <= 0:
+        return lb, ub
+    if lb is not None:
+        lb = math.ceil(lb / cap - TRIP_TOL) * cap
+    if ub is not None:
+        ub = math.floor(ub / cap + TRIP_TOL) * cap
+    return lb, ub
+
+
+def _off_trip_message(inputs: dict, key: tuple, cap: float) -> str:
+    index = inputs["index"]
+    arc, k = key
+    lane = (
+        f"{index['nodes'][index['arc_from'][arc]]} -> {index['nodes'][index['arc_to'][arc]]} "
+        f"{index['modes'][index['arc_mode'][arc]]} period {inputs['T'][k]}"
+    )
+    return f"IUGUConstraint on {lane} skipped: no whole number of {cap:g} t trips meets it"
+
+
+def _compile_closing_stock(inputs: dict, closing_df: pd.DataFrame, compiled: dict) -> None:
+    stock = pd.DataFrame({
+        "node": _code_column(closing_df["IUGU CODE"]),
+        "period": closing_df["TIME PERIOD"],
+        "lb": pd.to_numeric(closing_df["MIN CLOSE STOCK"], errors="coerce"),
+        "ub": pd.to_numeric(closing_df["MAX CLOSE STOCK"], errors="coerce"),
+    })
+    stock["node"] = intern(stock["node"], inputs["N"])
+    stock["period"] = intern(stock["period"], inputs["T"])
+    known = (stock["node"] >= 0) & (stock["period"] >= 0)
+    has_limit = stock["lb"].notna() | stock["ub"].notna()
+    compiled["stats"]["skipped"] += int((~known & has_limit).sum())
+    stock = stock[known & has_limit]
+
+    bounds = stock.groupby(["node", "period"]).agg(lb=("lb", "max"), ub=("ub", "min"))
+    for key, (lb, ub) in zip(bounds.index, bounds.itertuples(index=False)):
+        compiled["inv_bounds"][tuple(map(int, key))] = (
+            None if pd.isna(lb) else float(lb),
+            None if pd.isna(ub) else float(ub),
+        )
+    compiled["stats"]["inv_bounds"] = len(bounds)
+
+
+def required_trips(compiled: dict, trip_cap) -> dict:
+    """
+    Trips each lane needs to honour its compiled lower bounds.
+
+    The demand-based TripLimit heuristic knows nothing about contracted
+    minimums, so lanes with a lower bound (alone or inside a row) are
+    allowed at least enough trips to carry it.
+
+    Args:
+        compiled (dict): Output of compile_constraints
+        trip_cap: Tons per trip by arc id
+
+    Returns:
+        dict: {(arc, k): min trips}
+    """
+    need = {}
+    for key, (lb, _) in compiled["x_bounds"].items():
+        cap = trip_cap[key[0]]
+        if lb and cap > 0:
+            need[key] = max(need.get(key, 0), math.ceil(lb / cap))
+    for row in compiled["rows"]:
+        if not row["lb"]:
+            continue
+        for key in row["vars"]:
+            cap = trip_cap[key[0]]
+            if cap > 0:
+                need[key] = max(need.get(key, 0), math.ceil(row["lb"] / cap))
+    return need
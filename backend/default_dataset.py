@@ -0,0 +1,112 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+
+# ==================================================
+# CONFIG
+# ==================================================
+# input_id that solves the bundled default workbook
+DEFAULT_INPUT_ID = "default"
+
+CHUNK_SIZE = 1024 * 1024
+
+# Workbooks kept parsed at once, least recently used dropped first; reading
+# another path (tests, /debug) no longer evicts the default workbook
+MAX_ENTRIES = 4
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ==================================================
+# PRELOADED WORKBOOK
+# ==================================================
+class DatasetCache:
+    """
+    The default workbook (and a few others) parsed once per process,
+    keyed by path.
+
+    Holds every sheet as read (for /debug) and the model's sheets typed
+    by sheet_schema (for default-data runs). Entries are
+    shared, read-only DataFrames, like input_store's. The file is only
+    re-read when its mtime or size changes and its SHA-256 differs too
+    (touching the file does not trigger a parse).
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def get(self, path: str) -> dict:
+        """
+        The parsed workbook at path, parsing it on first use or after it changed.
+
+        Returns:
+            dict: {"path", "sha256", "sheets" (all, as read), "clean"
+                   (model sheets, typed)}
+
+        Raises:
+            FileNotFoundError: if path does not exist
+            ValueError: if a model sheet has a column of the wrong type
+            Exception: whatever the Excel reader raises for a bad workbook
+        """
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        # Held while parsing: concurrent first requests wait for one parse
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                self._entries.move_to_end(path)
+                if entry["signature"] == signature:
+                    return entry
+                sha = file_sha256(path)
+                if sha == entry["sha256"]:
+                    entry["signature"] = signature
+                    return entry
+            else:
+                sha = file_sha256(path)
+
+            import pandas as pd
+            from backend.model import OPTIONAL_SHEETS, SHEETS
+            from backend.sheet_schema import apply_schema
+
+            sheets = pd.read_excel(path, sheet_name=None)
+            model_sheets = SHEETS + [n for n in OPTIONAL_SHEETS if n in sheets]
+            entry = {
+                "path": path,
+                "signature": signature,
+                "sha256": sha,
+                "sheets": sheets,
+                "clean": {name: apply_schema(name, sheets[name].copy()) for name in model_sheets},
+            }
+            self._entries[path] = entry
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.loads += 1
+            return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+cache = DatasetCache()
+
+
+def preload(path: str) -> bool:
+    """Parse the default workbook ahead of the first request; False if it is missing or unreadable"""
+    try:
+        cache.get(path)
+        return True
+    except Exception:
+        return False
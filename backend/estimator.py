@@ -0,0 +1,192 @@
+import math
+import os
+
+
+# ==================================================
+# CONFIG
+# ==================================================
+# Calibrated with benchmarks/bench_estimate.py on synthetic networks of
+# 1k-66k variables (prepare + build in the API process, CBC in its own
+# process); within ~15% of measured peaks on those runs
+MB = 1024 * 1024
+PYTHON_BYTES_PER_VARIABLE = 400
+PYTHON_BYTES_PER_NONZERO = 160
+CBC_BASE_MB = 140
+CBC_BYTES_PER_NONZERO = 870
+BUILD_SECONDS_PER_NONZERO = 1.7e-5
+
+# Network engine: flat arrays per arc-period, no Pyomo model
+NETWORK_BYTES_PER_ARC_PERIOD = 400
+NETWORK_SECONDS_PER_ARC_PERIOD = 2e-6
+
+
+# ==================================================
+# COUNTS
+# ==================================================
+def _codes(series):
+    return series.astype(str).str.strip()
+
+
+def count_inputs(sheets: dict) -> dict:
+    """
+    Sizes the model is driven by, read straight from the sheets (no
+    parameter dicts, no model): nodes, periods, arcs and the rows that
+    become extra constraints.
+    """
+    types = sheets["IUGUType"]
+    plant_type = _codes(types["PLANT TYPE"])
+    codes = _codes(types["IUGU CODE"])
+    ius = set(codes[plant_type == "IU"])
+    nodes = ius | set(codes[plant_type == "GU"])
+
+    demand = sheets["ClinkerDemand"]
+    periods = int(demand["TIME PERIOD"].nunique())
+
+    lanes = sheets["LogisticsIUGU"]
+    src, dst, mode = _codes(lanes["FROM IU CODE"]), _codes(lanes["TO IUGU CODE"]), _codes(lanes["TRANSPORT CODE"])
+    valid = src.isin(ius) & dst.isin(nodes) & (src != dst)
+    arcs = set(zip(src[valid], dst[valid], mode[valid]))
+
+    in_degree = {}
+    for _, j, _ in arcs:
+        in_degree[j] = in_degree.get(j, 0) + 1
+
+    # MinFulfill rows: one per (node, period) with demand, over the node's inbound arcs
+    served = demand[(demand["DEMAND"].fillna(0) > 0) & _codes(demand["IUGU CODE"]).isin(nodes)]
+    served_codes = _codes(served["IUGU CODE"])
+    fulfill_nonzeros = int(sum(in_degree.get(n, 0) + (n in ius) for n in served_codes))
+
+    side = sheets.get("IUGUConstraint")
+    return {
+        "ius": len(ius),
+        "nodes": len(nodes),
+        "periods": periods,
+        "arcs": len(arcs),
+        "fulfill_rows": int(len(served)),
+        "fulfill_nonzeros": fulfill_nonzeros,
+        "side_rows": 0 if side is None else int(len(side)),
+    }
+
+
+def model_size(counts: dict, relax_trips: bool = False) -> dict:
+    """
+    Variables, integers, rows and nonzeros of the full MIP (build_model)
+
+    Side constraints are counted as one row over a lane's periods each,
+    an upper bound: single-variable limits become bounds instead.
+    """
+    I, N, T, A = counts["ius"], counts["nodes"], counts["periods"], counts["arcs"]
+    variables = I * T + 2 * N * T + 2 * A * T          # Prod, Inv, Unmet, X, Trips
+    rows = (
+        I * T                                           # ProdCap
+        + N * T                                         # InvBalance
+        + counts["fulfill_rows"]                        # MinFulfill
+        + 2 * A * T                                     # TripPhysics, TripLimit
+        + counts["side_rows"]
+    )
+    nonzeros = (
+        I * T
+        + 3 * N * T + I * T + 2 * A * T                 # balance: Inv, Inv[t-1], Unmet, Prod, in/out X
+        + counts["fulfill_nonzeros"]
+        + 3 * A * T                                     # X - cap*Trips, Trips <= max
+        + counts["side_rows"] * T
+    )
+    return {
+        "variables": variables,
+        "integers": 0 if relax_trips else A * T,
+        "rows": rows,
+        "nonzeros": nonzeros,
+    }
+
+
+# ==================================================
+# ESTIMATES
+# ==================================================
+def _mip_resources(size: dict) -> dict:
+    python_mb = (size["variables"] * PYTHON_BYTES_PER_VARIABLE + size["nonzeros"] * PYTHON_BYTES_PER_NONZERO) / MB
+    cbc_mb = CBC_BASE_MB + size["nonzeros"] * CBC_BYTES_PER_NONZERO / MB
+    return {
+        "api_memory_mb": round(python_mb, 1),
+        "solver_memory_mb": round(cbc_mb, 1),
+        "peak_memory_mb": round(python_mb + cbc_mb, 1),
+        "build_seconds": round(size["nonzeros"] * BUILD_SECONDS_PER_NONZERO, 2),
+    }
+
+
+def estimate(sheets: dict, settings: dict = None) -> dict:
+    """
+    Predicted model size and memory per engine, before anything is built.
+
+    Args:
+        sheets (dict): Raw sheet DataFrames (see model.SHEETS)
+        settings (dict): RELAX_TRIPS, HIER_CLUSTER_SIZE, HIER_WORKERS
+                         (see model.SETTINGS)
+
+    Returns:
+        dict: {"counts", "engines": {engine: size and resources}}
+    """
+    settings = settings or {}
+    counts = count_inputs(sheets)
+
+    cbc = model_size(counts, settings.get("RELAX_TRIPS", False))
+    engines = {"cbc": {**cbc, **_mip_resources(cbc)}}
+
+    arc_periods = counts["arcs"] * counts["periods"]
+    network_mb = arc_periods * NETWORK_BYTES_PER_ARC_PERIOD / MB
+    engines["network"] = {
+        "variables": arc_periods, "integers": 0, "rows": counts["nodes"] * counts["periods"],
+        "nonzeros": 2 * arc_periods,
+        "api_memory_mb": round(network_mb, 1), "solver_memory_mb": 0.0,
+        "peak_memory_mb": round(network_mb, 1),
+        "build_seconds": round(arc_periods * NETWORK_SECONDS_PER_ARC_PERIOD, 2),
+    }
+
+    # Hierarchical: per-cluster MIPs of about HIER_CLUSTER_SIZE GUs, a few at a time
+    gus = max(counts["nodes"] - counts["ius"], 1)
+    clusters = max(1, math.ceil(gus / settings.get("HIER_CLUSTER_SIZE", 20)))
+    share = 1 / clusters
+    cluster_counts = {
+        **counts,
+        "nodes": counts["ius"] + math.ceil(gus * share),
+        "arcs": math.ceil(counts["arcs"] * share),
+        "fulfill_rows": math.ceil(counts["fulfill_rows"] * share),
+        "fulfill_nonzeros": math.ceil(counts["fulfill_nonzeros"] * share),
+        "side_rows": math.ceil(counts["side_rows"] * share),
+    }
+    cluster = model_size(cluster_counts, settings.get("RELAX_TRIPS", False))
+    at_once = min(clusters, settings.get("HIER_WORKERS") or os.cpu_count() or 1)
+    resources = _mip_resources(cluster)
+    engines["hierarchical"] = {
+        **cluster, "clusters": clusters,
+        **{k: round(v * at_once, 1) for k, v in resources.items() if k.endswith("_mb")},
+        "build_seconds": round(resources["build_seconds"] * clusters, 2),
+    }
+    return {"counts": counts, "engines": engines}
+
+
+def admit(estimates: dict, engine: str, memory_budget_mb: float, max_integers: int,
+          fallback: str = None) -> dict:
+    """
+    Admission decision for solving with engine.
+
+    A request fits when its predicted peak memory is within the budget
+    and its integer count within max_integers. One that does not is
+    routed to fallback if that fits, else rejected.
+
+    Returns:
+        dict: {"admitted", "engine" (to solve with), "requested", "reason"}
+    """
+    def problem(name):
+        e = estimates["engines"][name]
+        if e["peak_memory_mb"] > memory_budget_mb:
+            return f"{name} needs ~{e['peak_memory_mb']:,.0f} MB (budget {memory_budget_mb:,.0f} MB)"
+        if e["integers"] > max_integers:
+            return f"{name} has {e['integers']:,} integer variables (limit {max_integers:,})"
+        return None
+
+    reason = problem(engine)
+    if reason is None:
+        return {"admitted": True, "engine": engine, "requested": engine, "reason": None}
+    if fallback and fallback != engine and problem(fallback) is None:
+        return {"admitted": True, "engine": fallback, "requested": engine, "reason": reason}
+    return {"admitted": False, "engine": None, "requested": engine, "reason": reason}
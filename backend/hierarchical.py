@@ -0,0 +1,480 @@
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from backend.model import prepare_inputs, solve_clinker_model, solve_prepared
+from backend.network_index import arc_lookup, decode_solution, encode_records
+
+
+# ==================================================
+# CONFIG
+# ==================================================
+CLUSTER_PREFIX = "CLUSTER_"
+
+KMEANS_ITERATIONS = 25
+
+# Missing lanes cost this multiple of the dearest real landed cost
+NO_LANE_FACTOR = 2.0
+
+
+# ==================================================
+# CLUSTERING
+# ==================================================
+def cost_profiles(inputs: dict) -> tuple:
+    """
+    Landed cost per ton from every IU to every GU.
+
+    Entry (g, i) is IU i's mean production cost plus its cheapest lane
+    to g per ton; GUs with similar rows are served by the same plants
+    at similar prices, so they can share a representative node.
+
+    Returns:
+        tuple: (GU codes, IU codes, profile matrix of shape (GUs, IUs))
+    """
+    index = inputs["index"]
+    ius = list(inputs["IU"])
+    gus = sorted(set(inputs["N"]) - set(ius))
+    # GU row of each node id (-1 for IUs); IU columns are node ids
+    gu_row = np.full(len(inputs["N"]), -1)
+    node_id = {n: k for k, n in enumerate(inputs["N"])}
+    gu_row[[node_id[g] for g in gus]] = np.arange(len(gus), dtype=int)
+
+    prod = inputs["prod_cost"].mean(axis=1) if len(inputs["T"]) else np.zeros(len(ius))
+
+    lane = np.full((len(gus), len(ius)), np.inf)
+    cap = inputs["trip_cap"]
+    to_gu = (gu_row[index["arc_to"]] >= 0) & (cap > 0)
+    np.minimum.at(
+        lane,
+        (gu_row[index["arc_to"][to_gu]], index["arc_from"][to_gu]),
+        inputs["trip_cost"][to_gu] / cap[to_gu],
+    )
+
+    profile = lane + prod
+    finite = profile[np.isfinite(profile)]
+    worst = NO_LANE_FACTOR * (finite.max() if finite.size else 1.0)
+    return gus, ius, np.where(np.isfinite(profile), profile, worst)
+
+
+def kmeans(points: np.ndarray, k: int, seed: int = 0) -> np.ndarray:
+    """Plain k-means with k-means++ seeding; returns a label per row"""
+    n = len(points)
+    k = max(1, min(k, n))
+    rng = np.random.default_rng(seed)
+
+    centers = [points[rng.integers(n)]]
+    for _ in range(1, k):
+        d2 = ((points[:, None, :] - np.array(centers)[None]) ** 2).sum(-1).min(1)
+        if d2.sum() == 0:
+            break
+        centers.append(points[rng.choice(n, p=d2 / d2.sum())])
+    centers = np.array(centers)
+
+    labels = np.zeros(n, dtype=np.int64)
+    for iteration in range(KMEANS_ITERATIONS):
+        d2 = ((points[:, None, :] - centers[None]) ** 2).sum(-1)
+        new = d2.argmin(1)
+        if iteration > 0 and np.array_equal(new, labels):
+            break
+        labels = new
+        for c in range(len(centers)):
+            members = points[labels == c]
+            if len(members):
+                centers[c] = members.mean(0)
+
+    # Renumber so cluster ids are dense
+    _, labels = np.unique(labels, return_inverse=True)
+    return labels
+
+
+def cluster_gus(inputs: dict, settings: dict) -> dict:
+    """
+    Group GUs by landed-cost profile.
+
+    Returns:
+        dict: {GU code: cluster code}
+    """
+    gus, _, profile = cost_profiles(inputs)
+    if not gus:
+        return {}
+    k = math.ceil(len(gus) / settings["HIER_CLUSTER_SIZE"])
+    labels = kmeans(profile, k)
+    return {g: f"{CLUSTER_PREFIX}{label + 1:03d}" for g, label in zip(gus, labels)}
+
+
+# ==================================================
+# AGGREGATED MODEL
+# ==================================================
+def _weighted_pct(group: pd.DataFrame) -> float:
+    total = group["DEMAND"].sum()
+    if total <= 0:
+        return 0.0
+    return float((group["DEMAND"] * group["MIN FULFILLMENT (%)"].fillna(0)).sum() / total)
+
+
+def _clean(df: pd.DataFrame, columns) -> pd.DataFrame:
+    df = df.copy()
+    for c in columns:
+        df[c] = df[c].astype(str).str.strip()
+    return df
+
+
+def widen_representative_lanes(agg_inputs: dict, inputs: dict, clusters: dict) -> None:
+    """
+    Let each representative lane carry what its member lanes can.
+
+    The demand-based TripLimit heuristic spreads a cluster's demand over
+    its representative lanes only, which is tighter than the sum over
+    the members; replace it with the members' combined trip capacity.
+    """
+    index, agg_index = inputs["index"], agg_inputs["index"]
+    cluster = pd.Series(index["nodes"][index["arc_to"]]).map(clusters)
+    member = cluster.notna().to_numpy()
+    # Member lanes' trip capacity per (IU, cluster, mode) and period
+    caps = pd.DataFrame(
+        inputs["trip_cap"][member, None] * inputs["max_trips"][member], columns=inputs["T"],
+    ).groupby([
+        index["nodes"][index["arc_from"][member]],
+        cluster[member].to_numpy(),
+        index["modes"][index["arc_mode"][member]],
+    ]).sum()
+
+    rep = caps.reindex(pd.MultiIndex.from_arrays([
+        agg_index["nodes"][agg_index["arc_from"]],
+        agg_index["nodes"][agg_index["arc_to"]],
+        agg_index["modes"][agg_index["arc_mode"]],
+    ]), columns=agg_inputs["T"]).to_numpy()
+    rep_cap = agg_inputs["trip_cap"][:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        need = np.where(np.isfinite(rep) & (rep_cap > 0), np.ceil(rep / rep_cap), 0)
+    agg_inputs["max_trips"] = np.maximum(agg_inputs["max_trips"], need.astype(np.int64))
+
+
+def aggregate_sheets(sheets: dict, clusters: dict) -> dict:
+    """
+    Replace every GU by its cluster node.
+
+    Cluster demand and opening stock are member sums; MIN FULFILLMENT
+    is demand-weighted so the aggregated requirement equals the sum of
+    member requirements. Representative lanes average the freight and
+    handling costs of member lanes per (IU, mode). GU closing stock
+    limits are summed; GU-specific IUGUConstraint rows are left to the
+    per-cluster subproblems.
+    """
+    def to_cluster(codes):
+        return codes.map(lambda c: clusters.get(c, c))
+
+    demand = _clean(sheets["ClinkerDemand"], ["IUGU CODE"])
+    demand["IUGU CODE"] = to_cluster(demand["IUGU CODE"])
+    if "MIN FULFILLMENT (%)" not in demand:
+        demand["MIN FULFILLMENT (%)"] = np.nan
+    grouped = demand.groupby(["IUGU CODE", "TIME PERIOD"])
+    agg_demand = grouped["DEMAND"].sum().to_frame()
+    agg_demand["MIN FULFILLMENT (%)"] = grouped[["DEMAND", "MIN FULFILLMENT (%)"]].apply(_weighted_pct)
+    agg_demand = agg_demand.reset_index()
+
+    logistics = _clean(sheets["LogisticsIUGU"], ["FROM IU CODE", "TO IUGU CODE", "TRANSPORT CODE"])
+    logistics["TO IUGU CODE"] = to_cluster(logistics["TO IUGU CODE"])
+    keys = ["FROM IU CODE", "TO IUGU CODE", "TRANSPORT CODE", "TIME PERIOD"]
+    rules = {
+        "FREIGHT COST": "mean",
+        "HANDLING COST": "mean",
+        "QUANTITY MULTIPLIER": "max",
+    }
+    if "LEAD TIME" in logistics:
+        rules["LEAD TIME"] = "median"
+    agg_logistics = logistics.groupby(keys, as_index=False).agg(rules)
+    if "LEAD TIME" in agg_logistics:
+        agg_logistics["LEAD TIME"] = agg_logistics["LEAD TIME"].round()
+
+    opening = _clean(sheets["IUGUOpeningStock"], ["IUGU CODE"])
+    opening["IUGU CODE"] = to_cluster(opening["IUGU CODE"])
+    agg_opening = opening.groupby("IUGU CODE", as_index=False)["OPENING STOCK"].sum()
+
+    types = _clean(sheets["IUGUType"], ["IUGU CODE", "PLANT TYPE"])
+    types["IUGU CODE"] = to_cluster(types["IUGU CODE"])
+    agg_types = types.drop_duplicates("IUGU CODE")[["IUGU CODE", "PLANT TYPE"]]
+
+    agg = {
+        **sheets,
+        "ClinkerDemand": agg_demand,
+        "LogisticsIUGU": agg_logistics,
+        "IUGUOpeningStock": agg_opening,
+        "IUGUType": agg_types,
+    }
+
+    if "IUGUConstraint" in sheets:
+        cons = sheets["IUGUConstraint"]
+        codes = cons["IUGU CODE"].astype(str).str.strip()
+        agg["IUGUConstraint"] = cons[~codes.isin(list(clusters))]
+
+    if "IUGUClosingStock" in sheets:
+        closing = _clean(sheets["IUGUClosingStock"], ["IUGU CODE"])
+        closing["IUGU CODE"] = to_cluster(closing["IUGU CODE"])
+        agg["IUGUClosingStock"] = closing.groupby(["IUGU CODE", "TIME PERIOD"], as_index=False).agg({
+            "MIN CLOSE STOCK": lambda s: s.sum(min_count=1),
+            "MAX CLOSE STOCK": lambda s: s.sum(skipna=False),
+        })
+
+    return agg
+
+
+# ==================================================
+# PER-CLUSTER SUBPROBLEMS
+# ==================================================
+def cluster_sheets(sheets: dict, members: list, allocation: pd.DataFrame) -> dict:
+    """
+    Sheets for one cluster: its GUs plus the IUs that serve them.
+
+    Each IU becomes a free source capped at what the aggregated plan
+    sent to the cluster in each period (production is already paid for
+    upstream), so the subproblem only decides which member gets what.
+    """
+    members = set(members)
+    logistics = _clean(sheets["LogisticsIUGU"], ["FROM IU CODE", "TO IUGU CODE", "TRANSPORT CODE"])
+    logistics = logistics[logistics["TO IUGU CODE"].isin(members)]
+    ius = sorted(set(logistics["FROM IU CODE"]))
+
+    demand = _clean(sheets["ClinkerDemand"], ["IUGU CODE"])
+    demand = demand[demand["IUGU CODE"].isin(members)]
+    periods = sorted(demand["TIME PERIOD"].unique())
+
+    grid = pd.MultiIndex.from_product([ius, periods], names=["IU CODE", "TIME PERIOD"])
+    capacity = (
+        allocation.set_index(["IU CODE", "TIME PERIOD"])["CAPACITY"]
+        .reindex(grid, fill_value=0.0)
+        .reset_index()
+    )
+    prod_cost = capacity[["IU CODE", "TIME PERIOD"]].assign(**{"PRODUCTION COST": 0.0})
+
+    opening = _clean(sheets["IUGUOpeningStock"], ["IUGU CODE"])
+    opening = opening[opening["IUGU CODE"].isin(members)]
+
+    types = pd.DataFrame({
+        "IUGU CODE": ius + sorted(members),
+        "PLANT TYPE": ["IU"] * len(ius) + ["GU"] * len(members),
+    })
+
+    sub = {
+        "ClinkerDemand": demand,
+        "ClinkerCapacity": capacity,
+        "ProductionCost": prod_cost,
+        "LogisticsIUGU": logistics,
+        "IUGUOpeningStock": opening,
+        "IUGUType": types,
+    }
+    if "IUGUConstraint" in sheets:
+        cons = sheets["IUGUConstraint"]
+        codes = cons["IUGU CODE"].astype(str).str.strip()
+        sub["IUGUConstraint"] = cons[codes.isin(members)]
+    if "IUGUClosingStock" in sheets:
+        closing = _clean(sheets["IUGUClosingStock"], ["IUGU CODE"])
+        sub["IUGUClosingStock"] = closing[closing["IUGU CODE"].isin(members)]
+    return sub
+
+
+def _solve_subproblem(sheets: dict, settings: dict) -> dict:
+    """Pool worker: solve one cluster and drop the (unpicklable) model"""
+    result = solve_clinker_model(sheets, settings)
+    result.pop("model", None)
+    return result
+
+
+# ==================================================
+# ENTRY POINT
+# ==================================================
+def solve_hierarchical(sheets: dict, inputs: dict, settings: dict, scaling: dict) -> dict:
+    """
+    Aggregate GUs into clusters, solve the small aggregated LP, then
+    split each cluster's supply among its GUs in parallel MIPs.
+
+    All stages use the full model's unmet penalty. Costs are recomputed
+    on the original data from the assembled plan, so objective_value is
+    directly comparable with the full model (it is an upper bound).
+
+    Args:
+        sheets (dict): Original sheet DataFrames
+        inputs (dict): model.prepare_inputs(sheets) for the full model
+        settings (dict): Model settings (ENGINE is ignored by the stages)
+        scaling (dict): Full-model scaling (for the unmet penalty)
+
+    Returns:
+        dict: Same shape as model.solve_clinker_model, plus "hierarchy"
+    """
+    stage_settings = {
+        **settings,
+        "ENGINE": "cbc",
+        "AUTO_UNMET_PENALTY": False,
+        "UNMET_PENALTY": scaling["unmet_penalty"],
+    }
+
+    # ------------------------------
+    # AGGREGATE
+    # ------------------------------
+    start_time = time.perf_counter()
+    clusters = cluster_gus(inputs, settings)
+    agg_inputs = prepare_inputs(aggregate_sheets(sheets, clusters), stage_settings)
+    widen_representative_lanes(agg_inputs, inputs, clusters)
+    # Trips only need to be whole per lane, which the subproblems enforce;
+    # the aggregated allocation is an LP
+    agg = solve_prepared(agg_inputs, {**stage_settings, "RELAX_TRIPS": True})
+    aggregate_time = time.perf_counter() - start_time
+    if not agg.get("success"):
+        return {
+            "success": False,
+            "message": f"Aggregated model failed: {agg.get('message')}",
+            "model": None,
+        }
+
+    agg_model = agg["model"]
+    cluster_codes = set(clusters.values())
+    iu_unmet = sum(
+        agg_model.Unmet[n, t].value or 0.0
+        for n in agg_model.N if agg_inputs["N"][n] not in cluster_codes for t in agg_model.T
+    ) * agg["scaling"]["quantity"]
+
+    # Stages are indexed differently: the plan is stitched on codes
+    agg_solution = decode_solution(agg["solution"])
+    shipments = pd.DataFrame(
+        agg_solution["shipments"], columns=["from", "to", "mode", "period", "quantity", "trips"]
+    )
+    shipments["period"] = shipments["period"].astype(type(inputs["T"][0]))
+    to_cluster = shipments["to"].isin(cluster_codes)
+
+    # ------------------------------
+    # DISAGGREGATE
+    # ------------------------------
+    start_time = time.perf_counter()
+    members = {}
+    for gu, code in clusters.items():
+        members.setdefault(code, []).append(gu)
+
+    jobs = {}
+    for code, gus in sorted(members.items()):
+        allocation = (
+            shipments[to_cluster & (shipments["to"] == code)]
+            .groupby(["from", "period"], as_index=False)["quantity"].sum()
+            .rename(columns={"from": "IU CODE", "period": "TIME PERIOD", "quantity": "CAPACITY"})
+        )
+        # Whole tons: fractional caps from the LP make the integer trip
+        # combinations needlessly hard for CBC
+        allocation["CAPACITY"] = np.floor(allocation["CAPACITY"] + 1e-6)
+        jobs[code] = (cluster_sheets(sheets, gus, allocation), allocation)
+
+    workers = settings["HIER_WORKERS"] or os.cpu_count() or 1
+    workers = min(workers, len(jobs)) or 1
+    if workers == 1:
+        results = {code: _solve_subproblem(sub, stage_settings) for code, (sub, _) in jobs.items()}
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {code: pool.submit(_solve_subproblem, sub, stage_settings)
+                       for code, (sub, _) in jobs.items()}
+            results = {code: future.result() for code, future in futures.items()}
+    disaggregate_time = time.perf_counter() - start_time
+
+    failed = [code for code, r in results.items() if not r.get("success")]
+    if failed:
+        return {
+            "success": False,
+            "message": f"Cluster subproblems failed: {', '.join(failed)}",
+            "model": None,
+        }
+
+    # ------------------------------
+    # ASSEMBLE PLAN
+    # ------------------------------
+    arc_of = arc_lookup(inputs["index"])
+    production = agg_solution["production"]
+    plan_shipments = []
+    for s in agg_solution["shipments"]:
+        if s["to"] not in cluster_codes:
+            cap = inputs["trip_cap"][arc_of[(s["from"], s["to"], s["mode"])]]
+            plan_shipments.append({**s, "trips": math.ceil(s["quantity"] / cap - 1e-9)})
+    inventory = {}
+    for rec in agg_solution["inventory"]:
+        if rec["node"] not in cluster_codes:
+            inventory[(rec["node"], rec["period"])] = rec["quantity"]
+
+    # Allocation a cluster did not ship is surplus at the IU
+    T = [str(t) for t in inputs["T"]]
+    leftover = {}
+    unmet = iu_unmet
+    for code, result in results.items():
+        solution = decode_solution(result["solution"])
+        unmet += result["unmet_demand"]
+        plan_shipments.extend(solution["shipments"])
+        for rec in solution["inventory"]:
+            if rec["node"] in clusters:
+                key = (rec["node"], rec["period"])
+                inventory[key] = inventory.get(key, 0.0) + rec["quantity"]
+
+        sent = {}
+        for s in solution["shipments"]:
+            sent[(s["from"], s["period"])] = sent.get((s["from"], s["period"]), 0.0) + s["quantity"]
+        for iu, t, qty in jobs[code][1].itertuples(index=False):
+            key = (iu, str(t))
+            leftover[key] = leftover.get(key, 0.0) + qty - sent.get(key, 0.0)
+
+    # Produce less where the surplus is never drawn down; carry the rest
+    produced = {(p["node"], p["period"]): p["quantity"] for p in production}
+    for iu in {iu for iu, _ in leftover}:
+        carried = np.cumsum([leftover.get((iu, t), 0.0) for t in T])
+        for k, t in enumerate(T):
+            cut = min(produced.get((iu, t), 0.0), carried[k:].min())
+            if cut > 0:
+                produced[(iu, t)] -= cut
+                carried[k:] -= cut
+        for k, t in enumerate(T):
+            if carried[k] > 0.01:
+                inventory[(iu, t)] = inventory.get((iu, t), 0.0) + carried[k]
+    production = [
+        {"node": n, "period": t, "quantity": round(q, 2)}
+        for (n, t), q in produced.items() if q > 0.01
+    ]
+
+    inventory_records = [
+        {"node": n, "period": t, "quantity": round(q, 2)}
+        for (n, t), q in sorted(inventory.items()) if q > 0.01
+    ]
+
+    # Cost the assembled plan on the original data
+    solution = encode_records(inputs["index"], production, plan_shipments, inventory_records)
+    plan = solution["production"]
+    production_cost = (inputs["prod_cost"][plan["node"], plan["period"]] * plan["quantity"]).sum()
+    lane_of = [arc_of.get((s["from"], s["to"], s["mode"]), -1) for s in plan_shipments]
+    transport_cost = sum(
+        inputs["trip_cost"][a] * s["trips"] for a, s in zip(lane_of, plan_shipments) if a >= 0
+    )
+    inventory_cost = settings["HOLDING_COST"] * sum(r["quantity"] for r in inventory_records)
+    objective = production_cost + transport_cost + inventory_cost + scaling["unmet_penalty"] * unmet
+
+    sizes = [len(g) for g in members.values()]
+    return {
+        "success": True,
+        "message": "Hierarchical optimization completed",
+        "objective_value": float(objective),
+        "cost_breakdown": {
+            "production": round(float(production_cost), 2),
+            "transport": round(float(transport_cost), 2),
+            "inventory": round(float(inventory_cost), 2),
+        },
+        "unmet_demand": round(float(unmet), 2),
+        "solver": "CBC (hierarchical)",
+        "solution": solution,
+        "hierarchy": {
+            "clusters": len(members),
+            "cluster_size": {"min": min(sizes, default=0), "max": max(sizes, default=0)},
+            "workers": workers,
+            "aggregate_objective": agg["objective_value"],
+        },
+        "scaling": scaling,
+        "timings": {
+            "aggregate": round(aggregate_time, 4),
+            "disaggregate": round(disaggregate_time, 4),
+        },
+        "model": None,
+    }
@@ -0,0 +1,250 @@
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+
+# ==================================================
+# CONFIG
+# ==================================================
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Seconds a writer waits for another worker's transaction to finish
+BUSY_TIMEOUT = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id               INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp        TEXT NOT NULL,
+    filename         TEXT,
+    status           TEXT,
+    objective_value  REAL,
+    cost_production  REAL,
+    cost_transport   REAL,
+    cost_inventory   REAL,
+    total_production REAL,
+    total_shipments  REAL,
+    total_trips      REAL,
+    input_sha256     TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_timestamp ON runs (timestamp);
+CREATE INDEX IF NOT EXISTS idx_runs_filename ON runs (filename);
+CREATE INDEX IF NOT EXISTS idx_runs_status ON runs (status);
+"""
+
+# Columns added after the first release, created on older databases
+_MIGRATIONS = {
+    "input_sha256": "ALTER TABLE runs ADD COLUMN input_sha256 TEXT",
+}
+
+_COLUMNS = [
+    "timestamp", "filename", "status", "objective_value",
+    "cost_production", "cost_transport", "cost_inventory",
+    "total_production", "total_shipments", "total_trips", "input_sha256",
+]
+
+# Paths whose schema has been created in this process
+_initialized = set()
+
+
+# ==================================================
+# CONNECTION
+# ==================================================
+@contextmanager
+def _connect(db_path: str):
+    """
+    One short-lived connection per call.
+
+    WAL lets readers run alongside the single writer, and busy_timeout
+    makes concurrent writers (threads or uvicorn workers) queue instead
+    of failing with "database is locked".
+    """
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT)
+    conn.row_factory = sqlite3.Row
+    try:
+        if db_path not in _initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            existing = {row["name"] for row in conn.execute("PRAGMA table_info(runs)")}
+            for column, statement in _MIGRATIONS.items():
+                if column not in existing:
+                    conn.execute(statement)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_input ON runs (input_sha256)")
+            _initialized.add(db_path)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+# ==================================================
+# WRITE
+# ==================================================
+def _flatten(run: dict) -> tuple:
+    costs = run.get("cost_breakdown") or {}
+    summary = run.get("summary") or {}
+    return (
+        run.get("timestamp") or datetime.now().strftime(TIMESTAMP_FORMAT),
+        run.get("filename"),
+        run.get("status", "unknown"),
+        run.get("objective_value"),
+        costs.get("production", 0),
+        costs.get("transport", 0),
+        costs.get("inventory", 0),
+        summary.get("total_production", 0),
+        summary.get("total_shipments", 0),
+        summary.get("total_trips", 0),
+        run.get("input_hash"),
+    )
+
+
+def save_run(db_path: str, run: dict, ttl_days: float = None) -> int:
+    """
+    Insert one run record and drop runs older than ttl_days.
+
+    Args:
+        db_path (str): SQLite file
+        run (dict): Record in the /history shape (timestamp, filename,
+            input_hash, status, objective_value, cost_breakdown, summary)
+        ttl_days (float): Retention in days, None = keep forever
+
+    Returns:
+        int: Id of the new run
+    """
+    placeholders = ", ".join("?" * len(_COLUMNS))
+    with _connect(db_path) as conn:
+        cursor = conn.execute(
+            f"INSERT INTO runs ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+            _flatten(run),
+        )
+        run_id = cursor.lastrowid
+    if ttl_days is not None:
+        expire_runs(db_path, ttl_days)
+    return run_id
+
+
+def expire_runs(db_path: str, ttl_days: float) -> list:
+    """
+    Delete runs older than ttl_days.
+
+    Returns:
+        list: Ids of the deleted runs (so callers can drop their data)
+    """
+    cutoff = (datetime.now() - timedelta(days=ttl_days)).strftime(TIMESTAMP_FORMAT)
+    with _connect(db_path) as conn:
+        ids = [row[0] for row in conn.execute("SELECT id FROM runs WHERE timestamp < ?", (cutoff,))]
+        conn.execute("DELETE FROM runs WHERE timestamp < ?", (cutoff,))
+    return ids
+
+
+def import_legacy_history(db_path: str, json_path: str) -> int:
+    """
+    Copy runs from the old history.json into an empty store (once).
+
+    Returns:
+        int: Number of runs imported
+    """
+    if not os.path.exists(json_path):
+        return 0
+    with _connect(db_path) as conn:
+        if conn.execute("SELECT 1 FROM runs LIMIT 1").fetchone():
+            return 0
+        try:
+            with open(json_path, "r") as f:
+                legacy = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return 0
+        # history.json is newest first; insert oldest first so ids follow time
+        placeholders = ", ".join("?" * len(_COLUMNS))
+        conn.executemany(
+            f"INSERT INTO runs ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+            [_flatten(run) for run in reversed(legacy)],
+        )
+        return len(legacy)
+
+
+# ==================================================
+# READ
+# ==================================================
+def _record(row: sqlite3.Row) -> dict:
+    return {
+        "id": row["id"],
+        "timestamp": row["timestamp"],
+        "filename": row["filename"],
+        "input_hash": row["input_sha256"],
+        "status": row["status"],
+        "objective_value": row["objective_value"],
+        "cost_breakdown": {
+            "production": row["cost_production"],
+            "transport": row["cost_transport"],
+            "inventory": row["cost_inventory"],
+        },
+        "summary": {
+            "total_production": row["total_production"],
+            "total_shipments": row["total_shipments"],
+            "total_trips": row["total_trips"],
+        },
+    }
+
+
+def version(db_path: str) -> tuple:
+    """
+    (highest id ever assigned, run count): changes whenever a run is
+    added or expires, since AUTOINCREMENT never reuses ids. Used to
+    validate cached /history pages.
+    """
+    with _connect(db_path) as conn:
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'runs'").fetchone()
+        count = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+    return (row[0] if row else 0), count
+
+
+def get_run(db_path: str, run_id: int) -> dict:
+    """One run record by id, or None"""
+    with _connect(db_path) as conn:
+        row = conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+    return _record(row) if row else None
+
+
+def list_runs(db_path: str, limit: int = 20, offset: int = 0, filename: str = None,
+              status: str = None, since: str = None, until: str = None,
+              input_hash: str = None) -> tuple:
+    """
+    Page through runs, newest first.
+
+    Filters are exact matches on filename / status / input hash and an inclusive
+    timestamp range ("YYYY-MM-DD" or "YYYY-MM-DD HH:MM:SS"); each is
+    served by its index.
+
+    Returns:
+        tuple: (list of run records, total matching runs)
+    """
+    clauses, params = [], []
+    if filename is not None:
+        clauses.append("filename = ?")
+        params.append(filename)
+    if status is not None:
+        clauses.append("status = ?")
+        params.append(status)
+    if input_hash is not None:
+        clauses.append("input_sha256 = ?")
+        params.append(input_hash)
+    if since is not None:
+        clauses.append("timestamp >= ?")
+        params.append(since)
+    if until is not None:
+        # A bare date covers the whole day
+        clauses.append("timestamp <= ?")
+        params.append(until if len(until) > 10 else until + " 23:59:59")
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    with _connect(db_path) as conn:
+        total = conn.execute(f"SELECT COUNT(*) FROM runs {where}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT * FROM runs {where} ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        ).fetchall()
+    return [_record(row) for row in rows], total
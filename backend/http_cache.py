@@ -0,0 +1,44 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+# ==================================================
+# CONFIG
+# ==================================================
+# Clients may keep responses but must revalidate them (If-None-Match)
+CACHE_CONTROL = "no-cache"
+
+
+# ==================================================
+# VALIDATORS
+# ==================================================
+def etag(*parts) -> str:
+    """
+    Strong ETag from the values that determine a response (history
+    version or run id, plus the query parameters).
+    """
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def matches(if_none_match: str, tag: str) -> bool:
+    """Whether an If-None-Match header value covers tag ("*" or a listed tag)"""
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    # Weak comparison is what If-None-Match uses: ignore a W/ prefix
+    return "*" in candidates or tag in [c[2:] if c.startswith("W/") else c for c in candidates]
+
+
+def validators(tag: str) -> dict:
+    """Headers to send with a tagged 200 response"""
+    return {"ETag": tag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(request: Request, tag: str) -> Optional[Response]:
+    """A bodiless 304 if the client already holds this version, else None"""
+    if matches(request.headers.get("if-none-match"), tag):
+        return Response(status_code=304, headers=validators(tag))
+    return None
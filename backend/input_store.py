@@ -0,0 +1,103 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+# ==================================================
+# CONFIG
+# ==================================================
+# Parsed workbooks kept in memory per process (least recently used dropped)
+MAX_ENTRIES = 8
+
+# Sheet columns a scenario scales
+DEMAND_COLUMN = ("ClinkerDemand", "DEMAND")
+FREIGHT_COLUMN = ("LogisticsIUGU", "FREIGHT COST")
+
+
+# ==================================================
+# PARSED INPUT CACHE
+# ==================================================
+class InputCache:
+    """
+    Parsed workbooks keyed by input id (the upload's SHA-256).
+
+    Entries are shared, read-only DataFrames: the model copies what it
+    changes (prepare_inputs) and scenarios copy the sheets they scale.
+    A miss re-parses the stored upload, so every worker process can
+    serve every input id.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, input_id: str, path: str = None, filename: str = None) -> tuple:
+        """
+        Parsed input, parsing path on a miss.
+
+        Returns:
+            tuple: ({"sheets", "filename"}, True if served from memory);
+                   the entry is None on a miss without a path
+
+        Raises:
+            Exception: whatever the Excel reader raises for a bad workbook
+        """
+        with self._lock:
+            if input_id in self._entries:
+                self._entries.move_to_end(input_id)
+                return self._entries[input_id], True
+        if path is None:
+            return None, False
+
+        from backend.model import load_workbook
+
+        # Re-parsed from the store the original name is gone; use the stored one
+        entry = {"sheets": load_workbook(path), "filename": filename or os.path.basename(path)}
+        with self._lock:
+            self._entries[input_id] = entry
+            self._entries.move_to_end(input_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry, False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+cache = InputCache()
+
+
+# ==================================================
+# SUMMARY / SCENARIOS
+# ==================================================
+def summarize(sheets: dict) -> dict:
+    """Rows and columns per sheet plus the node / period counts the model will see"""
+    types = sheets["IUGUType"]
+    plant_type = types["PLANT TYPE"].astype(str).str.strip()
+    return {
+        "sheets": {
+            name: {"rows": int(len(df)), "columns": [str(c) for c in df.columns]}
+            for name, df in sheets.items()
+        },
+        "num_iu": int((plant_type == "IU").sum()),
+        "num_gu": int((plant_type == "GU").sum()),
+        "num_periods": int(sheets["ClinkerDemand"]["TIME PERIOD"].nunique()),
+        "num_lanes": int(len(sheets["LogisticsIUGU"])),
+    }
+
+
+def apply_scenario(sheets: dict, demand_scale: float = 1.0, freight_scale: float = 1.0) -> dict:
+    """
+    What-if copy of the sheets: demand and freight cost scaled.
+
+    Only the sheets that change are copied; the rest stay shared.
+    """
+    scaled = dict(sheets)
+    for (sheet, column), factor in ((DEMAND_COLUMN, demand_scale), (FREIGHT_COLUMN, freight_scale)):
+        if factor != 1.0:
+            df = sheets[sheet].copy()
+            df[column] = df[column] * factor
+            scaled[sheet] = df
+    return scaled
@@ -0,0 +1,137 @@
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import orjson
+
+from backend.status_files import read_json, valid_id, write_json
+
+
+# ==================================================
+# CONFIG
+# ==================================================
+# queued -> running -> done | failed
+STATES = ("queued", "running", "done", "failed")
+
+_executor = None
+_executor_workers = None
+
+
+# ==================================================
+# STATE
+# ==================================================
+def _state_path(job_dir: str, job_id: str) -> str:
+    return os.path.join(job_dir, f"{job_id}.json")
+
+
+def _result_path(job_dir: str, job_id: str) -> str:
+    return os.path.join(job_dir, f"{job_id}.result.json")
+
+
+def new_job(params: dict) -> dict:
+    return {
+        "job_id": uuid.uuid4().hex[:16],
+        "status": "queued",
+        "params": params,
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "started": None,
+        "finished": None,
+        "message": None,
+        "run_id": None,
+        "objective_value": None,
+    }
+
+
+def load_state(job_dir: str, job_id: str) -> dict:
+    """A job's status, or None (status files are shared by all API workers)"""
+    if not valid_id(job_id):
+        return None
+    return read_json(_state_path(job_dir, job_id))
+
+
+def load_result(job_dir: str, job_id: str) -> dict:
+    """The /optimize-shaped response of a finished job, or None"""
+    if not valid_id(job_id):
+        return None
+    try:
+        with open(_result_path(job_dir, job_id), "rb") as f:
+            return orjson.loads(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def live_inputs(job_dir: str) -> set:
+    """Input hashes of queued or running jobs: their uploads must not be evicted"""
+    if not os.path.isdir(job_dir):
+        return set()
+    hashes = set()
+    for name in os.listdir(job_dir):
+        if not name.endswith(".json") or name.endswith(".result.json"):
+            continue
+        state = read_json(os.path.join(job_dir, name))
+        if state and state.get("status") in ("queued", "running"):
+            hashes.add(state["params"].get("input_hash"))
+    return hashes
+
+
+def prune(job_dir: str, max_age_seconds: float) -> int:
+    """Delete status and result files older than max_age_seconds; returns files removed"""
+    if not os.path.isdir(job_dir):
+        return 0
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for name in os.listdir(job_dir):
+        path = os.path.join(job_dir, name)
+        try:
+            if name.endswith(".json") and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+# ==================================================
+# EXECUTION
+# ==================================================
+def _run(job_dir: str, state: dict, solve) -> None:
+    state.update(status="running", started=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    write_json(_state_path(job_dir, state["job_id"]), state)
+    try:
+        response = solve()
+        if response.get("success"):
+            # Result first: a "done" status always has its result on disk
+            staging = _result_path(job_dir, state["job_id"]) + ".tmp"
+            with open(staging, "wb") as f:
+                f.write(orjson.dumps(response, option=orjson.OPT_SERIALIZE_NUMPY))
+            os.replace(staging, _result_path(job_dir, state["job_id"]))
+            state.update(status="done", run_id=response.get("run_id"),
+                         objective_value=response.get("objective_value"),
+                         message=response.get("message"))
+        else:
+            state.update(status="failed", message=response.get("message", "Unknown error"))
+    except Exception as e:
+        # HTTPException carries its message in .detail
+        state.update(status="failed", message=str(getattr(e, "detail", None) or e))
+    state["finished"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    write_json(_state_path(job_dir, state["job_id"]), state)
+
+
+def submit(job_dir: str, state: dict, solve, workers: int = 2) -> None:
+    """
+    Save a queued job and run solve() on the shared job thread pool.
+
+    Args:
+        job_dir (str): Where status and result files live
+        state (dict): Job from new_job()
+        solve: callable() -> /optimize-shaped response dict; may raise
+        workers (int): Pool size (solves running at once)
+    """
+    global _executor, _executor_workers
+    write_json(_state_path(job_dir, state["job_id"]), state)
+    if _executor is None or _executor_workers != workers:
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="solve-job")
+        _executor_workers = workers
+    _executor.submit(_run, job_dir, state, solve)
@@ -0,0 +1,160 @@
+import time
+
+import numpy as np
+from pyomo.environ import TerminationCondition
+
+
+# ==================================================
+# CONFIG
+# ==================================================
+# Activity may miss a row's limit by this much (model units) before
+# the row is considered violated and added
+VIOLATION_TOL = 1e-6
+
+
+# ==================================================
+# CANDIDATE ROWS
+# ==================================================
+def _family(name, component, keys, entries, lb, ub):
+    """
+    Pack one family of candidate rows into flat arrays.
+
+    entries is a list (one per row) of variable positions in the shared
+    value vector, so row activity for every candidate is one bincount.
+    """
+    row_of = np.repeat(np.arange(len(keys)), [len(e) for e in entries])
+    cols = np.fromiter((c for e in entries for c in e), dtype=np.int64, count=len(row_of))
+    return {
+        "name": name,
+        "component": component,
+        "keys": keys,
+        "entries": entries,
+        "row_of": row_of,
+        "cols": cols,
+        "lb": np.array(lb, dtype=float),
+        "ub": np.array(ub, dtype=float),
+        "active": np.zeros(len(keys), dtype=bool),
+    }
+
+
+def lazy_row_candidates(model, inputs, scaling):
+    """
+    Collect the rows the lazy loop may add: MinFulfill and LaneLimit.
+
+    Returns:
+        tuple: (variables, families) where variables is the list of Pyomo
+               vars whose values feed the violation check
+    """
+    q = scaling["quantity"]
+    variables, position = [], {}
+
+    def pos(var):
+        if id(var) not in position:
+            position[id(var)] = len(variables)
+            variables.append(var)
+        return position[id(var)]
+
+    families = []
+
+    # MinFulfill: same-period receipts (+ own production) ≥ share of demand
+    if hasattr(model, "MinFulfill"):
+        index = inputs["index"]
+        arcs_in = [[] for _ in inputs["N"]]
+        for a, j in enumerate(index["arc_to"].tolist()):
+            arcs_in[j].append(a)
+
+        need = inputs["min_fulfill"] / 100 * inputs["demand"] / q
+        keys, entries, lb = [], [], []
+        for n, t in zip(*np.nonzero((inputs["demand"] != 0) & (need > 0))):
+            n, t = int(n), int(t)
+            cols = [pos(model.X[a, t]) for a in arcs_in[n]]
+            if n < index["n_iu"]:
+                cols.append(pos(model.Prod[n, t]))
+            keys.append((n, t))
+            entries.append(cols)
+            lb.append(need[n, t])
+        families.append(_family("MinFulfill", model.MinFulfill, keys, entries, lb, [np.inf] * len(keys)))
+
+    # LaneLimit: aggregated IUGUConstraint rows
+    if hasattr(model, "LaneLimit"):
+        rows = inputs["compiled"]["rows"]
+        keys = list(range(len(rows)))
+        entries = [[pos(model.X[k]) for k in row["vars"]] for row in rows]
+        lb = [-np.inf if row["lb"] is None else row["lb"] / q for row in rows]
+        ub = [np.inf if row["ub"] is None else row["ub"] / q for row in rows]
+        families.append(_family("LaneLimit", model.LaneLimit, keys, entries, lb, ub))
+
+    return variables, families
+
+
+def _add_row(family, r, variables):
+    lb, ub = family["lb"][r], family["ub"][r]
+    family["component"][family["keys"][r]] = (
+        None if np.isinf(lb) else float(lb),
+        sum(variables[c] for c in family["entries"][r]),
+        None if np.isinf(ub) else float(ub),
+    )
+    family["active"][r] = True
+
+
+# ==================================================
+# CUTTING-PLANE LOOP
+# ==================================================
+def solve_with_lazy_rows(model, inputs, settings, scaling, solver):
+    """
+    Solve without the lazy families, then add only the rows the current
+    plan violates and re-solve (warm-started) until none are violated.
+
+    After LAZY_MAX_ITERATIONS rounds every remaining candidate row is
+    added, so the final plan always satisfies the full model.
+
+    Returns:
+        tuple: (solver results, stats dict with iterations, rows added
+               and the solver seconds of each round)
+    """
+    variables, families = lazy_row_candidates(model, inputs, scaling)
+
+    stats = {
+        "iterations": 0,
+        "candidate_rows": {f["name"]: len(f["keys"]) for f in families},
+        "rows_added": {f["name"]: 0 for f in families},
+        "round_seconds": [],
+    }
+
+    max_iterations = settings["LAZY_MAX_ITERATIONS"]
+    while True:
+        start = time.perf_counter()
+        result = solver.solve(model, tee=False, warmstart=stats["iterations"] > 0)
+        stats["round_seconds"].append(round(time.perf_counter() - start, 3))
+        stats["iterations"] += 1
+        if result.solver.termination_condition != TerminationCondition.optimal:
+            break
+
+        values = np.fromiter((v.value or 0.0 for v in variables), dtype=float, count=len(variables))
+        violated = []
+        for family in families:
+            activity = np.bincount(
+                family["row_of"],
+                weights=values[family["cols"]],
+                minlength=len(family["keys"]),
+            )
+            violated.append(
+                ~family["active"] & (
+                    (activity < family["lb"] - VIOLATION_TOL)
+                    | (activity > family["ub"] + VIOLATION_TOL)
+                )
+            )
+
+        if not any(v.any() for v in violated):
+            break
+
+        # Out of rounds: fall back to the full model for the last solve
+        if stats["iterations"] >= max_iterations:
+            violated = [~family["active"] for family in families]
+
+        for family, rows in zip(families, violated):
+            for r in np.flatnonzero(rows):
+                _add_row(family, r, variables)
+            stats["rows_added"][family["name"]] += int(rows.sum())
+
+    return result, stats
@@ -1,61 +1,131 @@
 import os
-import shutil
-import json
+import tempfile
+from contextlib import asynccontextmanager
 from datetime import datetime
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from typing import List, Optional
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
-from backend.model import run_clinker_optimization
-from backend import config
+# Pandas and Pyomo (backend.model) are imported on first solve or by the
+# startup warm-up, never here: / and /health answer without them
+from backend import (
+    batch, config, default_dataset, estimator, history_store, http_cache, jobs, response_formats, run_diff,
+    solution_archive, solution_export, input_store, solve_worker, upload_store, warmup,
+)
 
 
 # ==================================================
 # HISTORY HELPERS
 # ==================================================
-HISTORY_FILE = os.path.join(os.path.dirname(__file__), "runs", "history.json")
-
-def save_run_to_history(filename: str, response: dict):
-    """Append a completed optimization run to the history JSON file"""
-    os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
+# Pre-SQLite history file; imported into the store once on startup
+LEGACY_HISTORY_FILE = os.path.join(os.path.dirname(__file__), "runs", "history.json")
 
-    # Load existing history
-    history = []
-    if os.path.exists(HISTORY_FILE):
-        try:
-            with open(HISTORY_FILE, "r") as f:
-                history = json.load(f)
-        except (json.JSONDecodeError, IOError):
-            history = []
-
-    # Build the run record
-    summary = response.get("summary", {})
-    cost_breakdown = response.get("cost_breakdown", {})
+def save_run_to_history(filename: str, response: dict, input_hash: str = None):
+    """
+    Record a completed optimization run in the history store and archive
+    its plan; returns the run id
+    """
     run = {
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "filename": filename,
+        "input_hash": input_hash,
         "status": response.get("status", "unknown"),
         "objective_value": response.get("objective_value"),
-        "cost_breakdown": {
-            "production": cost_breakdown.get("production", 0),
-            "transport": cost_breakdown.get("transport", 0),
-            "inventory": cost_breakdown.get("inventory", 0),
-        },
-        "summary": {
-            "total_production": summary.get("total_production", 0),
-            "total_shipments": summary.get("total_shipments", 0),
-            "total_trips": summary.get("total_trips", 0),
+        "cost_breakdown": response.get("cost_breakdown", {}),
+        "summary": response.get("summary", {}),
+    }
+    run_id = history_store.save_run(config.HISTORY_DB_PATH, run)
+    solution_archive.write_run(config.ARCHIVE_DIR, run_id, response)
+
+    if config.HISTORY_TTL_DAYS is not None:
+        for expired in history_store.expire_runs(config.HISTORY_DB_PATH, config.HISTORY_TTL_DAYS):
+            solution_archive.delete_run(config.ARCHIVE_DIR, expired)
+    return run_id
+
+
+# ==================================================
+# RESULT HELPERS
+# ==================================================
+def format_result(result: dict, engine: str = "cbc") -> dict:
+    """
+    Turn a solver result into the /optimize response shape (records,
+    summary, cost breakdown); a failed solve gives the short failure dict
+    """
+    if not result.get("success"):
+        return {
+            "status": "failed",
+            "message": result.get("message", "Unknown error"),
+            "success": False
         }
+
+    # Extract key data from result
+    response = {
+        "status": "success",
+        "success": True,
+        "message": result.get("message", "Optimization completed"),
+        "objective_value": result.get("objective_value"),
+        "solver": result.get("solver", "CBC"),
+        "production": [],
+        "shipments": [],
+        "inventory": []
     }
 
-    # Prepend so newest is first, keep last 20 runs
-    history.insert(0, run)
-    history = history[:20]
+    # The solver works on interned ids (see network_index); codes come back
+    # only here. Quantities are already in tons (see model.extract_solution)
+    solution = result.get("solution")
+    if solution:
+        from backend.network_index import decode_solution
+
+        solution = decode_solution(solution)
+        production = solution["production"]
+        shipments = solution["shipments"]
+        response["production"] = production
+        response["shipments"] = shipments
+        response["inventory"] = solution["inventory"]
+
+        # Summary
+        response["summary"] = {
+            "total_production": sum(p["quantity"] for p in production),
+            "total_shipments": sum(s["quantity"] for s in shipments),
+            "total_trips": sum(s["trips"] for s in shipments),
+            "num_nodes": solution["num_nodes"],
+            "num_periods": solution["num_periods"]
+        }
+
+        # Cost breakdown (computed in model.py from actual solver values)
+        cost_breakdown = result.get("cost_breakdown")
+        if cost_breakdown:
+            response["cost_breakdown"] = cost_breakdown
+
+        # Input limits the model could not honour (see constraints.compile_constraints)
+        if result.get("warnings"):
+            response["warnings"] = result["warnings"]
 
-    with open(HISTORY_FILE, "w") as f:
-        json.dump(history, f, indent=2)
+        # Relaxation engines give a lower bound, not a dispatchable plan
+        if engine == "network":
+            response["lower_bound"] = True
+            # Rows of the full model the relaxation ignored
+            response["relaxed"] = result.get("relaxed")
 
+    return response
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Carry runs over from history.json (best-effort, once)
+    try:
+        history_store.import_legacy_history(config.HISTORY_DB_PATH, LEGACY_HISTORY_FILE)
+    except Exception:
+        pass
+    # Imports, default workbook and solver paged in off the startup path
+    if config.WARMUP:
+        warmup.start(config.DEFAULT_EXCEL_PATH)
+    yield
+    solve_worker.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Enable CORS for frontend connection
 app.add_middleware(
@@ -75,196 +145,728 @@ def home():
     return {"message": "Welcome to the Clinker Optimization API. Use /optimize to run optimization."}
 @app.get("/health")
 def health_check():
-    """Check if backend is running"""
-    return {"status": "ok", "message": "Backend is running"}
+    """Check if backend is running (answers before the solver stack is loaded)"""
+    return {"status": "ok", "message": "Backend is running", "warm": warmup.state["finished"] is not None}
+
+
+# ==================================================
+# INPUT ENDPOINTS
+# ==================================================
+def _live_inputs() -> set:
+    """Uploads queued or running jobs and batches still need (never evicted)"""
+    return jobs.live_inputs(config.JOB_DIR) | batch.live_inputs(config.BATCH_DIR)
+
+
+def _store_upload(file: UploadFile) -> tuple:
+    """Validate and store an uploaded workbook; returns (input hash, path)"""
+    if not file.filename.endswith((".xlsx", ".xls")):
+        raise HTTPException(
+            status_code=400,
+            detail="Only .xlsx or .xls files are supported"
+        )
+    # Saved under its content hash (size-capped, checked as it streams;
+    # identical uploads are stored once)
+    try:
+        return upload_store.store(
+            file.file, config.UPLOAD_DIR, os.path.splitext(file.filename)[1],
+            max_bytes=config.UPLOAD_MAX_BYTES,
+            max_uncompressed=config.UPLOAD_MAX_UNCOMPRESSED,
+            budget_bytes=config.UPLOAD_BUDGET_BYTES,
+            pinned=_live_inputs,
+        )
+    except upload_store.UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+
+def _parsed_input(input_id: str, path: str = None, filename: str = None) -> dict:
+    """
+    Parsed sheets of an input (memory first, then the upload store); 404
+    if unknown. input_id "default" is the preloaded default workbook.
+    """
+    if input_id == default_dataset.DEFAULT_INPUT_ID:
+        try:
+            entry = default_dataset.cache.get(config.DEFAULT_EXCEL_PATH)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Default Excel file not found")
+        return {"sheets": entry["clean"], "filename": os.path.basename(entry["path"]), "input_hash": entry["sha256"]}
+    entry, _ = input_store.cache.get(input_id, filename=filename)
+    if entry is None:
+        path = path or upload_store.path_for(config.UPLOAD_DIR, input_id)
+        if path is None:
+            raise HTTPException(status_code=404, detail=f"Input {input_id} not found; upload it again")
+        entry, _ = input_store.cache.get(input_id, path, filename)
+    return entry
+
+
+@app.post("/inputs")
+def create_input(file: UploadFile = File(...)):
+    """
+    Upload and parse a workbook once; returns its input_id (SHA-256 of
+    the file) and a summary of the parsed sheets.
+
+    Pass the id to /optimize?input_id=... to solve it again (or run
+    scenarios on it) without re-sending or re-parsing the file.
+    """
+    input_id, path = _store_upload(file)
+    try:
+        entry, cached = input_store.cache.get(input_id, path, file.filename)
+        summary = input_store.summarize(entry["sheets"])
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not read workbook: {str(e)}")
+    return {"input_id": input_id, "filename": file.filename, "cached": cached, **summary}
+
+
+@app.get("/inputs/{input_id}")
+def get_input(input_id: str):
+    """Summary of a stored input's sheets"""
+    try:
+        entry = _parsed_input(input_id.lower())
+        summary = input_store.summarize(entry["sheets"])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not read workbook: {str(e)}")
+    return {"input_id": input_id.lower(), "filename": entry["filename"], **summary}
+
+
+@app.get("/inputs/{input_id}/estimate")
+def estimate_input(input_id: str):
+    """
+    Predicted model size (variables, integers, rows, nonzeros), peak
+    memory and build time of each engine for a stored input, with the
+    admission decision /optimize would take for it.
+    """
+    try:
+        entry = _parsed_input(input_id.lower())
+        estimates = _estimate(entry["sheets"])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not read workbook: {str(e)}")
+    return {
+        "input_id": input_id.lower(),
+        **estimates,
+        "limits": {"memory_mb": config.MAX_MODEL_MEMORY_MB, "integers": config.MAX_INTEGER_VARS},
+        "admission": {engine: _admit(estimates, engine) for engine in config.ENGINES},
+    }
+
+
+def _estimate(sheets: dict) -> dict:
+    from backend.model import SETTINGS
+
+    return estimator.estimate(sheets, SETTINGS)
+
+
+def _admit(estimates: dict, engine: str) -> dict:
+    return estimator.admit(
+        estimates, engine, config.MAX_MODEL_MEMORY_MB, config.MAX_INTEGER_VARS, config.ADMISSION_FALLBACK,
+    )
 
 
 # ==================================================
 # OPTIMIZATION ENDPOINT
 # ==================================================
 @app.post("/optimize")
-def optimize(file: UploadFile = File(...)):
+def optimize(
+    request: Request,
+    file: Optional[UploadFile] = File(None),
+    input_id: Optional[str] = None,
+    engine: str = "cbc",
+    demand_scale: float = Query(1.0, gt=0),
+    freight_scale: float = Query(1.0, gt=0),
+    fmt: Optional[str] = Query(None, alias="format"),
+):
     """
     Load Excel file (uploaded) → Run optimization → Return results
     
     Flow:
-    1. Receive uploaded Excel file (required)
+    1. Receive uploaded Excel file, or the input_id of one sent to
+       POST /inputs earlier (no upload, no Excel parse); input_id=default
+       solves the default workbook preloaded at startup
     2. Run clinker optimization model from Excel
     3. Return results as JSON
+
+    demand_scale / freight_scale run a what-if scenario: demand and
+    freight cost multiplied by the factor (1.0 = as uploaded).
+
+    engine="network" solves the Trips relaxation as a min-cost flow
+    instead of the CBC MIP: much faster, a lower bound on the true cost.
+    engine="hierarchical" clusters GUs and solves per-cluster MIPs: for
+    networks too large for the full MIP, at some cost to optimality.
+    A solve predicted to exceed MAX_MODEL_MEMORY_MB or MAX_INTEGER_VARS
+    (see /inputs/{id}/estimate) runs on ADMISSION_FALLBACK instead,
+    noted under "admission", or is rejected with 413.
+
+    The response format is negotiated from the Accept header (or
+    ?format=): plain JSON by default, "columnar" JSON with
+    dictionary-encoded codes, "msgpack" (same layout) or an "arrow" IPC
+    stream; bodies are gzip/brotli-compressed per Accept-Encoding.
     """
 
     try:
         # -------------------------------
         # Step 1: Validate and save file
         # -------------------------------
-        # Validate file type
-        if not file.filename.endswith((".xlsx", ".xls")):
-            raise HTTPException(
-                status_code=400, 
-                detail="Only .xlsx or .xls files are supported"
-            )
-
-        # Save uploaded file
-        excel_path = os.path.join(config.UPLOAD_DIR, file.filename)
-        os.makedirs(config.UPLOAD_DIR, exist_ok=True)
-
-        with open(excel_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        _check_options(file, input_id, engine, fmt)
+        input_hash, excel_path, filename = _resolve_input(file, input_id)
 
         # -------------------------------
-        # Step 2: Run optimization
+        # Step 2: Run optimization and format
         # -------------------------------
-        try:
-            result = run_clinker_optimization(excel_path)
-        except Exception as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Optimization failed: {str(e)}"
-            )
+        response = _solve_input(input_hash, excel_path, filename, engine, demand_scale, freight_scale)
+        if not response["success"]:
+            return response
+        return response_formats.render(response, request.headers, fmt)
 
-        # -------------------------------
-        # Step 3: Check result and format
-        # -------------------------------
-        if not result.get("success"):
-            return {
-                "status": "failed",
-                "message": result.get("message", "Unknown error"),
-                "success": False
-            }
+    except HTTPException:
+        raise
 
-        # Extract key data from result
-        response = {
-            "status": "success",
-            "success": True,
-            "message": result.get("message", "Optimization completed"),
-            "objective_value": result.get("objective_value"),
-            "solver": "CBC",
-            "production": [],
-            "shipments": [],
-            "inventory": []
-        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Unexpected error: {str(e)}"
+        )
 
-        # Extract production data
-        model = result.get("model")
-        if model:
-            try:
-                from pyomo.environ import value
-                
-                # Production
-                production = []
-                for i in model.IU:
-                    for t in model.T:
-                        qty = float(value(model.Prod[i, t]))
-                        if qty > 0.01:
-                            production.append({
-                                "node": str(i),
-                                "period": str(t),
-                                "quantity": round(qty, 2)
-                            })
-                
-                response["production"] = production
-                
-                # Shipments
-                shipments = []
-                for (i, j, m) in model.ARCS:
-                    for t in model.T:
-                        qty = float(value(model.X[i, j, m, t]))
-                        trips = int(value(model.Trips[i, j, m, t]))
-                        if qty > 0.01:
-                            shipments.append({
-                                "from": str(i),
-                                "to": str(j),
-                                "mode": str(m),
-                                "period": str(t),
-                                "quantity": round(qty, 2),
-                                "trips": trips
-                            })
-                
-                response["shipments"] = shipments
-                
-                # Inventory
-                inventory = []
-                for n in model.N:
-                    for t in model.T:
-                        qty = float(value(model.Inv[n, t]))
-                        if qty > 0.01:
-                            inventory.append({
-                                "node": str(n),
-                                "period": str(t),
-                                "quantity": round(qty, 2)
-                            })
-                
-                response["inventory"] = inventory
-                
-                # Summary
-                response["summary"] = {
-                    "total_production": sum(p["quantity"] for p in production),
-                    "total_shipments": sum(s["quantity"] for s in shipments),
-                    "total_trips": sum(s["trips"] for s in shipments),
-                    "num_nodes": len(model.N),
-                    "num_periods": len(model.T)
-                }
-
-                # Cost breakdown (computed in model.py from actual solver values)
-                cost_breakdown = result.get("cost_breakdown")
-                if cost_breakdown:
-                    response["cost_breakdown"] = cost_breakdown
-                
-            except Exception as e:
-                # If extraction fails, return basic result
-                response["warning"] = f"Could not extract full results: {str(e)}"
-
-        # Save run to history (best-effort — never block the response)
-        try:
-            save_run_to_history(file.filename, response)
-        except Exception:
-            pass
 
-        return response
+def _check_options(file: Optional[UploadFile], input_id: Optional[str], engine: str, fmt: Optional[str]) -> None:
+    """400 unless there is a workbook to solve, a known engine and a known format"""
+    if file is None and not input_id:
+        raise HTTPException(status_code=400, detail="Upload a file or pass an input_id")
+    if engine not in config.ENGINES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown engine '{engine}'; expected one of {', '.join(config.ENGINES)}"
+        )
+    try:
+        response_formats.negotiate_format(explicit=fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _resolve_input(file: Optional[UploadFile], input_id: Optional[str]) -> tuple:
+    """(input hash, stored path or None, filename or None): the upload is stored, an id is taken as is"""
+    if file is not None:
+        input_hash, excel_path = _store_upload(file)
+        return input_hash, excel_path, file.filename
+    return input_id.lower(), None, None
+
 
+def _solve_input(input_hash: str, excel_path: Optional[str], filename: Optional[str],
+                 engine: str, demand_scale: float, freight_scale: float) -> dict:
+    """
+    Parse (or reuse) an input, solve the scenario, format the result and
+    record it in history; returns the /optimize response (the short
+    failure dict if the workbook cannot be read or the solve fails)
+    """
+    try:
+        entry = _parsed_input(input_hash, excel_path, filename)
     except HTTPException:
         raise
+    except Exception as e:
+        return {
+            "status": "failed",
+            "message": f"Runtime error: {str(e)}",
+            "success": False
+        }
+    # The name this request uploaded under; identical content uploaded
+    # earlier under another name shares the entry, not the name
+    filename = filename or entry["filename"]
+    input_hash = entry.get("input_hash", input_hash)
+    sheets = input_store.apply_scenario(entry["sheets"], demand_scale, freight_scale)
 
+    # Checked before anything is built: a model that cannot fit never starts
+    try:
+        admission = _admit(_estimate(sheets), engine)
+    except Exception as e:
+        return {
+            "status": "failed",
+            "message": f"Runtime error: {str(e)}",
+            "success": False
+        }
+    if not admission["admitted"]:
+        raise HTTPException(status_code=413, detail=f"Model too large: {admission['reason']}")
+    engine = admission["engine"]
+
+    try:
+        # Built and solved in a worker process; only the records come back
+        result = solve_worker.solve(sheets, {"ENGINE": engine})
     except Exception as e:
         raise HTTPException(
-            status_code=500, 
-            detail=f"Unexpected error: {str(e)}"
+            status_code=500,
+            detail=f"Optimization failed: {str(e)}"
         )
 
+    response = format_result(result, engine)
+    if not response["success"]:
+        return response
+    response["input_hash"] = input_hash
+    if admission["engine"] != admission["requested"]:
+        response["admission"] = admission
+    if demand_scale != 1.0 or freight_scale != 1.0:
+        response["scenario"] = {"demand_scale": demand_scale, "freight_scale": freight_scale}
+
+    # Save run to history (best-effort — never block the response)
+    try:
+        response["run_id"] = save_run_to_history(filename, response, input_hash)
+    except Exception:
+        pass
+    return response
+
+
+# ==================================================
+# JOB ENDPOINTS
+# ==================================================
+def _job_or_404(job_id: str) -> dict:
+    state = jobs.load_state(config.JOB_DIR, job_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return state
+
+
+@app.post("/jobs")
+def create_job(
+    file: Optional[UploadFile] = File(None),
+    input_id: Optional[str] = None,
+    engine: str = "cbc",
+    demand_scale: float = Query(1.0, gt=0),
+    freight_scale: float = Query(1.0, gt=0),
+):
+    """
+    Submit an optimization and return at once with a job id.
+
+    Takes the same inputs as /optimize. The upload is stored (or the
+    input_id checked) before returning; parsing and solving run on a
+    background pool (JOB_WORKERS). Poll GET /jobs/{id} until status is
+    "done" or "failed", then fetch GET /jobs/{id}/result.
+    """
+    _check_options(file, input_id, engine, None)
+    input_hash, excel_path, filename = _resolve_input(file, input_id)
+    if excel_path is None and input_hash != default_dataset.DEFAULT_INPUT_ID \
+            and upload_store.path_for(config.UPLOAD_DIR, input_hash) is None \
+            and input_store.cache.get(input_hash)[0] is None:
+        raise HTTPException(status_code=404, detail=f"Input {input_hash} not found; upload it again")
+
+    jobs.prune(config.JOB_DIR, config.JOB_TTL_SECONDS)
+    state = jobs.new_job({
+        "input_hash": input_hash, "filename": filename, "engine": engine,
+        "demand_scale": demand_scale, "freight_scale": freight_scale,
+    })
+    jobs.submit(
+        config.JOB_DIR, state,
+        lambda: _solve_input(input_hash, excel_path, filename, engine, demand_scale, freight_scale),
+        workers=config.JOB_WORKERS,
+    )
+    return state
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Status of a job: queued, running, done (with run_id) or failed (with message)"""
+    return _job_or_404(job_id)
+
+
+@app.get("/jobs/{job_id}/result")
+def get_job_result(request: Request, job_id: str, fmt: Optional[str] = Query(None, alias="format")):
+    """The finished job's /optimize response, in the negotiated format; 409 until it is done"""
+    state = _job_or_404(job_id)
+    if state["status"] != "done":
+        detail = state.get("message") if state["status"] == "failed" else f"Job is {state['status']}"
+        raise HTTPException(status_code=409, detail=detail or "Job failed")
+    try:
+        response_formats.negotiate_format(explicit=fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response = jobs.load_result(config.JOB_DIR, job_id)
+    if response is None:
+        raise HTTPException(status_code=404, detail=f"Result of job {job_id} has expired")
+    return response_formats.render(response, request.headers, fmt)
+
+
+# ==================================================
+# BATCH ENDPOINTS
+# ==================================================
+def _save_batch_item(item: dict, result: dict) -> dict:
+    """Format a batch item's solve like /optimize and record it as a run"""
+    engine = result["engine"]
+    response = format_result(result, engine)
+    fields = {"status": "success" if response["success"] else "failed", "seconds": result.get("seconds")}
+    if result.get("rejected"):
+        fields["status"] = "rejected"
+    if result.get("admission"):
+        fields.update(engine=engine, admission=result["admission"])
+    if not response["success"]:
+        fields["message"] = response["message"]
+        return fields
+    fields.update(
+        objective_value=response["objective_value"],
+        cost_breakdown=response.get("cost_breakdown"),
+        summary=response.get("summary"),
+        run_id=save_run_to_history(item["name"], response, item["input_hash"]),
+    )
+    return fields
+
+
+def _batch_or_404(batch_id: str) -> dict:
+    state = batch.load_state(config.BATCH_DIR, batch_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+    for item in state["items"]:
+        item.pop("path", None)
+    return state
+
+
+@app.post("/batch")
+def create_batch(files: List[UploadFile] = File(...), engine: str = "cbc"):
+    """
+    Optimize several workbooks in one request: any mix of .xlsx / .xls
+    files and zips of them.
+
+    Workbooks are stored like /optimize uploads and solved in parallel
+    on a process pool (BATCH_WORKERS, default one per core); each becomes
+    a normal run in /history. Each workbook goes through the same
+    admission check as /optimize, in its worker on the one parse it is
+    solved from: one predicted too large is rerouted to
+    ADMISSION_FALLBACK or marked "rejected". Returns at once with the
+    batch id: poll GET /batch/{id} for per-item status and the combined
+    summary, then download GET /batch/{id}/archive.
+    """
+    if engine not in config.ENGINES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown engine '{engine}'; expected one of {', '.join(config.ENGINES)}"
+        )
+
+    def store(name, fileobj):
+        if not name.lower().endswith((".xlsx", ".xls")):
+            raise upload_store.UploadRejected("Only .xlsx or .xls files are supported")
+        return upload_store.store(
+            fileobj, config.UPLOAD_DIR, os.path.splitext(name)[1],
+            max_bytes=config.UPLOAD_MAX_BYTES,
+            max_uncompressed=config.UPLOAD_MAX_UNCOMPRESSED,
+            budget_bytes=config.UPLOAD_BUDGET_BYTES,
+            pinned=_live_inputs,
+        )
+
+    try:
+        items = batch.collect_workbooks(
+            [(f.filename, f.file) for f in files], store, config.BATCH_MAX_ITEMS,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    state = batch.new_batch(items, engine)
+    batch.start_batch(
+        config.BATCH_DIR, state, config.BATCH_WORKERS,
+        _save_batch_item,
+        max_tasks=config.SOLVE_MAX_TASKS_PER_CHILD, memory_limit_mb=config.SOLVE_MEMORY_LIMIT_MB,
+        admission={
+            "memory_budget_mb": config.MAX_MODEL_MEMORY_MB,
+            "max_integers": config.MAX_INTEGER_VARS,
+            "fallback": config.ADMISSION_FALLBACK,
+        },
+    )
+    return _batch_or_404(state["batch_id"])
+
+
+@app.get("/batch/{batch_id}")
+def get_batch(batch_id: str):
+    """Per-item status of a batch; once done, the summary table and totals"""
+    state = _batch_or_404(batch_id)
+    state["table"] = batch.summary_rows(state)
+    return state
+
+
+@app.get("/batch/{batch_id}/archive")
+def batch_archive(batch_id: str):
+    """Zip of summary.csv and one plan CSV per solved workbook"""
+    state = _batch_or_404(batch_id)
+    if state["status"] == "running":
+        raise HTTPException(status_code=409, detail="Batch is still running")
+
+    runs = {}
+    for item in state["items"]:
+        if item.get("run_id") is not None:
+            record = history_store.get_run(config.HISTORY_DB_PATH, item["run_id"])
+            if record is not None and solution_archive.has_run(config.ARCHIVE_DIR, record["id"]):
+                runs[record["id"]] = record
+
+    out = tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024)
+    batch.write_archive(out, config.ARCHIVE_DIR, state, runs)
+    out.seek(0)
+    return StreamingResponse(
+        iter(lambda: out.read(1024 * 1024), b""),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="batch_{batch_id}.zip"'},
+    )
+
 
 # ==================================================
 # HISTORY ENDPOINT
 # ==================================================
 @app.get("/history")
-def get_history():
-    """Return list of past optimization runs (newest first)"""
-    if not os.path.exists(HISTORY_FILE):
-        return {"runs": [], "message": "No runs recorded yet"}
+def get_history(
+    request: Request,
+    http_response: Response,
+    limit: int = Query(20, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    filename: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    input_hash: Optional[str] = None,
+):
+    """
+    Return past optimization runs (newest first), one page at a time.
+
+    Filter by exact filename / status / input_hash (the uploaded
+    workbook's SHA-256) and by a since/until timestamp range
+    ("YYYY-MM-DD" or "YYYY-MM-DD HH:MM:SS"); "total" is the
+    number of matching runs across all pages.
+
+    Tagged with the history version (ETag); a matching If-None-Match
+    gets 304 with no body until a run is added or expires.
+    """
     try:
-        with open(HISTORY_FILE, "r") as f:
-            history = json.load(f)
-        return {"runs": history}
+        tag = http_cache.etag(
+            "history", history_store.version(config.HISTORY_DB_PATH),
+            limit, offset, filename, status, since, until, input_hash,
+        )
+        cached = http_cache.not_modified(request, tag)
+        if cached is not None:
+            return cached
+        runs, total = history_store.list_runs(
+            config.HISTORY_DB_PATH, limit=limit, offset=offset,
+            filename=filename, status=status, since=since, until=until,
+            input_hash=input_hash,
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Could not read history: {str(e)}")
 
+    http_response.headers.update(http_cache.validators(tag))
+    response = {"runs": runs, "total": total, "limit": limit, "offset": offset}
+    if total == 0:
+        response["message"] = "No runs recorded yet"
+    return response
+
+
+# ==================================================
+# ANALYTICS ENDPOINT
+# ==================================================
+@app.get("/analytics/{table}")
+def analytics(
+    request: Request,
+    http_response: Response,
+    table: str,
+    group_by: str = "",
+    metric: str = "quantity",
+    agg: str = "sum",
+    last_runs: Optional[int] = Query(None, ge=1),
+    run_ids: Optional[str] = None,
+    top: Optional[int] = Query(None, ge=1),
+    node: Optional[str] = None,
+    from_: Optional[str] = Query(None, alias="from"),
+    to: Optional[str] = None,
+    mode: Optional[str] = None,
+    period: Optional[str] = None,
+):
+    """
+    Aggregate archived plans across runs (production, shipments or
+    inventory). Only the grouped, filtered and metric columns are read.
+
+    group_by / run_ids are comma-separated; filters are exact matches.
+    e.g. /analytics/shipments?group_by=period,run_id&from=IU_009&mode=T1&last_runs=30
+         /analytics/shipments?group_by=from,to,mode&agg=range&top=20
+    """
+    filters = {
+        column: value
+        for column, value in [("node", node), ("from", from_), ("to", to), ("mode", mode), ("period", period)]
+        if value is not None
+    }
+    # The archive changes only with the history
+    tag = http_cache.etag(
+        "analytics", history_store.version(config.HISTORY_DB_PATH),
+        table, group_by, metric, agg, last_runs, run_ids, top, sorted(filters.items()),
+    )
+    cached = http_cache.not_modified(request, tag)
+    if cached is not None:
+        return cached
+    http_response.headers.update(http_cache.validators(tag))
+    try:
+        return solution_archive.query(
+            config.ARCHIVE_DIR, table,
+            group_by=[c.strip() for c in group_by.split(",") if c.strip()],
+            metric=metric,
+            agg=agg,
+            filters=filters,
+            last_runs=last_runs,
+            run_ids=[int(r) for r in run_ids.split(",")] if run_ids else None,
+            top=top,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ==================================================
+# RUN DIFF ENDPOINT
+# ==================================================
+def _archived_run(run_id: int) -> dict:
+    record = history_store.get_run(config.HISTORY_DB_PATH, run_id)
+    if record is None or not solution_archive.has_run(config.ARCHIVE_DIR, run_id):
+        raise HTTPException(status_code=404, detail=f"Run {run_id} not found in the archive")
+    return record
+
+
+@app.get("/runs/{run_a}/diff/{run_b}")
+def diff_runs(request: Request, http_response: Response, run_a: int, run_b: int,
+              top: int = Query(20, ge=1, le=1000)):
+    """
+    What changed from run a to run b: cost deltas by component and the
+    lanes, plants and stock positions whose tonnage moved most.
+    """
+    records = {run_id: _archived_run(run_id) for run_id in (run_a, run_b)}
+    # Archived runs never change, so the ids and parameters are the version
+    tag = http_cache.etag("diff", run_a, run_b, top)
+    cached = http_cache.not_modified(request, tag)
+    if cached is not None:
+        return cached
+    http_response.headers.update(http_cache.validators(tag))
+
+    try:
+        return run_diff.diff_runs(config.ARCHIVE_DIR, records[run_a], records[run_b], top=top)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Could not diff runs: {str(e)}")
+
+
+# ==================================================
+# FLOW QUERY ENDPOINT
+# ==================================================
+@app.get("/runs/{run_id}/flows")
+def run_flows(
+    request: Request,
+    http_response: Response,
+    run_id: int,
+    group_by: str = "from,to",
+    iu: Optional[str] = None,
+    gu: Optional[str] = None,
+    mode: Optional[str] = None,
+    period_from: Optional[int] = None,
+    period_to: Optional[int] = None,
+    top: Optional[int] = Query(None, ge=1),
+):
+    """
+    Shipment flows of one run, aggregated on the server so charts only
+    receive the lanes they draw.
+
+    group_by is any of from, to, mode, period (comma-separated); iu / gu
+    / mode filter origins, destinations and modes (comma-separated
+    lists); period_from / period_to bound the periods; top keeps the
+    largest groups by quantity.
+    e.g. /runs/12/flows?iu=IU_009&top=25
+         /runs/12/flows?group_by=mode,period&period_from=2&period_to=3
+    """
+    _archived_run(run_id)
+    filters = {
+        column: [v.strip() for v in value.split(",") if v.strip()]
+        for column, value in [("from", iu), ("to", gu), ("mode", mode)]
+        if value
+    }
+    tag = http_cache.etag("flows", run_id, group_by, sorted(filters.items()), period_from, period_to, top)
+    cached = http_cache.not_modified(request, tag)
+    if cached is not None:
+        return cached
+    http_response.headers.update(http_cache.validators(tag))
+    try:
+        return solution_archive.flows(
+            config.ARCHIVE_DIR, run_id,
+            group_by=[c.strip() for c in group_by.split(",") if c.strip()],
+            filters=filters,
+            period_from=period_from,
+            period_to=period_to,
+            top=top,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ==================================================
+# EXPORT ENDPOINTS
+# ==================================================
+def _export_format(fmt: str) -> str:
+    if fmt not in solution_export.EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown format '{fmt}'; expected one of {', '.join(solution_export.EXPORT_FORMATS)}"
+        )
+    return solution_export.EXPORT_FORMATS[fmt]
+
+
+@app.get("/runs/{run_id}/export")
+def export_run(request: Request, run_id: int, fmt: str = Query("csv", alias="format")):
+    """
+    Stream a run's full plan as CSV (summary plus production, shipments
+    and inventory sections) or NDJSON (one tagged record per line).
+
+    Rows are read from the archive batch by batch, so memory stays flat
+    however large the plan is.
+    """
+    media_type = _export_format(fmt)
+    record = _archived_run(run_id)
+    tag = http_cache.etag("export", run_id, fmt)
+    cached = http_cache.not_modified(request, tag)
+    if cached is not None:
+        return cached
+    stream = (solution_export.iter_run_csv if fmt == "csv" else solution_export.iter_run_ndjson)
+    return StreamingResponse(
+        stream(config.ARCHIVE_DIR, record),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="run_{run_id}.{fmt}"',
+            **http_cache.validators(tag),
+        },
+    )
+
+
+@app.get("/runs/{run_id}/export/{table}")
+def export_table(request: Request, run_id: int, table: str, fmt: str = Query("csv", alias="format")):
+    """Stream one table (production, shipments or inventory) of a run as CSV or NDJSON"""
+    media_type = _export_format(fmt)
+    if table not in solution_archive.SCHEMAS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown table '{table}'; expected one of {', '.join(solution_archive.SCHEMAS)}"
+        )
+    _archived_run(run_id)
+    tag = http_cache.etag("export", run_id, table, fmt)
+    cached = http_cache.not_modified(request, tag)
+    if cached is not None:
+        return cached
+    stream = (solution_export.iter_csv if fmt == "csv" else solution_export.iter_ndjson)
+    return StreamingResponse(
+        stream(config.ARCHIVE_DIR, table, run_id),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="run_{run_id}_{table}.{fmt}"',
+            **http_cache.validators(tag),
+        },
+    )
+
 
 # ==================================================
 # DEBUG ENDPOINTS
 # ==================================================
+def _default_workbook() -> dict:
+    """The preloaded default workbook; 404 if the file is missing"""
+    try:
+        return default_dataset.cache.get(config.DEFAULT_EXCEL_PATH)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Default Excel file not found")
+
+
 @app.get("/debug/sheets")
 def debug_sheets():
     """List all sheets in the default Excel file"""
     try:
-        import pandas as pd
-        
-        if not os.path.exists(config.DEFAULT_EXCEL_PATH):
-            raise HTTPException(status_code=404, detail="Default Excel file not found")
-        
-        excel_data = pd.read_excel(
-            config.DEFAULT_EXCEL_PATH, 
-            sheet_name=None, 
-            engine='openpyxl'
-        )
+        excel_data = _default_workbook()["sheets"]
         
         return {
             "excel_path": config.DEFAULT_EXCEL_PATH,
@@ -274,6 +876,8 @@ def debug_sheets():
                 for name, df in excel_data.items()
             }
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -282,16 +886,10 @@ def debug_sheets():
 def debug_sheet_preview(sheet_name: str):
     """Preview first 5 rows of a specific sheet"""
     try:
-        import pandas as pd
-        
-        if not os.path.exists(config.DEFAULT_EXCEL_PATH):
-            raise HTTPException(status_code=404, detail="Default Excel file not found")
-        
-        df = pd.read_excel(
-            config.DEFAULT_EXCEL_PATH, 
-            sheet_name=sheet_name,
-            engine='openpyxl'
-        )
+        sheets = _default_workbook()["sheets"]
+        if sheet_name not in sheets:
+            raise HTTPException(status_code=404, detail=f"Sheet '{sheet_name}' not found")
+        df = sheets[sheet_name]
         
         return {
             "sheet_name": sheet_name,
@@ -299,5 +897,7 @@ def debug_sheet_preview(sheet_name: str):
             "columns": df.columns.tolist(),
             "preview": df.head(5).to_dict(orient="records")
         }
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
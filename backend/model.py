@@ -1,208 +1,497 @@
+import time
+import numpy as np
 import pandas as pd
-import math
 from pyomo.environ import (
-    ConcreteModel, Set, Var,
+    ConcreteModel, RangeSet, Set, Var,
     NonNegativeReals, NonNegativeIntegers,
     Objective, Constraint, minimize,
     SolverFactory, value, TerminationCondition
 )
 
+from backend.config import ENGINES
+from backend.scaling import compute_scaling
+from backend.constraints import compile_constraints, required_trips
+from backend.lazy import solve_with_lazy_rows
+from backend.network_flow import solve_network_relaxation
+from backend.network_index import build_index, grid, solution_arrays, vector
+from backend.sheet_schema import apply_schema
+
 # ==================================================
 # CONFIGURATION
 # ==================================================
 SETTINGS = {
     "ENABLE_MIN_FULFILL": True,
-    "UNMET_PENALTY": 10_000_000,
+    "UNMET_PENALTY": 10_000_000,      # used when scaling or AUTO_UNMET_PENALTY is off
+    "AUTO_UNMET_PENALTY": False,      # derive the penalty from the data (changes the objective)
     "HOLDING_COST": 0.5,
-    "DEFAULT_LEAD_TIME": 1
+    "DEFAULT_LEAD_TIME": 1,
+    "ENABLE_SCALING": False,          # opt-in: slower on the bundled dataset, see bench_scaling
+    "QUANTITY_SCALE": 1000,           # tons per model unit (1000 → kilotons)
+    "UNMET_PENALTY_FACTOR": 10,       # data-driven penalty multiplier
+    "SOLVER_TIME_LIMIT": None,        # seconds, None = no limit
+    "ENABLE_IUGU_CONSTRAINTS": True,  # IUGUConstraint + IUGUClosingStock
+    "LAZY_ROWS": False,               # add MinFulfill/LaneLimit rows on demand
+    "LAZY_MAX_ITERATIONS": 10,
+    "RELAX_TRIPS": False,             # continuous Trips (LP relaxation)
+    "ENGINE": "cbc",                  # "cbc", "network" or "hierarchical"
+    "NETWORK_BACKEND": "auto",        # "auto", "ortools" or "python"
+    "HIER_CLUSTER_SIZE": 20,          # target GUs per cluster
+    "HIER_WORKERS": None,             # subproblem processes, None = CPU count
 }
 
+SHEETS = [
+    "ClinkerDemand", "ClinkerCapacity", "ProductionCost",
+    "LogisticsIUGU", "IUGUOpeningStock", "IUGUType",
+]
+
+# Read when present; older workbooks and synthetic data may omit them
+OPTIONAL_SHEETS = ["IUGUConstraint", "IUGUClosingStock"]
+
+
 # ==================================================
-# MAIN SOLVER FUNCTION (BACKEND SAFE)
+# DATA PREPARATION
 # ==================================================
-def run_clinker_optimization(file_path):
+def load_workbook(file_path):
+    """
+    Read the sheets the model needs from an Excel workbook, typed as
+    they are read (see sheet_schema); raises ValueError on bad types
+    """
+    xls = pd.ExcelFile(file_path)
+    names = SHEETS + [n for n in OPTIONAL_SHEETS if n in xls.sheet_names]
+    return {name: apply_schema(name, pd.read_excel(xls, name)) for name in names}
 
-    try:
-        # ------------------------------
-        # LOAD DATA
-        # ------------------------------
-        xls = pd.ExcelFile(file_path)
 
-        demand_df    = pd.read_excel(xls, "ClinkerDemand")
-        capacity_df  = pd.read_excel(xls, "ClinkerCapacity")
-        prod_cost_df = pd.read_excel(xls, "ProductionCost")
-        logistics_df = pd.read_excel(xls, "LogisticsIUGU")
-        opening_df   = pd.read_excel(xls, "IUGUOpeningStock")
-        type_df      = pd.read_excel(xls, "IUGUType")
+def prepare_inputs(sheets, settings=None):
+    """
+    Turn raw sheet DataFrames into the sets and parameter dicts the
+    model is built from.
 
-        # ------------------------------
-        # CLEAN CODES
-        # ------------------------------
-        for df in [demand_df, capacity_df, prod_cost_df,
-                   logistics_df, opening_df, type_df]:
-            for c in df.columns:
-                if "CODE" in c or "TYPE" in c:
-                    df[c] = df[c].astype(str).str.strip()
+    Args:
+        sheets (dict): DataFrames keyed by sheet name (see SHEETS)
+        settings (dict): Overrides for SETTINGS
 
-        # ------------------------------
-        # SETS
-        # ------------------------------
-        T = sorted(demand_df["TIME PERIOD"].unique())
+    Returns:
+        dict: T (period values), IU and N (codes in id order), the
+              network index (see network_index.build_index) and
+              parameter arrays over node / arc ids and period positions:
+              demand, min_fulfill (N, T); prod_cap, prod_cost (IU, T);
+              inv_open (N,); trip_cap, trip_cost, lead_time (arcs,);
+              max_trips (arcs, T)
+    """
+    settings = {**SETTINGS, **(settings or {})}
 
-        IU = type_df[type_df["PLANT TYPE"] == "IU"]["IUGU CODE"].tolist()
-        GU = type_df[type_df["PLANT TYPE"] == "GU"]["IUGU CODE"].tolist()
-        ALL_NODES = list(set(IU) | set(GU))
+    demand_df    = sheets["ClinkerDemand"].copy()
+    capacity_df  = sheets["ClinkerCapacity"].copy()
+    prod_cost_df = sheets["ProductionCost"].copy()
+    logistics_df = sheets["LogisticsIUGU"].copy()
+    opening_df   = sheets["IUGUOpeningStock"].copy()
+    type_df      = sheets["IUGUType"].copy()
 
-        # ------------------------------
-        # REMOVE EXT / INVALID NODES
-        # ------------------------------
-        logistics_df = logistics_df[
-            logistics_df["FROM IU CODE"].isin(IU) &
-            logistics_df["TO IUGU CODE"].isin(ALL_NODES)
-        ]
+    # ------------------------------
+    # TYPES (a no-op for sheets from load_workbook)
+    # ------------------------------
+    for name, df in zip(SHEETS, [demand_df, capacity_df, prod_cost_df,
+                                 logistics_df, opening_df, type_df]):
+        apply_schema(name, df)
 
-        ARCS = list({
-            (r["FROM IU CODE"], r["TO IUGU CODE"], r["TRANSPORT CODE"])
-            for _, r in logistics_df.iterrows()
-            if r["FROM IU CODE"] != r["TO IUGU CODE"]
-        })
+    # ------------------------------
+    # SETS (codes interned once: ids from here on)
+    # ------------------------------
+    T = sorted(demand_df["TIME PERIOD"].unique())
 
-        # ------------------------------
-        # PARAMETERS
-        # ------------------------------
-        demand = demand_df.set_index(["IUGU CODE","TIME PERIOD"])["DEMAND"].fillna(0).to_dict()
-        min_fulfill = demand_df.set_index(["IUGU CODE","TIME PERIOD"])["MIN FULFILLMENT (%)"].fillna(0).to_dict()
-        prod_cap = capacity_df.set_index(["IU CODE","TIME PERIOD"])["CAPACITY"].fillna(0).to_dict()
-        prod_cost = prod_cost_df.set_index(["IU CODE","TIME PERIOD"])["PRODUCTION COST"].fillna(0).to_dict()
-        inv_open = opening_df.set_index("IUGU CODE")["OPENING STOCK"].fillna(0).to_dict()
-
-        log_idx = logistics_df.set_index(["FROM IU CODE","TO IUGU CODE","TRANSPORT CODE"])
-        trip_cap = log_idx["QUANTITY MULTIPLIER"].fillna(0).to_dict()
-        trip_cost = (log_idx["FREIGHT COST"] + log_idx["HANDLING COST"]).fillna(0).to_dict()
-        lead_time = (
-            log_idx["LEAD TIME"].fillna(SETTINGS["DEFAULT_LEAD_TIME"]).astype(int).to_dict()
-            if "LEAD TIME" in log_idx else {}
+    IU = type_df[type_df["PLANT TYPE"] == "IU"]["IUGU CODE"].tolist()
+    GU = type_df[type_df["PLANT TYPE"] == "GU"]["IUGU CODE"].tolist()
+
+    # EXT / invalid lanes and self-loops are dropped by the index
+    index = build_index(IU, GU, T, logistics_df)
+    nodes, n_iu = index["nodes"], index["n_iu"]
+    lanes = logistics_df.iloc[index["arc_rows"]]
+
+    # ------------------------------
+    # PARAMETERS (arrays over node / arc ids and period positions)
+    # ------------------------------
+    demand = grid(demand_df, "IUGU CODE", nodes, T, "DEMAND")
+    min_fulfill = grid(demand_df, "IUGU CODE", nodes, T, "MIN FULFILLMENT (%)")
+    prod_cap = grid(capacity_df, "IU CODE", nodes[:n_iu], T, "CAPACITY")
+    prod_cost = grid(prod_cost_df, "IU CODE", nodes[:n_iu], T, "PRODUCTION COST")
+    inv_open = vector(opening_df, "IUGU CODE", nodes, "OPENING STOCK")
+
+    trip_cap = lanes["QUANTITY MULTIPLIER"].fillna(0).to_numpy(float)
+    trip_cost = (lanes["FREIGHT COST"] + lanes["HANDLING COST"]).fillna(0).to_numpy(float)
+    lead_time = (
+        lanes["LEAD TIME"].fillna(settings["DEFAULT_LEAD_TIME"]).to_numpy(int)
+        if "LEAD TIME" in lanes else np.ones(len(lanes), dtype=int)
+    )
+
+    # ------------------------------
+    # MAX TRIPS
+    # ------------------------------
+    # Demand spread evenly over the arcs into a node, in whole trips
+    routes = np.maximum(np.bincount(index["arc_to"], minlength=len(nodes)), 1)[index["arc_to"]]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        max_trips = np.where(
+            trip_cap[:, None] > 0,
+            np.ceil(demand[index["arc_to"]] / (routes * trip_cap)[:, None]),
+            0,
+        ).astype(np.int64)
+
+    # ------------------------------
+    # SIDE CONSTRAINTS
+    # ------------------------------
+    inputs = {"T": T, "N": nodes.tolist(), "index": index}
+    if not settings["RELAX_TRIPS"]:
+        # Integer Trips: single-lane limits must hold a whole number of trips
+        inputs["trip_cap"] = trip_cap
+    if settings["ENABLE_IUGU_CONSTRAINTS"]:
+        optional = {name: apply_schema(name, sheets[name].copy()) for name in OPTIONAL_SHEETS if name in sheets}
+        compiled = compile_constraints(
+            inputs,
+            optional.get("IUGUConstraint"),
+            optional.get("IUGUClosingStock"),
         )
+    else:
+        compiled = compile_constraints(inputs)
 
-        # ------------------------------
-        # MAX TRIPS
-        # ------------------------------
-        incoming = {(n,t):0 for n in ALL_NODES for t in T}
-        for (_,j,_) in ARCS:
-            for t in T:
-                incoming[(j,t)] += 1
-
-        max_trips = {}
-        for (i,j,m) in ARCS:
-            cap = trip_cap.get((i,j,m),0)
-            for t in T:
-                dem = demand.get((j,t),0)
-                routes = max(incoming[(j,t)],1)
-                max_trips[(i,j,m,t)] = math.ceil(dem/(routes*cap)) if cap>0 else 0
+    for (a, k), trips in required_trips(compiled, trip_cap).items():
+        max_trips[a, k] = max(max_trips[a, k], trips)
+
+    return {
+        "T": T,
+        "IU": nodes[:n_iu].tolist(),
+        "N": nodes.tolist(),
+        "index": index,
+        "demand": demand,
+        "min_fulfill": min_fulfill,
+        "prod_cap": prod_cap,
+        "prod_cost": prod_cost,
+        "inv_open": inv_open,
+        "trip_cap": trip_cap,
+        "trip_cost": trip_cost,
+        "lead_time": lead_time,
+        "max_trips": max_trips,
+        "compiled": compiled,
+    }
 
-        # ==================================================
-        # PYOMO MODEL
-        # ==================================================
-        model = ConcreteModel()
 
-        model.T = Set(initialize=T, ordered=True)
-        model.IU = Set(initialize=IU)
-        model.N = Set(initialize=ALL_NODES)
-        model.ARCS = Set(dimen=3, initialize=ARCS)
+# ==================================================
+# PYOMO MODEL
+# ==================================================
+def build_model(inputs, settings, scaling):
+    """
+    Build the Pyomo model in scaled units.
 
-        model.Prod = Var(model.IU, model.T, domain=NonNegativeReals)
-        model.Inv = Var(model.N, model.T, domain=NonNegativeReals)
-        model.X = Var(model.ARCS, model.T, domain=NonNegativeReals)
-        model.Trips = Var(model.ARCS, model.T, domain=NonNegativeIntegers)
-        model.Unmet = Var(model.N, model.T, domain=NonNegativeReals)
+    Quantities (Prod, Inv, X, Unmet) are expressed in units of
+    scaling["quantity"] tons and objective coefficients are divided by
+    scaling["cost"]. Trips stay in trips. Use unscale_quantity() and
+    scaling["cost"] to convert solver values back.
 
-        # ------------------------------
-        # OBJECTIVE
-        # ------------------------------
-        model.OBJ = Objective(
-            expr=
-            sum(prod_cost.get((i,t),0)*model.Prod[i,t] for i in model.IU for t in model.T)
-            + sum(trip_cost.get((i,j,m),0)*model.Trips[i,j,m,t]
-                  for (i,j,m) in model.ARCS for t in model.T)
-            + sum(SETTINGS["HOLDING_COST"]*model.Inv[n,t] for n in model.N for t in model.T)
-            + sum(SETTINGS["UNMET_PENALTY"]*model.Unmet[n,t] for n in model.N for t in model.T),
-            sense=minimize
+    Indexed by ids, not codes: IU / N by node id, ARCS by arc id and T
+    by period position (see network_index), so X and Trips are indexed
+    by (arc, period) pairs of small ints.
+    """
+    index = inputs["index"]
+    n_iu = index["n_iu"]
+    arc_from, arc_to = index["arc_from"].tolist(), index["arc_to"].tolist()
+
+    # Plain lists: indexing them in rules is much cheaper than numpy scalars
+    demand = inputs["demand"].tolist()
+    min_fulfill = inputs["min_fulfill"].tolist()
+    prod_cap = inputs["prod_cap"].tolist()
+    prod_cost = inputs["prod_cost"].tolist()
+    inv_open = inputs["inv_open"].tolist()
+    trip_cap = inputs["trip_cap"].tolist()
+    trip_cost = inputs["trip_cost"].tolist()
+    lead_time = inputs["lead_time"].tolist()
+    max_trips = inputs["max_trips"].tolist()
+
+    q = scaling["quantity"]
+    c = scaling["cost"]
+
+    model = ConcreteModel()
+
+    model.T = RangeSet(0, len(inputs["T"]) - 1)
+    model.IU = RangeSet(0, n_iu - 1)
+    model.N = RangeSet(0, len(inputs["N"]) - 1)
+    model.ARCS = RangeSet(0, len(arc_from) - 1)
+
+    model.Prod = Var(model.IU, model.T, domain=NonNegativeReals)
+    model.Inv = Var(model.N, model.T, domain=NonNegativeReals)
+    model.X = Var(model.ARCS, model.T, domain=NonNegativeReals)
+    model.Trips = Var(
+        model.ARCS, model.T,
+        domain=NonNegativeReals if settings["RELAX_TRIPS"] else NonNegativeIntegers
+    )
+    model.Unmet = Var(model.N, model.T, domain=NonNegativeReals)
+
+    # Arc adjacency, so balance rows don't rescan every arc per node
+    arcs_in = [[] for _ in inputs["N"]]
+    arcs_out = [[] for _ in inputs["N"]]
+    for a, (i, j) in enumerate(zip(arc_from, arc_to)):
+        arcs_in[j].append(a)
+        arcs_out[i].append(a)
+
+    # ------------------------------
+    # OBJECTIVE
+    # ------------------------------
+    model.OBJ = Objective(
+        expr=
+        sum(prod_cost[i][t]*q/c*model.Prod[i,t] for i in model.IU for t in model.T)
+        + sum(trip_cost[a]/c*model.Trips[a,t] for a in model.ARCS for t in model.T)
+        + sum(settings["HOLDING_COST"]*q/c*model.Inv[n,t] for n in model.N for t in model.T)
+        + sum(scaling["unmet_penalty"]*q/c*model.Unmet[n,t] for n in model.N for t in model.T),
+        sense=minimize
+    )
+
+    # ------------------------------
+    # CONSTRAINTS
+    # ------------------------------
+    model.ProdCap = Constraint(
+        model.IU, model.T,
+        rule=lambda m,i,t: m.Prod[i,t] <= prod_cap[i][t]/q
+    )
+
+    def inv_balance(m,n,t):
+        prev = inv_open[n]/q if t==0 else m.Inv[n,t-1]
+        inflow = sum(m.X[a,t-lead_time[a]] for a in arcs_in[n] if t-lead_time[a]>=0)
+        outflow = sum(m.X[a,t] for a in arcs_out[n])
+        prod = m.Prod[n,t] if n < n_iu else 0
+        return prev + prod + inflow - outflow + m.Unmet[n,t] == demand[n][t]/q + m.Inv[n,t]
+
+    model.InvBalance = Constraint(model.N, model.T, rule=inv_balance)
+
+    if settings["ENABLE_MIN_FULFILL"] and settings["LAZY_ROWS"]:
+        # Rows are added by backend.lazy as the solution violates them
+        model.MinFulfill = Constraint(model.N, model.T)
+    elif settings["ENABLE_MIN_FULFILL"]:
+        model.MinFulfill = Constraint(
+            model.N, model.T,
+            rule=lambda m,n,t:
+                Constraint.Skip if demand[n][t]==0
+                else sum(m.X[a,t] for a in arcs_in[n])
+                     + (m.Prod[n,t] if n < n_iu else 0)
+                     >= min_fulfill[n][t]/100*demand[n][t]/q
+        )
+
+    model.TripPhysics = Constraint(
+        model.ARCS, model.T,
+        rule=lambda m,a,t: m.X[a,t] == trip_cap[a]/q*m.Trips[a,t]
+    )
+
+    model.TripLimit = Constraint(
+        model.ARCS, model.T,
+        rule=lambda m,a,t: m.Trips[a,t] <= max_trips[a][t]
+    )
+
+    # ------------------------------
+    # COMPILED SIDE CONSTRAINTS
+    # ------------------------------
+    compiled = inputs.get("compiled")
+    if compiled:
+        apply_compiled_constraints(model, compiled, q, lazy=settings["LAZY_ROWS"])
+
+    return model
+
+
+def _scaled(bound, q):
+    return None if bound is None else bound/q
+
+
+def apply_compiled_constraints(model, compiled, q, lazy=False):
+    """
+    Add compiled IUGUConstraint / IUGUClosingStock limits to the model.
+
+    Single-variable limits tighten X / Inv bounds directly (no rows);
+    aggregated limits become one indexed LaneLimit block of sparse rows
+    (left empty when lazy, for backend.lazy to fill).
+    """
+    for key, (lb, ub) in compiled["x_bounds"].items():
+        var = model.X[key]
+        if lb is not None:
+            var.setlb(max(var.lb or 0, lb/q))
+        if ub is not None:
+            var.setub(ub/q if var.ub is None else min(var.ub, ub/q))
+
+    for key, (lb, ub) in compiled["inv_bounds"].items():
+        var = model.Inv[key]
+        if lb is not None:
+            var.setlb(max(var.lb or 0, lb/q))
+        if ub is not None:
+            var.setub(ub/q if var.ub is None else min(var.ub, ub/q))
+
+    rows = compiled["rows"]
+    if rows and lazy:
+        model.LANE_ROWS = Set(initialize=range(len(rows)))
+        model.LaneLimit = Constraint(model.LANE_ROWS)
+    elif rows:
+        model.LANE_ROWS = Set(initialize=range(len(rows)))
+        model.LaneLimit = Constraint(
+            model.LANE_ROWS,
+            rule=lambda m,r: (
+                _scaled(rows[r]["lb"], q),
+                sum(m.X[k] for k in rows[r]["vars"]),
+                _scaled(rows[r]["ub"], q),
+            )
         )
 
+
+def unscale_quantity(model_value, scaling):
+    """Convert a scaled model quantity back to tons"""
+    return float(model_value) * scaling["quantity"]
+
+
+def variable_values(var, shape):
+    """Solver values of an indexed Var, in index order, as an array of shape (None = 0)"""
+    return np.fromiter((v.value or 0.0 for v in var.values()), dtype=float, count=len(var)).reshape(shape)
+
+
+def extract_solution(model, scaling, index):
+    """
+    Production, shipment and inventory (tons) from a solved model, as id
+    arrays (see network_index.solution_arrays); network_index
+    .decode_solution turns them into records.
+    """
+    q = scaling["quantity"]
+    n_t = len(model.T)
+
+    prod = variable_values(model.Prod, (-1, n_t)) * q
+    ship = variable_values(model.X, (-1, n_t)) * q
+    trips = np.rint(variable_values(model.Trips, (-1, n_t)))
+    inv = variable_values(model.Inv, (-1, n_t)) * q
+
+    produced, shipped, held = (np.nonzero(v > 0.01) for v in (prod, ship, inv))
+    return solution_arrays(
+        index,
+        production=(*produced, prod[produced]),
+        shipments=(*shipped, ship[shipped], trips[shipped]),
+        inventory=(*held, inv[held]),
+    )
+
+
+# ==================================================
+# MAIN SOLVER FUNCTION (BACKEND SAFE)
+# ==================================================
+def run_clinker_optimization(file_path, settings=None):
+
+    try:
+        sheets = load_workbook(file_path)
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Runtime error: {str(e)}",
+            "model": None
+        }
+
+    return solve_clinker_model(sheets, settings)
+
+
+def solve_clinker_model(sheets, settings=None):
+    """
+    Prepare, build and solve the model for already-loaded sheets.
+
+    Args:
+        sheets (dict): DataFrames keyed by sheet name (see SHEETS)
+        settings (dict): Overrides for SETTINGS
+
+    Returns:
+        dict: Same shape as run_clinker_optimization
+    """
+    try:
+        settings = {**SETTINGS, **(settings or {})}
+
         # ------------------------------
-        # CONSTRAINTS
+        # PREPARE DATA
         # ------------------------------
-        model.ProdCap = Constraint(
-            model.IU, model.T,
-            rule=lambda m,i,t: m.Prod[i,t] <= prod_cap.get((i,t),0)
-        )
+        inputs = prepare_inputs(sheets, settings)
 
-        def inv_balance(m,n,t):
-            idx = T.index(t)
-            prev = inv_open.get(n,0) if idx==0 else m.Inv[n,T[idx-1]]
-            inflow = sum(
-                m.X[i,n,m_,T[idx-lead_time.get((i,n,m_),1)]]
-                for (i,j,m_) in m.ARCS
-                if j==n and idx-lead_time.get((i,n,m_),1)>=0
-            )
-            outflow = sum(m.X[n,j,m_,t] for (i,j,m_) in m.ARCS if i==n)
-            prod = m.Prod[n,t] if n in m.IU else 0
-            return prev + prod + inflow - outflow + m.Unmet[n,t] == demand.get((n,t),0) + m.Inv[n,t]
-
-        model.InvBalance = Constraint(model.N, model.T, rule=inv_balance)
-
-        if SETTINGS["ENABLE_MIN_FULFILL"]:
-            model.MinFulfill = Constraint(
-                model.N, model.T,
-                rule=lambda m,n,t:
-                    Constraint.Skip if demand.get((n,t),0)==0
-                    else sum(m.X[i,n,m_,t] for (i,j,m_) in m.ARCS if j==n)
-                         + (m.Prod[n,t] if n in m.IU else 0)
-                         >= min_fulfill.get((n,t),0)/100*demand.get((n,t),0)
-            )
+        if settings["ENGINE"] == "hierarchical":
+            # Imported here: the hierarchical solver calls back into this module
+            from backend.hierarchical import solve_hierarchical
+            return solve_hierarchical(sheets, inputs, settings, compute_scaling(inputs, settings))
 
-        model.TripPhysics = Constraint(
-            model.ARCS, model.T,
-            rule=lambda m,i,j,m_,t: m.X[i,j,m_,t] == trip_cap.get((i,j,m_),0)*m.Trips[i,j,m_,t]
-        )
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Runtime error: {str(e)}",
+            "model": None
+        }
 
-        model.TripLimit = Constraint(
-            model.ARCS, model.T,
-            rule=lambda m,i,j,m_,t: m.Trips[i,j,m_,t] <= max_trips[(i,j,m_,t)]
-        )
+    return solve_prepared(inputs, settings)
+
+
+def solve_prepared(inputs, settings=None):
+    """
+    Build and solve the model for already-prepared inputs.
+
+    Args:
+        inputs (dict): Output of prepare_inputs (may be adjusted by callers)
+        settings (dict): Overrides for SETTINGS
+
+    Returns:
+        dict: Same shape as run_clinker_optimization
+    """
+    try:
+        settings = {**SETTINGS, **(settings or {})}
+        scaling = compute_scaling(inputs, settings)
+
+        if settings["ENGINE"] == "network":
+            response = solve_network_relaxation(inputs, settings, scaling)
+            response["solver"] = "network-flow"
+            response["scaling"] = scaling
+            return response
+
+        prod_cost = inputs["prod_cost"]
+        trip_cost = inputs["trip_cost"]
 
         # ==================================================
-        # SOLVE
+        # BUILD + SOLVE
         # ==================================================
+        build_start = time.perf_counter()
+        model = build_model(inputs, settings, scaling)
+        build_time = time.perf_counter() - build_start
+
+        solve_start = time.perf_counter()
         solver = SolverFactory("cbc")
-        result = solver.solve(model, tee=False)
+        if settings["SOLVER_TIME_LIMIT"]:
+            solver.options["seconds"] = settings["SOLVER_TIME_LIMIT"]
+        lazy_stats = None
+        if settings["LAZY_ROWS"]:
+            result, lazy_stats = solve_with_lazy_rows(model, inputs, settings, scaling, solver)
+        else:
+            result = solver.solve(model, tee=False)
+        solve_time = time.perf_counter() - solve_start
 
         if result.solver.termination_condition == TerminationCondition.optimal:
-            # Calculate individual cost components
-            production_cost = sum(
-                prod_cost.get((i, t), 0) * value(model.Prod[i, t])
-                for i in model.IU for t in model.T
-            )
-            transport_cost = sum(
-                trip_cost.get((i, j, m), 0) * value(model.Trips[i, j, m, t])
-                for (i, j, m) in model.ARCS for t in model.T
-            )
-            inventory_cost = sum(
-                SETTINGS["HOLDING_COST"] * value(model.Inv[n, t])
-                for n in model.N for t in model.T
-            )
+            # Calculate individual cost components (in original units)
+            n_t = len(model.T)
+            production_cost = (prod_cost * variable_values(model.Prod, (-1, n_t))).sum() * scaling["quantity"]
+            transport_cost = (trip_cost[:, None] * variable_values(model.Trips, (-1, n_t))).sum()
+            inventory_cost = settings["HOLDING_COST"] * variable_values(model.Inv, (-1, n_t)).sum() * scaling["quantity"]
+            unmet = variable_values(model.Unmet, (-1, n_t)).sum() * scaling["quantity"]
 
-            return {
+            response = {
                 "success": True,
                 "message": "Optimization completed successfully",
-                "objective_value": value(model.OBJ),
+                "objective_value": value(model.OBJ) * scaling["cost"],
                 "cost_breakdown": {
                     "production": round(float(production_cost), 2),
                     "transport": round(float(transport_cost), 2),
                     "inventory": round(float(inventory_cost), 2)
                 },
+                "unmet_demand": round(float(unmet), 2),
+                "solver": "CBC",
+                "solution": extract_solution(model, scaling, inputs["index"]),
+                "scaling": scaling,
+                "timings": {
+                    "build": round(build_time, 4),
+                    "solve": round(solve_time, 4)
+                },
                 "model": model
             }
+            if lazy_stats:
+                response["lazy_rows"] = lazy_stats
+            if inputs["compiled"].get("warnings"):
+                response["warnings"] = inputs["compiled"]["warnings"]
+            return response
 
         return {
             "success": False,
@@ -223,4 +512,4 @@ def run_clinker_optimization(file_path):
 # ==================================================
 # if __name__ == "__main__":
 #     response = run_clinker_optimization("data/dataset.xlsx")
-#     print(response["message"])
\ No newline at end of file
+#     print(response["message"])
@@ -0,0 +1,418 @@
+import heapq
+import math
+import time
+
+import numpy as np
+
+from backend.network_index import solution_arrays
+
+try:
+    from ortools.graph.python import min_cost_flow as _ortools_mcf
+except ImportError:  # optional: fall back to the pure-Python solver
+    _ortools_mcf = None
+
+
+# ==================================================
+# CONFIG
+# ==================================================
+# Residual capacity below this (tons) counts as saturated
+FLOW_EPS = 1e-7
+
+# Integer backends: keep |cost| x total flow comfortably inside int64
+_INT_BUDGET = 2 ** 60
+
+
+# ==================================================
+# TIME-EXPANDED GRAPH
+# ==================================================
+def build_time_expanded_graph(inputs: dict, settings: dict, penalty: float) -> dict:
+    """
+    Lay the Trips-relaxed clinker model out as a min-cost flow network.
+
+    Nodes are (node, period) pairs plus SRC (production / unmet supply)
+    and SINK (closing stock, shipments arriving after the horizon and
+    unused supply). Arcs:
+
+        SRC → (i, t)          production, cap = capacity, cost = prod cost
+        (i, t) → (j, t + lt)  lane, cap = max trips × trip cap,
+                              cost = trip cost / trip cap per ton
+        (n, t) → (n, t + 1)   inventory carry, cost = holding
+        (n, last) → SINK      closing inventory, cost = holding
+        SRC → (n, t)          unmet demand, cost = penalty
+        SRC → SINK            unused supply, cost 0
+
+    Demand is a fixed withdrawal at (n, t); opening stock a fixed
+    injection at (n, first). Compiled single-variable X / Inv bounds
+    become arc bounds; MinFulfill and aggregated rows are not
+    representable and are counted under "relaxed".
+
+    Returns:
+        dict: numpy arrays tail/head/lb/ub/cost, node supplies b, arc
+              kind labels, ref / ref_k (node or arc id, period
+              position) for mapping flows back to the model, and
+              "relaxed": {"min_fulfill", "rows"} counts of the rows
+              the full model has and this graph leaves out
+    """
+    index = inputs["index"]
+    n_t = len(inputs["T"])
+    n_n, n_iu = len(inputs["N"]), index["n_iu"]
+    SRC, SINK = n_n * n_t, n_n * n_t + 1
+    n_nodes = SINK + 1
+
+    compiled = inputs.get("compiled") or {"x_bounds": {}, "inv_bounds": {}, "rows": []}
+    holding = settings["HOLDING_COST"]
+    periods = np.arange(n_t)
+    parts = []
+
+    def arcs(kind, tail, head, lb, ub, cost, ref, ref_k):
+        size = len(ref)
+        parts.append({
+            "tail": np.broadcast_to(tail, size), "head": np.broadcast_to(head, size),
+            "lb": np.broadcast_to(lb, size).astype(float), "ub": np.broadcast_to(ub, size).astype(float),
+            "cost": np.broadcast_to(cost, size).astype(float),
+            "kind": np.full(size, kind), "ref": ref, "ref_k": ref_k,
+        })
+
+    # Production: one arc per (IU, period), nodes numbered n * n_t + k
+    i, k = np.repeat(np.arange(n_iu), n_t), np.tile(periods, n_iu)
+    arcs("prod", SRC, i * n_t + k, 0.0, inputs["prod_cap"].ravel(), inputs["prod_cost"].ravel(), i, k)
+
+    # Lanes (relaxed Trips: X ≤ cap × max_trips, cost per ton)
+    cap = inputs["trip_cap"]
+    usable = np.flatnonzero(cap > 0)
+    a, k = np.repeat(usable, n_t), np.tile(periods, len(usable))
+    lb = np.zeros(len(a))
+    ub = cap[a] * inputs["max_trips"][a, k]
+    position = np.full(len(cap), -1)
+    position[usable] = np.arange(len(usable)) * n_t
+    for (arc_id, period), (bound_lb, bound_ub) in compiled["x_bounds"].items():
+        p = position[arc_id]
+        if p < 0:
+            continue
+        lb[p + period] = bound_lb or 0.0
+        if bound_ub is not None:
+            ub[p + period] = min(ub[p + period], bound_ub)
+    arrive = k + inputs["lead_time"][a]
+    head = np.where(arrive < n_t, index["arc_to"][a] * n_t + arrive, SINK)
+    arcs("lane", index["arc_from"][a] * n_t + k, head, lb, ub, inputs["trip_cost"][a] / cap[a], a, k)
+
+    # Inventory carry + closing stock
+    n, k = np.repeat(np.arange(n_n), n_t), np.tile(periods, n_n)
+    lb, ub = np.zeros(len(n)), np.full(len(n), math.inf)
+    for (node, period), (bound_lb, bound_ub) in compiled["inv_bounds"].items():
+        lb[node * n_t + period] = bound_lb or 0.0
+        if bound_ub is not None:
+            ub[node * n_t + period] = bound_ub
+    arcs("inv", n * n_t + k, np.where(k + 1 < n_t, n * n_t + k + 1, SINK), lb, ub, holding, n, k)
+
+    # Unmet demand
+    arcs("unmet", SRC, n * n_t + k, 0.0, math.inf, float(penalty), n, k)
+
+    b = np.zeros(n_nodes)
+    b[:SRC] -= inputs["demand"].ravel()
+    b[np.arange(n_n) * n_t] += inputs["inv_open"]
+
+    # SRC can always cover all demand (via unmet) plus all production;
+    # whatever it does not send goes straight to SINK for free
+    total_prod = float(inputs["prod_cap"].sum())
+    total_demand = -b[b < 0].sum()
+    b[SRC] = total_demand + total_prod
+    b[SINK] = -(b[:SRC].sum() + b[SRC])
+    arcs("bypass", SRC, SINK, 0.0, math.inf, 0.0, np.array([-1]), np.array([-1]))
+
+    graph = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+    graph["tail"] = graph["tail"].astype(np.int64)
+    graph["head"] = graph["head"].astype(np.int64)
+    # MinFulfill rows that bind (some demand, a non-zero minimum)
+    min_fulfill = (
+        int(((inputs["demand"] > 0) & (inputs["min_fulfill"] > 0)).sum())
+        if settings.get("ENABLE_MIN_FULFILL", True) else 0
+    )
+    relaxed = {"min_fulfill": min_fulfill, "rows": len(compiled["rows"])}
+    return {**graph, "n_nodes": n_nodes, "b": b, "dropped_rows": len(compiled["rows"]), "relaxed": relaxed}
+
+
+# ==================================================
+# MIN-COST FLOW BACKENDS
+# ==================================================
+def min_cost_flow(n_nodes, tail, head, lb, ub, cost, b, backend="auto"):
+    """
+    Solve a min-cost flow with arc lower/upper bounds and node supplies.
+
+    Args:
+        backend (str): "ortools" (C++ SimpleMinCostFlow on integer tons),
+            "python" (primal-dual below) or "auto" = ortools if installed
+
+    Returns:
+        tuple: (flow per arc as numpy array, stats dict) or (None, stats)
+               if the supplies cannot be routed
+    """
+    if np.any(ub < lb - FLOW_EPS):
+        return None, {"backend": backend, "reason": "bound conflict"}
+
+    if backend == "auto":
+        backend = "ortools" if _ortools_mcf is not None else "python"
+    if backend == "ortools":
+        if _ortools_mcf is None:
+            raise ImportError("ortools is not installed; use backend='python'")
+        flow, stats = _min_cost_flow_ortools(n_nodes, tail, head, lb, ub, cost, b)
+    else:
+        flow, stats = _min_cost_flow_python(n_nodes, tail, head, lb, ub, cost, b)
+    stats["backend"] = backend
+    return flow, stats
+
+
+def _min_cost_flow_ortools(n_nodes, tail, head, lb, ub, cost, b):
+    """
+    OR-Tools SimpleMinCostFlow on the same arrays, in whole tons.
+
+    Supplies and capacities are rounded to tons and costs to a power of
+    ten resolution that keeps cost x flow inside int64; reported costs
+    are recomputed from the float costs, so only the rounding of the
+    flows themselves (≤ 0.5 t per node) is visible.
+    """
+    supply = b.copy()
+    np.subtract.at(supply, tail, lb)
+    np.add.at(supply, head, lb)
+    supply = np.rint(supply).astype(np.int64)
+    supply[-1] -= supply.sum()          # SINK absorbs rounding drift
+
+    total = int(np.abs(supply).sum()) + 1
+    cap = ub - lb
+    cap = np.where(np.isinf(cap), 2 * total, np.floor(cap + FLOW_EPS)).astype(np.int64)
+
+    max_cost = float(np.abs(cost).max(initial=1.0)) or 1.0
+    cost_res = 10.0 ** min(6, math.floor(math.log10(_INT_BUDGET / (max_cost * total))))
+    int_cost = np.rint(cost * cost_res).astype(np.int64)
+
+    mcf = _ortools_mcf.SimpleMinCostFlow()
+    arcs = mcf.add_arcs_with_capacity_and_unit_cost(tail, head, cap, int_cost)
+    mcf.set_nodes_supplies(np.arange(n_nodes), supply)
+    status = mcf.solve()
+    if status != mcf.OPTIMAL:
+        return None, {"reason": f"ortools status {status}"}
+    return mcf.flows(arcs).astype(float) + lb, {"cost_resolution": cost_res}
+
+
+def _min_cost_flow_python(n_nodes, tail, head, lb, ub, cost, b):
+    """
+    Successive shortest paths with Dijkstra on reduced costs, augmenting
+    a blocking flow on the zero-reduced-cost subgraph per phase.
+
+    All costs must be non-negative (true for the clinker network).
+    """
+    n_arcs = len(tail)
+
+    # Lower bounds: pre-send lb and shrink the arc
+    supply = b.copy()
+    np.subtract.at(supply, tail, lb)
+    np.add.at(supply, head, lb)
+    cap = ub - lb
+
+    # Super source / sink
+    S, Z = n_nodes, n_nodes + 1
+    src_nodes = np.flatnonzero(supply > FLOW_EPS)
+    snk_nodes = np.flatnonzero(supply < -FLOW_EPS)
+    all_tail = np.concatenate([tail, np.full(len(src_nodes), S), snk_nodes])
+    all_head = np.concatenate([head, src_nodes, np.full(len(snk_nodes), Z)])
+    all_cap = np.concatenate([cap, supply[src_nodes], -supply[snk_nodes]])
+    all_cost = np.concatenate([cost, np.zeros(len(src_nodes) + len(snk_nodes))])
+    required = supply[src_nodes].sum()
+
+    # Finite stand-in for infinite capacity
+    big = 2.0 * (required + np.abs(supply).sum()) + 1.0
+    all_cap = np.where(np.isinf(all_cap), big, all_cap)
+
+    # Residual graph: arc 2e forward, 2e+1 backward
+    m = len(all_tail)
+    n = n_nodes + 2
+    frm = np.empty(2 * m, dtype=np.int64); frm[0::2] = all_tail; frm[1::2] = all_head
+    to = np.empty(2 * m, dtype=np.int64); to[0::2] = all_head; to[1::2] = all_tail
+    rcap = np.zeros(2 * m); rcap[0::2] = all_cap
+    rcost = np.empty(2 * m); rcost[0::2] = all_cost; rcost[1::2] = -all_cost
+
+    order = np.argsort(frm, kind="stable")
+    start = np.searchsorted(frm[order], np.arange(n + 1)).tolist()
+    adj = order.tolist()
+    frm_l, to_l = frm.tolist(), to.tolist()
+    rcap_l, rcost_l = rcap.tolist(), rcost.tolist()
+    tol = 1e-9 * max(1.0, float(np.abs(all_cost).max(initial=0.0)))
+
+    pi = [0.0] * n
+    INF = math.inf
+    sent, phases, augmentations = 0.0, 0, 0
+
+    while required - sent > FLOW_EPS:
+        # Dijkstra on reduced costs, stopping once Z is settled
+        dist = [INF] * n
+        dist[S] = 0.0
+        done = [False] * n
+        heap = [(0.0, S)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if done[u]:
+                continue
+            done[u] = True
+            if u == Z:
+                break
+            pu = pi[u]
+            for k in range(start[u], start[u + 1]):
+                e = adj[k]
+                if rcap_l[e] > FLOW_EPS:
+                    v = to_l[e]
+                    nd = d + rcost_l[e] + pu - pi[v]
+                    if nd < dist[v]:
+                        dist[v] = nd
+                        heapq.heappush(heap, (nd, v))
+        if dist[Z] == INF:
+            break
+        dz = dist[Z]
+        for v in range(n):
+            pi[v] += dist[v] if dist[v] < dz else dz
+        phases += 1
+
+        # Blocking flows on the admissible (zero reduced cost) subgraph
+        while True:
+            level = [-1] * n
+            level[S] = 0
+            queue = [S]
+            for u in queue:
+                pu = pi[u]
+                for k in range(start[u], start[u + 1]):
+                    e = adj[k]
+                    v = to_l[e]
+                    if level[v] < 0 and rcap_l[e] > FLOW_EPS and rcost_l[e] + pu - pi[v] <= tol:
+                        level[v] = level[u] + 1
+                        queue.append(v)
+            if level[Z] < 0:
+                break
+
+            it = start[:-1]
+            path = []
+            u = S
+            while True:
+                if u == Z:
+                    f = min(rcap_l[e] for e in path)
+                    for e in path:
+                        rcap_l[e] -= f
+                        rcap_l[e ^ 1] += f
+                    sent += f
+                    augmentations += 1
+                    # Back up to the tail of the first saturated arc
+                    for pos, e in enumerate(path):
+                        if rcap_l[e] <= FLOW_EPS:
+                            u = frm_l[e]
+                            del path[pos:]
+                            break
+                    continue
+
+                end = start[u + 1]
+                pu = pi[u]
+                while it[u] < end:
+                    e = adj[it[u]]
+                    v = to_l[e]
+                    if (level[v] == level[u] + 1 and rcap_l[e] > FLOW_EPS
+                            and rcost_l[e] + pu - pi[v] <= tol):
+                        break
+                    it[u] += 1
+                if it[u] < end:
+                    e = adj[it[u]]
+                    path.append(e)
+                    u = to_l[e]
+                else:
+                    level[u] = -1
+                    if u == S:
+                        break
+                    e = path.pop()
+                    u = frm_l[e]
+                    it[u] += 1
+
+    stats = {"phases": phases, "augmentations": augmentations}
+    if required - sent > max(FLOW_EPS, 1e-9 * required):
+        stats["reason"] = "supply could not be routed"
+        return None, stats
+
+    flow = all_cap[:n_arcs] - np.array(rcap_l[0:2 * n_arcs:2])
+    return flow + lb, stats
+
+
+# ==================================================
+# ENTRY POINT
+# ==================================================
+def solve_network_relaxation(inputs: dict, settings: dict, scaling: dict) -> dict:
+    """
+    Solve the Trips-relaxed clinker model as a min-cost network flow.
+
+    MinFulfill and aggregated LaneLimit rows are side constraints, not
+    network structure, so they are left out; the objective is therefore
+    a valid lower bound on the full MIP and equals the Pyomo LP
+    relaxation with those rows disabled. How many were left out is
+    returned under "relaxed", so a caller can tell the plan ignores them.
+
+    Args:
+        inputs (dict): Output of model.prepare_inputs
+        settings (dict): Model settings
+        scaling (dict): Output of scaling.compute_scaling (for the penalty)
+
+    Returns:
+        dict: success, objective_value, cost_breakdown, unmet_demand,
+              solution (id arrays, tons), relaxed ({"min_fulfill",
+              "rows"} left out) and engine stats
+    """
+    start_time = time.perf_counter()
+    graph = build_time_expanded_graph(inputs, settings, scaling["unmet_penalty"])
+    build_time = time.perf_counter() - start_time
+
+    solve_start = time.perf_counter()
+    flow, stats = min_cost_flow(
+        graph["n_nodes"], graph["tail"], graph["head"],
+        graph["lb"], graph["ub"], graph["cost"], graph["b"],
+        backend=settings.get("NETWORK_BACKEND", "auto"),
+    )
+    solve_time = time.perf_counter() - solve_start
+
+    stats.update({
+        "nodes": int(graph["n_nodes"]),
+        "arcs": int(len(graph["tail"])),
+        "dropped_rows": graph["dropped_rows"],
+    })
+    if flow is None:
+        return {
+            "success": False,
+            "message": f"Network flow failed: {stats.get('reason')}",
+            "model": None,
+        }
+
+    kind, ref, ref_k, cost = graph["kind"], graph["ref"], graph["ref_k"], graph["cost"]
+    arc_cost = flow * cost
+    used = flow > 0.01
+
+    def picked(name):
+        rows = np.flatnonzero(used & (kind == name))
+        return ref[rows], ref_k[rows], flow[rows]
+
+    arc, period, qty = picked("lane")
+    trips = np.ceil(qty / inputs["trip_cap"][arc] - 1e-9)
+    unmet = float(flow[used & (kind == "unmet")].sum())
+
+    return {
+        "success": True,
+        "message": "Network relaxation solved",
+        "objective_value": float(arc_cost.sum()),
+        "cost_breakdown": {
+            "production": round(float(arc_cost[kind == "prod"].sum()), 2),
+            "transport": round(float(arc_cost[kind == "lane"].sum()), 2),
+            "inventory": round(float(arc_cost[kind == "inv"].sum()), 2),
+        },
+        "unmet_demand": round(unmet, 2),
+        "relaxed": graph["relaxed"],
+        "solution": solution_arrays(
+            inputs["index"], picked("prod"), (arc, period, qty, trips), picked("inv"),
+        ),
+        "network": stats,
+        "timings": {
+            "build": round(build_time, 4),
+            "solve": round(solve_time, 4),
+        },
+        "model": None,
+    }
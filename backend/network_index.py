@@ -0,0 +1,206 @@
+import numpy as np
+import pandas as pd
+
+
+# ==================================================
+# CONFIG
+# ==================================================
+# Node / mode / arc ids and period positions
+ID_DTYPE = np.int32
+PERIOD_DTYPE = np.int16
+
+# Solution tables and their id columns (decoded through codes[kind])
+SOLUTION_COLUMNS = {
+    "production": {"node": "node", "period": "period"},
+    "shipments": {"from": "node", "to": "node", "mode": "mode", "period": "period"},
+    "inventory": {"node": "node", "period": "period"},
+}
+
+
+# ==================================================
+# INTERNING
+# ==================================================
+def intern(values, categories) -> np.ndarray:
+    """Position of each value in categories, -1 where it is not one"""
+    return pd.Categorical(values, categories=categories).codes.astype(ID_DTYPE)
+
+
+def build_index(iu_codes: list, gu_codes: list, periods: list, lanes: pd.DataFrame) -> dict:
+    """
+    Intern the network's codes once, at ingest.
+
+    Nodes are numbered IUs first (so an id below n_iu is a plant),
+    modes in sorted order and periods by position in periods. Lanes
+    from an IU to another node become arcs; a lane listed more than
+    once keeps its last row, and arcs are sorted by (from, to, mode).
+
+    Args:
+        iu_codes (list): IU codes
+        gu_codes (list): GU codes
+        periods (list): Sorted period values
+        lanes (DataFrame): LogisticsIUGU with cleaned codes
+
+    Returns:
+        dict: {"nodes", "modes" (code arrays), "periods", "n_iu",
+               "arc_from", "arc_to", "arc_mode" (id arrays),
+               "arc_rows" (row of lanes each arc was read from)}
+    """
+    ius = list(dict.fromkeys(iu_codes))
+    nodes = ius + [g for g in dict.fromkeys(gu_codes) if g not in set(ius)]
+    nodes = np.array(nodes, dtype=object)
+
+    src = intern(lanes["FROM IU CODE"], nodes[:len(ius)])
+    dst = intern(lanes["TO IUGU CODE"], nodes)
+    valid = (src >= 0) & (dst >= 0) & (src != dst)
+    modes = np.array(sorted(set(lanes["TRANSPORT CODE"][valid])), dtype=object)
+    mode = intern(lanes["TRANSPORT CODE"], modes)
+
+    arcs = pd.DataFrame({"from": src, "to": dst, "mode": mode, "row": np.arange(len(lanes))})[valid]
+    arcs = arcs.drop_duplicates(["from", "to", "mode"], keep="last").sort_values(["from", "to", "mode"])
+    return {
+        "nodes": nodes,
+        "modes": modes,
+        "periods": list(periods),
+        "n_iu": len(ius),
+        "arc_from": arcs["from"].to_numpy(ID_DTYPE),
+        "arc_to": arcs["to"].to_numpy(ID_DTYPE),
+        "arc_mode": arcs["mode"].to_numpy(ID_DTYPE),
+        "arc_rows": arcs["row"].to_numpy(),
+    }
+
+
+def grid(df: pd.DataFrame, code_column: str, codes, periods: list, value) -> np.ndarray:
+    """
+    A (code, period) parameter as a dense array of shape (codes, periods)
+
+    Rows for unknown codes or periods are ignored, blanks are 0 and a
+    repeated (code, period) keeps its last row, like the keyed dicts
+    this replaces.
+    """
+    out = np.zeros((len(codes), len(periods)))
+    rows = intern(df[code_column], codes)
+    cols = intern(df["TIME PERIOD"], periods)
+    values = (value(df) if callable(value) else df[value]).fillna(0).to_numpy(float)
+    keep = (rows >= 0) & (cols >= 0)
+    frame = pd.DataFrame({"r": rows[keep], "c": cols[keep], "v": values[keep]})
+    frame = frame.drop_duplicates(["r", "c"], keep="last")
+    out[frame["r"].to_numpy(), frame["c"].to_numpy()] = frame["v"].to_numpy()
+    return out
+
+
+def vector(df: pd.DataFrame, code_column: str, codes, value_column: str) -> np.ndarray:
+    """A per-code parameter as an array over codes (0 where missing)"""
+    out = np.zeros(len(codes))
+    rows = intern(df[code_column], codes)
+    keep = rows >= 0
+    frame = pd.DataFrame({"r": rows[keep], "v": df[value_column].fillna(0).to_numpy(float)[keep]})
+    frame = frame.drop_duplicates("r", keep="last")
+    out[frame["r"].to_numpy()] = frame["v"].to_numpy()
+    return out
+
+
+def arc_lookup(index: dict) -> dict:
+    """{(from code, to code, mode code): arc id}, for the few callers keyed by codes"""
+    keys = zip(
+        index["nodes"][index["arc_from"]], index["nodes"][index["arc_to"]], index["modes"][index["arc_mode"]],
+    )
+    return dict(zip(keys, range(len(index["arc_from"]))))
+
+
+# ==================================================
+# SOLUTIONS
+# ==================================================
+def codes(index: dict) -> dict:
+    """Code tables a solution's ids decode through"""
+    return {
+        "node": index["nodes"].tolist(),
+        "mode": index["modes"].tolist(),
+        "period": [str(t) for t in index["periods"]],
+    }
+
+
+def solution_arrays(index: dict, production: tuple, shipments: tuple, inventory: tuple) -> dict:
+    """
+    A solution as id arrays plus the code tables to decode them
+
+    Args:
+        production: (node ids, period positions, tons)
+        shipments: (arc ids, period positions, tons, trips)
+        inventory: (node ids, period positions, tons)
+    """
+    node, period, qty = production
+    arc, ship_period, ship_qty, trips = shipments
+    inv_node, inv_period, inv_qty = inventory
+    return {
+        "production": {
+            "node": node.astype(ID_DTYPE), "period": period.astype(PERIOD_DTYPE),
+            "quantity": np.round(qty, 2),
+        },
+        "shipments": {
+            "from": index["arc_from"][arc], "to": index["arc_to"][arc], "mode": index["arc_mode"][arc],
+            "period": ship_period.astype(PERIOD_DTYPE),
+            "quantity": np.round(ship_qty, 2), "trips": trips.astype(np.int64),
+        },
+        "inventory": {
+            "node": inv_node.astype(ID_DTYPE), "period": inv_period.astype(PERIOD_DTYPE),
+            "quantity": np.round(inv_qty, 2),
+        },
+        "codes": codes(index),
+        "num_nodes": len(index["nodes"]),
+        "num_periods": len(index["periods"]),
+    }
+
+
+def encode_records(index: dict, production: list, shipments: list, inventory: list) -> dict:
+    """
+    Records keyed by codes (period as str) into a solution over index
+
+    Used where a plan is stitched together from solves over different
+    indexes (see hierarchical).
+    """
+    table = codes(index)
+
+    def ids(records, column, kind):
+        return intern([r[column] for r in records], table[kind])
+
+    def column(records, name, dtype=float):
+        return np.array([r[name] for r in records], dtype=dtype)
+
+    return {
+        "production": {
+            "node": ids(production, "node", "node"), "period": ids(production, "period", "period").astype(PERIOD_DTYPE),
+            "quantity": column(production, "quantity"),
+        },
+        "shipments": {
+            "from": ids(shipments, "from", "node"), "to": ids(shipments, "to", "node"),
+            "mode": ids(shipments, "mode", "mode"),
+            "period": ids(shipments, "period", "period").astype(PERIOD_DTYPE),
+            "quantity": column(shipments, "quantity"), "trips": column(shipments, "trips", np.int64),
+        },
+        "inventory": {
+            "node": ids(inventory, "node", "node"), "period": ids(inventory, "period", "period").astype(PERIOD_DTYPE),
+            "quantity": column(inventory, "quantity"),
+        },
+        "codes": table,
+        "num_nodes": len(index["nodes"]),
+        "num_periods": len(index["periods"]),
+    }
+
+
+def decode_solution(solution: dict) -> dict:
+    """
+    Id arrays back to records keyed by codes: the /optimize shape.
+
+    Only called at the API boundary (and where a plan is stitched from
+    several solves); everything before works on ids.
+    """
+    table = {kind: np.array(values, dtype=object) for kind, values in solution["codes"].items()}
+    out = {"num_nodes": solution["num_nodes"], "num_periods": solution["num_periods"]}
+    for name, id_columns in SOLUTION_COLUMNS.items():
+        arrays = solution[name]
+        columns = {
+            column: table[id_columns[column]][values].tolist() if column in id_columns else values.tolist()
+            for column, values in arrays.items()
+        }
+        out[name] = [dict(zip(columns, row)) for row in zip(*columns.values())]
+    return out
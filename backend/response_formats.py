@@ -0,0 +1,210 @@
+import gzip
+
+import orjson
+from fastapi import Response
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:  # optional: msgpack format unavailable
+    msgpack = None
+
+
+# ==================================================
+# CONFIG
+# ==================================================
+MEDIA_TYPES = {
+    "json": "application/json",
+    "columnar": "application/vnd.clinker.columnar+json",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "msgpack": "application/msgpack",
+}
+
+# Other spellings clients send for the same formats
+_ALIASES = {
+    "application/x-msgpack": "msgpack",
+    "application/vnd.msgpack": "msgpack",
+}
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 1024
+
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 5
+
+# Record tables in an /optimize response and their string columns
+TABLES = {
+    "production": ["node", "period"],
+    "shipments": ["from", "to", "mode", "period"],
+    "inventory": ["node", "period"],
+}
+
+# String columns sharing one code dictionary
+_DICTIONARY = {"node": "nodes", "from": "nodes", "to": "nodes", "mode": "modes", "period": "periods"}
+
+
+# ==================================================
+# NEGOTIATION
+# ==================================================
+def available_formats() -> list:
+    formats = ["json", "columnar", "arrow"]
+    if msgpack is not None:
+        formats.append("msgpack")
+    return formats
+
+
+def negotiate_format(accept: str = None, explicit: str = None) -> str:
+    """
+    Pick the response format.
+
+    An explicit ?format= wins; otherwise the first supported media type
+    in the Accept header (in order, ignoring q-values); otherwise JSON.
+
+    Raises:
+        ValueError: if an explicit format is not supported
+    """
+    if explicit:
+        if explicit not in available_formats():
+            raise ValueError(
+                f"Unsupported format '{explicit}'; expected one of {', '.join(available_formats())}"
+            )
+        return explicit
+
+    by_type = {media: name for name, media in MEDIA_TYPES.items()}
+    by_type.update(_ALIASES)
+    for part in (accept or "").split(","):
+        media = part.split(";", 1)[0].strip().lower()
+        name = by_type.get(media)
+        if name in available_formats():
+            return name
+    return "json"
+
+
+def negotiate_encoding(accept_encoding: str = None) -> str:
+    """"br" if offered and brotli is installed, else "gzip" if offered, else None"""
+    offered = {p.split(";", 1)[0].strip().lower() for p in (accept_encoding or "").split(",")}
+    if "br" in offered and brotli is not None:
+        return "br"
+    if "gzip" in offered:
+        return "gzip"
+    return None
+
+
+# ==================================================
+# ENCODERS
+# ==================================================
+def to_columnar(response: dict) -> dict:
+    """
+    Column-per-field tables with dictionary-encoded codes.
+
+    String columns hold integer indexes into response["dictionary"]
+    (nodes, modes, periods), so each code is sent once instead of once
+    per row. Other keys are copied unchanged.
+    """
+    dictionary = {"nodes": {}, "modes": {}, "periods": {}}
+    out = {k: v for k, v in response.items() if k not in TABLES}
+    out["format"] = "columnar"
+
+    for table, string_cols in TABLES.items():
+        records = response.get(table) or []
+        if not records:
+            out[table] = {"length": 0}
+            continue
+        columns = {"length": len(records)}
+        for col in records[0]:
+            values = [rec[col] for rec in records]
+            if col in string_cols:
+                index = dictionary[_DICTIONARY[col]]
+                values = [index.setdefault(v, len(index)) for v in values]
+            columns[col] = values
+        out[table] = columns
+
+    out["dictionary"] = {name: list(index) for name, index in dictionary.items()}
+    return out
+
+
+def to_arrow_ipc(response: dict) -> bytes:
+    """
+    One Arrow IPC stream with all three tables stacked.
+
+    Columns: table, node (shipment origin for shipments), to, mode,
+    period (dictionary-encoded), quantity, trips. Scalar fields
+    (status, costs, summary…) travel as JSON in the schema metadata
+    under b"response".
+    """
+    import pyarrow as pa
+
+    cols = {name: [] for name in ("table", "node", "to", "mode", "period", "quantity", "trips")}
+    for table in TABLES:
+        for rec in response.get(table) or []:
+            cols["table"].append(table)
+            cols["node"].append(rec.get("node", rec.get("from")))
+            cols["to"].append(rec.get("to"))
+            cols["mode"].append(rec.get("mode"))
+            cols["period"].append(rec.get("period"))
+            cols["quantity"].append(rec.get("quantity"))
+            cols["trips"].append(rec.get("trips"))
+
+    codes = pa.dictionary(pa.int32(), pa.string())
+    schema = pa.schema(
+        [
+            ("table", codes), ("node", codes), ("to", codes), ("mode", codes), ("period", codes),
+            ("quantity", pa.float64()), ("trips", pa.int64()),
+        ],
+        metadata={b"response": orjson.dumps({k: v for k, v in response.items() if k not in TABLES})},
+    )
+    data = pa.table(cols, schema=schema)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        writer.write_table(data)
+    return sink.getvalue().to_pybytes()
+
+
+def encode(response: dict, fmt: str) -> bytes:
+    if fmt == "columnar":
+        return orjson.dumps(to_columnar(response), option=orjson.OPT_SERIALIZE_NUMPY)
+    if fmt == "msgpack":
+        return msgpack.packb(to_columnar(response), use_bin_type=True)
+    if fmt == "arrow":
+        return to_arrow_ipc(response)
+    return orjson.dumps(response, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return body
+
+
+# ==================================================
+# RESPONSE
+# ==================================================
+def render(response: dict, headers, fmt: str = None) -> Response:
+    """
+    Serialize a result dict in the negotiated format and encoding.
+
+    Args:
+        response (dict): JSON-compatible result (records as lists of dicts)
+        headers: Request headers (Accept, Accept-Encoding)
+        fmt (str): Explicit format from ?format=, overrides Accept
+
+    Raises:
+        ValueError: if fmt is not a supported format
+    """
+    fmt = negotiate_format(headers.get("accept"), fmt)
+    body = encode(response, fmt)
+
+    out_headers = {"Vary": "Accept, Accept-Encoding"}
+    encoding = negotiate_encoding(headers.get("accept-encoding"))
+    if encoding and len(body) >= MIN_COMPRESS_BYTES:
+        body = compress(body, encoding)
+        out_headers["Content-Encoding"] = encoding
+
+    return Response(content=body, media_type=MEDIA_TYPES[fmt], headers=out_headers)
@@ -0,0 +1,111 @@
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from backend.solution_archive import SCHEMAS, scan
+
+
+# ==================================================
+# CONFIG
+# ==================================================
+# Join keys per archived table
+KEYS = {
+    "production": ["node", "period"],
+    "shipments": ["from", "to", "mode", "period"],
+    "inventory": ["node", "period"],
+}
+
+# Quantity changes smaller than this (tons) are rounding, not changes
+MIN_DELTA = 0.01
+
+
+# ==================================================
+# TABLE DIFF
+# ==================================================
+def _load(archive_dir: str, table: str, run_id: int) -> pa.Table:
+    keys = KEYS[table]
+    values = [c for c in SCHEMAS[table].names if c not in keys]
+    data = scan(archive_dir, table, SCHEMAS[table].names, run_ids=[run_id])
+    # Duplicate keys (shouldn't happen) are summed so the join stays 1:1
+    grouped = data.group_by(keys).aggregate([(c, "sum") for c in values])
+    return grouped.select(keys + [f"{c}_sum" for c in values]).rename_columns(keys + values)
+
+
+def diff_table(archive_dir: str, table: str, run_a: int, run_b: int,
+               top: int = 20, min_delta: float = MIN_DELTA) -> dict:
+    """
+    Full outer join of one table between two runs, ranked by |Δ quantity|.
+
+    Rows only in a are "removed", only in b "added"; missing quantities
+    count as 0. Everything is Arrow compute, no per-row Python.
+
+    Returns:
+        dict: counts of changed / added / removed rows, total tons moved
+              (Σ|Δ|), net Δ and the top rows by |Δ|
+    """
+    keys = KEYS[table]
+    a = _load(archive_dir, table, run_a)
+    b = _load(archive_dir, table, run_b)
+    joined = a.join(b, keys=keys, join_type="full outer",
+                    left_suffix="_a", right_suffix="_b", coalesce_keys=True)
+
+    qty_a = pc.fill_null(joined["quantity_a"], 0.0)
+    qty_b = pc.fill_null(joined["quantity_b"], 0.0)
+    delta = pc.subtract(qty_b, qty_a)
+    magnitude = pc.abs(delta)
+    changed = pc.greater_equal(magnitude, min_delta)
+
+    out = {name: joined[name] for name in keys}
+    out.update({"quantity_a": qty_a, "quantity_b": qty_b, "delta": delta})
+    if "trips" in SCHEMAS[table].names:
+        trips_a = pc.fill_null(joined["trips_a"], 0)
+        trips_b = pc.fill_null(joined["trips_b"], 0)
+        out.update({"trips_a": trips_a, "trips_b": trips_b, "trips_delta": pc.subtract(trips_b, trips_a)})
+    out["magnitude"] = magnitude
+    rows = pa.table(out).filter(changed)
+
+    ranked = rows.sort_by([("magnitude", "descending")]).slice(0, top).drop_columns(["magnitude"])
+    return {
+        "changed": rows.num_rows,
+        "added": int(pc.sum(pc.and_(changed, pc.is_null(joined["quantity_a"]))).as_py() or 0),
+        "removed": int(pc.sum(pc.and_(changed, pc.is_null(joined["quantity_b"]))).as_py() or 0),
+        "tons_moved": round(float(pc.sum(rows["magnitude"]).as_py() or 0.0), 2),
+        "net_delta": round(float(pc.sum(rows["delta"]).as_py() or 0.0), 2),
+        "top": ranked.to_pylist(),
+    }
+
+
+# ==================================================
+# RUN DIFF
+# ==================================================
+def diff_runs(archive_dir: str, run_a: dict, run_b: dict, top: int = 20,
+              min_delta: float = MIN_DELTA) -> dict:
+    """
+    Compare two archived runs (b − a).
+
+    Args:
+        archive_dir (str): Archive root
+        run_a (dict): History record of the baseline run
+        run_b (dict): History record of the compared run
+        top (int): Rows to return per table, largest |Δ| first
+
+    Returns:
+        dict: cost deltas by component and per-table diffs
+    """
+    costs_a = run_a.get("cost_breakdown") or {}
+    costs_b = run_b.get("cost_breakdown") or {}
+    cost_delta = {
+        k: round((costs_b.get(k) or 0) - (costs_a.get(k) or 0), 2)
+        for k in ("production", "transport", "inventory")
+    }
+    if run_a.get("objective_value") is not None and run_b.get("objective_value") is not None:
+        cost_delta["objective"] = round(run_b["objective_value"] - run_a["objective_value"], 2)
+
+    return {
+        "a": run_a["id"],
+        "b": run_b["id"],
+        "cost_delta": cost_delta,
+        **{
+            table: diff_table(archive_dir, table, run_a["id"], run_b["id"], top, min_delta)
+            for table in KEYS
+        },
+    }
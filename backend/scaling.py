@@ -0,0 +1,83 @@
+import math
+
+import numpy as np
+
+
+# ==================================================
+# SCALING HELPERS
+# ==================================================
+def _power_of_ten(x: float) -> float:
+    """Nearest power of ten, so scaling never introduces rounding noise"""
+    return float(10 ** round(math.log10(x)))
+
+
+def choose_unmet_penalty(inputs: dict, settings: dict) -> float:
+    """
+    Derive the unmet-demand penalty (per ton) from the data.
+
+    The penalty must beat the most expensive way of serving a ton:
+    the priciest production, one whole trip on the priciest lane (a
+    single ton may need a full trip) and holding it over the horizon.
+    UNMET_PENALTY_FACTOR adds headroom for multi-leg routes.
+
+    Args:
+        inputs (dict): Output of model.prepare_inputs
+        settings (dict): Model settings
+
+    Returns:
+        float: Penalty per ton of unmet demand
+    """
+    max_prod_cost = float(np.max(inputs["prod_cost"], initial=0))
+    max_trip_cost = float(np.max(inputs["trip_cost"], initial=0))
+    max_holding = settings["HOLDING_COST"] * len(inputs["T"])
+
+    worst_served_ton = max_prod_cost + max_trip_cost + max_holding
+    if worst_served_ton <= 0:
+        return float(settings["UNMET_PENALTY"])
+
+    # Two significant digits keeps the coefficient tidy in LP files
+    penalty = settings["UNMET_PENALTY_FACTOR"] * worst_served_ton
+    magnitude = 10 ** (math.floor(math.log10(penalty)) - 1)
+    return float(math.ceil(penalty / magnitude) * magnitude)
+
+
+def compute_scaling(inputs: dict, settings: dict) -> dict:
+    """
+    Pick quantity and cost scales for the model build.
+
+    Quantities are divided by QUANTITY_SCALE (tons → kilotons by default)
+    and objective coefficients by a power of ten close to the median
+    scaled cost coefficient, so CBC sees values near 1 instead of a
+    spread from 0.5 to 10^7.
+
+    Args:
+        inputs (dict): Output of model.prepare_inputs
+        settings (dict): Model settings
+
+    Returns:
+        dict: {"quantity", "cost", "unmet_penalty"}; multiply model
+              quantities by "quantity" and the objective by "cost" to
+              get back to tons and currency
+    """
+    if not settings.get("ENABLE_SCALING", False):
+        return {
+            "quantity": 1.0,
+            "cost": 1.0,
+            "unmet_penalty": float(settings["UNMET_PENALTY"]),
+        }
+
+    q = float(settings["QUANTITY_SCALE"])
+    if settings.get("AUTO_UNMET_PENALTY", False):
+        penalty = choose_unmet_penalty(inputs, settings)
+    else:
+        penalty = float(settings["UNMET_PENALTY"])
+
+    prod_cost, trip_cost = np.ravel(inputs["prod_cost"]), np.ravel(inputs["trip_cost"])
+    coefficients = np.concatenate([np.abs(prod_cost[prod_cost != 0]) * q, np.abs(trip_cost[trip_cost != 0])])
+    cost = _power_of_ten(float(np.median(coefficients))) if coefficients.size else 1.0
+
+    return {
+        "quantity": q,
+        "cost": cost,
+        "unmet_penalty": penalty,
+    }
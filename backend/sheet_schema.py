@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+
+
+# ==================================================
+# CONFIG
+# ==================================================
+# Column kinds:
+#   code     stripped strings as a categorical (a few distinct codes, many rows)
+#   period   whole numbers as int16
+#   lag      whole numbers of periods as nullable Int16 (blank = default)
+#   rate     float32: costs per ton / trip, multipliers, percentages
+#   tons     float64: quantities summed in balance rows keep full precision
+CODE, PERIOD, LAG, RATE, TONS = "code", "period", "lag", "rate", "tons"
+
+DTYPES = {PERIOD: np.int16, LAG: pd.Int16Dtype(), RATE: np.float32, TONS: np.float64}
+
+SHEET_SCHEMAS = {
+    "ClinkerDemand": {
+        "IUGU CODE": CODE, "TIME PERIOD": PERIOD, "DEMAND": TONS, "MIN FULFILLMENT (%)": RATE,
+    },
+    "ClinkerCapacity": {
+        "IU CODE": CODE, "TIME PERIOD": PERIOD, "CAPACITY": TONS,
+    },
+    "ProductionCost": {
+        "IU CODE": CODE, "TIME PERIOD": PERIOD, "PRODUCTION COST": RATE,
+    },
+    "LogisticsIUGU": {
+        "FROM IU CODE": CODE, "TO IUGU CODE": CODE, "TRANSPORT CODE": CODE, "TIME PERIOD": PERIOD,
+        "FREIGHT COST": RATE, "HANDLING COST": RATE, "QUANTITY MULTIPLIER": RATE, "LEAD TIME": LAG,
+    },
+    "IUGUOpeningStock": {
+        "IUGU CODE": CODE, "OPENING STOCK": TONS,
+    },
+    "IUGUType": {
+        "IUGU CODE": CODE, "PLANT TYPE": CODE,
+    },
+    "IUGUConstraint": {
+        "IU CODE": CODE, "TRANSPORT CODE": CODE, "IUGU CODE": CODE, "TIME PERIOD": PERIOD,
+        "BOUND TYPEID": CODE, "VALUE TYPEID": CODE, "Value": TONS,
+    },
+    "IUGUClosingStock": {
+        "IUGU CODE": CODE, "TIME PERIOD": PERIOD, "MIN CLOSE STOCK": TONS, "MAX CLOSE STOCK": TONS,
+    },
+}
+
+# Spreadsheet row of the first data row (row 1 is the header)
+FIRST_ROW = 2
+
+
+# ==================================================
+# COLUMN TYPES
+# ==================================================
+def _codes(series: pd.Series) -> pd.Categorical:
+    """
+    Codes as a stripped categorical. Codes arrive with stray spaces and
+    as numbers; blanks become "nan", as str() made them before. Work is
+    per distinct value, not per row.
+    """
+    positions, uniques = pd.factorize(series, use_na_sentinel=False)
+    labels, categories = pd.factorize(pd.Index(uniques).astype(str).str.strip())
+    return pd.Categorical.from_codes(labels[positions], categories=categories)
+
+
+def _bad_value(sheet: str, column: str, series: pd.Series, bad: np.ndarray, expected: str) -> ValueError:
+    row = int(np.flatnonzero(bad)[0])
+    value = series.iloc[row]
+    if isinstance(value, np.generic):
+        value = value.item()
+    return ValueError(
+        f"{sheet}: column '{column}' must be {expected}; row {row + FIRST_ROW} has "
+        f"{value!r} ({int(bad.sum())} bad value(s))"
+    )
+
+
+def _numbers(sheet: str, column: str, series: pd.Series, kind: str) -> np.ndarray:
+    numbers = pd.to_numeric(series, errors="coerce").to_numpy(np.float64)
+    bad = np.isnan(numbers) & series.notna().to_numpy()
+    if bad.any():
+        raise _bad_value(sheet, column, series, bad, "numeric")
+    if kind in (PERIOD, LAG):
+        limit = np.iinfo(np.int16).max
+        with np.errstate(invalid="ignore"):
+            bad = ~((numbers == np.round(numbers)) & (numbers >= 0) & (numbers <= limit))
+        if kind == LAG:
+            bad &= ~np.isnan(numbers)
+        if bad.any():
+            raise _bad_value(sheet, column, series, bad, f"a whole number from 0 to {limit}")
+    if kind == LAG:
+        return pd.array(numbers, dtype="Float64").astype(DTYPES[LAG])
+    return numbers.astype(DTYPES[kind])
+
+
+# ==================================================
+# CORE FUNCTION
+# ==================================================
+def apply_schema(sheet: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast a sheet's columns to their types in SHEET_SCHEMAS, in place.
+
+    Columns already of their type are left alone, so typed sheets pass
+    through for free. Columns the schema does not list, and sheets it
+    does not know, are untouched; a listed column that is missing is
+    left for the code that reads it to report.
+
+    Args:
+        sheet (str): Sheet name
+        df (DataFrame): The sheet as read
+
+    Returns:
+        DataFrame: df
+
+    Raises:
+        ValueError: if a numeric column holds text, a period is blank,
+                    fractional or out of range, or a lag is fractional
+                    or out of range
+    """
+    for column, kind in SHEET_SCHEMAS.get(sheet, {}).items():
+        if column not in df:
+            continue
+        series = df[column]
+        if kind == CODE:
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                df[column] = _codes(series)
+        elif series.dtype != DTYPES[kind]:
+            df[column] = _numbers(sheet, column, series, kind)
+    return df
+
+
+def memory_mb(sheets: dict) -> float:
+    """In-memory size of the sheets, object strings included"""
+    return sum(int(df.memory_usage(deep=True).sum()) for df in sheets.values()) / (1024 * 1024)
@@ -0,0 +1,314 @@
+import os
+import shutil
+import tempfile
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+
+# ==================================================
+# CONFIG
+# ==================================================
+# One Parquet partition per run and table: <dir>/<table>/run_id=<id>/
+# Periods are whole numbers (int16, as typed at ingest) so they sort
+# numerically; partitions written with string periods are cast on read.
+SCHEMAS = {
+    "production": pa.schema([
+        ("node", pa.string()),
+        ("period", pa.int16()),
+        ("quantity", pa.float64()),
+    ]),
+    "shipments": pa.schema([
+        ("from", pa.string()),
+        ("to", pa.string()),
+        ("mode", pa.string()),
+        ("period", pa.int16()),
+        ("quantity", pa.float64()),
+        ("trips", pa.int64()),
+    ]),
+    "inventory": pa.schema([
+        ("node", pa.string()),
+        ("period", pa.int16()),
+        ("quantity", pa.float64()),
+    ]),
+}
+
+COMPRESSION = "zstd"
+
+# How per-run totals are combined across runs
+AGGREGATIONS = ("sum", "mean", "min", "max", "range", "stddev", "count")
+
+_PARTITION_SCHEMA = pa.schema([("run_id", pa.int64())])
+
+
+def _datasets():
+    """pyarrow.dataset, imported on first read: it loads pandas, which the API starts without"""
+    import pyarrow.dataset as ds
+    return ds
+
+
+# ==================================================
+# WRITE
+# ==================================================
+def write_run(archive_dir: str, run_id: int, solution: dict) -> None:
+    """
+    Store a run's production, shipments and inventory records.
+
+    Each table is written to a temporary directory and renamed into
+    place, so readers never see a half-written partition.
+
+    Args:
+        archive_dir (str): Archive root
+        run_id (int): History id of the run
+        solution (dict): Lists of records in the /optimize response shape
+    """
+    for table, schema in SCHEMAS.items():
+        records = solution.get(table) or []
+        # Cast, not from_pylist: /optimize records carry periods as strings
+        data = pa.Table.from_arrays(
+            [pa.array([rec.get(f.name) for rec in records]).cast(f.type) for f in schema],
+            schema=schema,
+        )
+        final = os.path.join(archive_dir, table, f"run_id={int(run_id)}")
+        os.makedirs(os.path.dirname(final), exist_ok=True)
+        staging = tempfile.mkdtemp(dir=os.path.dirname(final), prefix=".tmp-")
+        pq.write_table(data, os.path.join(staging, "part-0.parquet"), compression=COMPRESSION)
+        if os.path.exists(final):
+            shutil.rmtree(final)
+        os.replace(staging, final)
+
+
+def delete_run(archive_dir: str, run_id: int) -> None:
+    """Drop a run's partitions (e.g. when its history row expires)"""
+    for table in SCHEMAS:
+        shutil.rmtree(os.path.join(archive_dir, table, f"run_id={int(run_id)}"), ignore_errors=True)
+
+
+# ==================================================
+# READ
+# ==================================================
+def has_run(archive_dir: str, run_id: int) -> bool:
+    """Whether every table of the run is archived"""
+    return all(
+        os.path.isdir(os.path.join(archive_dir, table, f"run_id={int(run_id)}"))
+        for table in SCHEMAS
+    )
+
+
+def list_run_ids(archive_dir: str, table: str = "shipments") -> list:
+    """Archived run ids, newest (highest) first"""
+    root = os.path.join(archive_dir, table)
+    if not os.path.isdir(root):
+        return []
+    ids = [
+        int(name.split("=", 1)[1]) for name in os.listdir(root)
+        if name.startswith("run_id=") and name.split("=", 1)[1].isdigit()
+    ]
+    return sorted(ids, reverse=True)
+
+
+def scan(archive_dir: str, table: str, columns: list, filters: dict = None,
+         run_ids: list = None) -> pa.Table:
+    """
+    Read only the given columns of the given runs.
+
+    run_ids prune whole partitions; filters ({column: value or list})
+    are pushed down into the Parquet reader.
+    """
+    if table not in SCHEMAS:
+        raise ValueError(f"Unknown table '{table}'; expected one of {', '.join(SCHEMAS)}")
+    unknown = [c for c in list(columns) + list(filters or {}) if c not in SCHEMAS[table].names + ["run_id"]]
+    if unknown:
+        raise ValueError(f"Unknown column(s) for {table}: {', '.join(unknown)}")
+
+    root = os.path.join(archive_dir, table)
+    if not os.path.isdir(root):
+        return pa.table({c: pa.array([], type=_column_type(table, c)) for c in columns})
+
+    ds = _datasets()
+    dataset = ds.dataset(
+        root, format="parquet",
+        schema=pa.unify_schemas([SCHEMAS[table], _PARTITION_SCHEMA]),
+        partitioning=ds.partitioning(_PARTITION_SCHEMA, flavor="hive"),
+    )
+    expr = None
+    if run_ids is not None:
+        expr = ds.field("run_id").isin(list(run_ids))
+    for column, value in (filters or {}).items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        try:
+            wanted = pa.array([str(v) for v in values]).cast(_column_type(table, column))
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            raise ValueError(f"Bad value for {column}: {', '.join(map(str, values))}")
+        cond = ds.field(column).isin(wanted)
+        expr = cond if expr is None else expr & cond
+    return dataset.to_table(columns=list(columns), filter=expr)
+
+
+def iter_batches(archive_dir: str, table: str, run_id: int, batch_size: int = 8192):
+    """
+    Yield one run's rows of a table as Arrow record batches, in file
+    order, without loading the whole partition
+    """
+    if table not in SCHEMAS:
+        raise ValueError(f"Unknown table '{table}'; expected one of {', '.join(SCHEMAS)}")
+    root = os.path.join(archive_dir, table, f"run_id={int(run_id)}")
+    if not os.path.isdir(root):
+        return
+    dataset = _datasets().dataset(root, format="parquet", schema=SCHEMAS[table])
+    yield from dataset.to_batches(batch_size=batch_size)
+
+
+def _across_runs(per_run: pa.Table, group_by: list, agg: str, n_runs: int) -> pa.Table:
+    """
+    Combine per-run totals; a run without a row for a group counts as 0
+    (a lane that was not used shipped nothing).
+    """
+    per_run = per_run.append_column("square", pc.multiply(per_run["value"], per_run["value"]))
+    stats = per_run.group_by(group_by).aggregate([
+        ("value", "sum"), ("value", "min"), ("value", "max"), ("value", "count"), ("square", "sum"),
+    ])
+    total, count = stats["value_sum"], stats["value_count"]
+    missing = pc.less(count, n_runs)
+    low = pc.if_else(missing, pc.min_element_wise(stats["value_min"], 0.0), stats["value_min"])
+    high = pc.if_else(missing, pc.max_element_wise(stats["value_max"], 0.0), stats["value_max"])
+    n = max(n_runs, 1)
+    mean = pc.divide(total, float(n))
+
+    if agg == "sum":
+        value = total
+    elif agg == "mean":
+        value = mean
+    elif agg == "min":
+        value = low
+    elif agg == "max":
+        value = high
+    elif agg == "range":
+        value = pc.subtract(high, low)
+    elif agg == "count":
+        value = count
+    else:
+        variance = pc.subtract(pc.divide(stats["square_sum"], float(n)), pc.multiply(mean, mean))
+        value = pc.sqrt(pc.max_element_wise(variance, 0.0))
+    return stats.select(group_by).append_column("value", value)
+
+
+def _column_type(table: str, column: str):
+    if column == "run_id":
+        return pa.int64()
+    if column not in SCHEMAS[table].names:
+        raise ValueError(f"Unknown column for {table}: {column}")
+    return SCHEMAS[table].field(column).type
+
+
+# ==================================================
+# ANALYTICS
+# ==================================================
+def query(archive_dir: str, table: str, group_by: list, metric: str = "quantity",
+          agg: str = "sum", filters: dict = None, last_runs: int = None,
+          run_ids: list = None, top: int = None) -> dict:
+    """
+    Aggregate a metric across archived runs.
+
+    The metric is first summed per run and group; those per-run totals
+    are then combined across runs with agg ("range" = max − min, handy
+    for "which lanes changed most"). Grouping by run_id keeps runs apart.
+
+    Examples:
+        T1 tonnage from IU_009 per period, last 30 runs:
+            query(d, "shipments", ["period", "run_id"],
+                  filters={"from": "IU_009", "mode": "T1"}, last_runs=30)
+        Lanes whose tonnage moved most:
+            query(d, "shipments", ["from", "to", "mode"], agg="range",
+                  last_runs=30, top=20)
+
+    Returns:
+        dict: {"columns", "rows", "runs"} with rows sorted by value
+              (descending) when top is given, else by group keys
+    """
+    if agg not in AGGREGATIONS:
+        raise ValueError(f"Unknown aggregation '{agg}'; expected one of {', '.join(AGGREGATIONS)}")
+    if table in SCHEMAS and not pa.types.is_integer(_column_type(table, metric)) \
+            and not pa.types.is_floating(_column_type(table, metric)):
+        raise ValueError(f"'{metric}' is not a numeric column of {table}")
+
+    if run_ids is None:
+        run_ids = list_run_ids(archive_dir, table)
+        if last_runs is not None:
+            run_ids = run_ids[:last_runs]
+    group_by = list(group_by)
+    per_run_keys = group_by if "run_id" in group_by else group_by + ["run_id"]
+
+    data = scan(archive_dir, table, list(dict.fromkeys(per_run_keys + [metric])), filters, run_ids)
+    per_run = data.group_by(per_run_keys).aggregate([(metric, "sum")])
+    per_run = per_run.select(per_run_keys + [f"{metric}_sum"]).rename_columns(per_run_keys + ["value"])
+    per_run = per_run.set_column(len(per_run_keys), "value", per_run["value"].cast(pa.float64()))
+
+    if "run_id" in group_by:
+        result = per_run
+    else:
+        result = _across_runs(per_run, group_by, agg, len(run_ids))
+
+    if top is not None:
+        result = result.sort_by([("value", "descending")]).slice(0, top)
+    elif group_by:
+        result = result.sort_by([(c, "ascending") for c in group_by])
+
+    return {
+        "columns": result.column_names,
+        "rows": result.to_pylist(),
+        "runs": sorted(set(data["run_id"].to_pylist()), reverse=True) if data.num_rows else [],
+    }
+
+
+def flows(archive_dir: str, run_id: int, group_by: list = ("from", "to"), filters: dict = None,
+          period_from: int = None, period_to: int = None, top: int = None) -> dict:
+    """
+    Shipment flows of one run, grouped and filtered server-side.
+
+    Sums quantity and trips (and counts lanes) per group of from / to /
+    mode / period. filters are exact matches ({column: value or list});
+    period_from / period_to bound numeric periods inclusively.
+
+    Returns:
+        dict: {"columns", "rows", "groups" (before top), "sources" and
+              "modes" (every origin / mode in the run, for pickers),
+              "totals" of the filtered rows}
+    """
+    group_by = list(group_by)
+    unknown = [c for c in group_by if c not in ("from", "to", "mode", "period")]
+    if unknown:
+        raise ValueError(f"Cannot group flows by: {', '.join(unknown)}")
+
+    columns = list(dict.fromkeys(group_by + ["period", "quantity", "trips"]))
+    data = scan(archive_dir, "shipments", columns, filters, run_ids=[run_id])
+
+    if period_from is not None or period_to is not None:
+        period = data["period"]
+        mask = pc.and_(
+            pc.greater_equal(period, period_from if period_from is not None else period),
+            pc.less_equal(period, period_to if period_to is not None else period),
+        )
+        data = data.filter(mask)
+
+    grouped = data.group_by(group_by).aggregate([("quantity", "sum"), ("trips", "sum"), ("quantity", "count")])
+    grouped = grouped.select(group_by + ["quantity_sum", "trips_sum", "quantity_count"]) \
+        .rename_columns(group_by + ["quantity", "trips", "lanes"])
+    if top is not None:
+        result = grouped.sort_by([("quantity", "descending")]).slice(0, top)
+    else:
+        result = grouped.sort_by([(c, "ascending") for c in group_by])
+
+    pickers = scan(archive_dir, "shipments", ["from", "mode"], run_ids=[run_id])
+    return {
+        "columns": result.column_names,
+        "rows": result.to_pylist(),
+        "groups": grouped.num_rows,
+        "sources": sorted(pc.unique(pickers["from"]).to_pylist()),
+        "modes": sorted(pc.unique(pickers["mode"]).to_pylist()),
+        "totals": {
+            "quantity": float(pc.sum(data["quantity"]).as_py() or 0.0),
+            "trips": int(pc.sum(data["trips"]).as_py() or 0),
+        },
+    }
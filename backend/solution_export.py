@@ -0,0 +1,105 @@
+import csv
+import io
+
+import orjson
+import pyarrow.csv as pacsv
+
+from backend.solution_archive import SCHEMAS, iter_batches
+
+
+# ==================================================
+# CONFIG
+# ==================================================
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+# Rows per Arrow batch; bounds memory per chunk whatever the plan size
+BATCH_SIZE = 8192
+
+# Section titles in the combined CSV (same layout as the client's old export)
+_SECTIONS = {"production": "PRODUCTION", "shipments": "SHIPMENTS", "inventory": "INVENTORY"}
+
+
+# ==================================================
+# TABLE STREAMS
+# ==================================================
+def iter_csv(archive_dir: str, table: str, run_id: int, empty_header: bool = True):
+    """
+    One archived table as CSV chunks (bytes), one chunk per batch.
+
+    Batches are written by Arrow's CSV writer, so no per-row Python.
+    An empty table yields just the header, or nothing if empty_header
+    is False.
+    """
+    options = pacsv.WriteOptions(include_header=True)
+    wrote = False
+    for batch in iter_batches(archive_dir, table, run_id, BATCH_SIZE):
+        if batch.num_rows == 0:
+            continue
+        buffer = io.BytesIO()
+        pacsv.write_csv(batch, buffer, write_options=options)
+        yield buffer.getvalue()
+        wrote = True
+        options = pacsv.WriteOptions(include_header=False)
+    if empty_header and not wrote:
+        yield (",".join(f'"{name}"' for name in SCHEMAS[table].names) + "\n").encode()
+
+
+def iter_ndjson(archive_dir: str, table: str, run_id: int, tag: bool = False):
+    """
+    One archived table as NDJSON chunks (bytes), one record per line.
+
+    tag=True adds "table" to every record so tables can share a stream.
+    """
+    for batch in iter_batches(archive_dir, table, run_id, BATCH_SIZE):
+        lines = []
+        for rec in batch.to_pylist():
+            if tag:
+                rec = {"table": table, **rec}
+            lines.append(orjson.dumps(rec))
+        if lines:
+            yield b"\n".join(lines) + b"\n"
+
+
+# ==================================================
+# RUN STREAMS
+# ==================================================
+def iter_run_csv(archive_dir: str, run: dict):
+    """
+    A whole run as one CSV: summary block, then one titled section per
+    non-empty table (the layout of the dashboard's "Export CSV")
+    """
+    summary = run.get("summary") or {}
+    # csv.writer quotes values (the filename is user-supplied) as needed
+    buffer = io.StringIO()
+    buffer.write("=== OPTIMIZATION SUMMARY ===\n")
+    csv.writer(buffer, lineterminator="\n").writerows([
+        ("Run", run["id"]),
+        ("Timestamp", run.get("timestamp")),
+        ("Filename", run.get("filename")),
+        ("Status", run.get("status")),
+        ("Objective Value", run.get("objective_value")),
+        ("Total Production", summary.get("total_production")),
+        ("Total Shipments", summary.get("total_shipments")),
+        ("Total Trips", summary.get("total_trips")),
+    ])
+    yield (buffer.getvalue() + "\n").encode()
+
+    for table, title in _SECTIONS.items():
+        chunks = iter_csv(archive_dir, table, run["id"], empty_header=False)
+        first = next(chunks, None)
+        if first is None:
+            continue
+        yield f"=== {title} ===\n".encode()
+        yield first
+        yield from chunks
+        yield b"\n"
+
+
+def iter_run_ndjson(archive_dir: str, run: dict):
+    """A whole run as NDJSON: the run record, then every row tagged with its table"""
+    yield orjson.dumps({"table": "run", **run}) + b"\n"
+    for table in SCHEMAS:
+        yield from iter_ndjson(archive_dir, table, run["id"], tag=True)
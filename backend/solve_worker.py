@@ -0,0 +1,162 @@
+import multiprocessing
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from backend import config
+
+
+# ==================================================
+# CONFIG
+# ==================================================
+MB = 1024 * 1024
+
+# ProcessPoolExecutor(max_tasks_per_child=) is 3.11+; before that the
+# whole pool is retired after max_tasks solves per worker instead
+PER_CHILD_RECYCLING = sys.version_info >= (3, 11)
+
+# RLIMIT_AS and /proc/self/statm: the memory cap and RSS recycling are Linux-only
+LINUX = sys.platform.startswith("linux")
+
+_executor = None
+_executor_key = None
+_executor_solves = 0
+_lock = threading.Lock()
+
+# Pools replaced because a worker grew past SOLVE_RECYCLE_RSS_MB or died
+stats = {"recycled": 0, "broken": 0}
+
+
+# ==================================================
+# COMPACT RESULTS
+# ==================================================
+def compact_result(result: dict) -> dict:
+    """A solver result without its Pyomo model (the solution is already id arrays)"""
+    return {k: v for k, v in result.items() if k != "model"}
+
+
+# ==================================================
+# WORKER
+# ==================================================
+def _rss_mb() -> float:
+    """This process's resident memory; 0 where it cannot be read (not Linux)"""
+    if not LINUX:
+        return 0.0
+    import resource
+
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / MB
+
+
+def _limit_memory(limit_mb: float) -> None:
+    """Pool initializer: cap the worker's (and CBC's) address space (Linux only)"""
+    if limit_mb and LINUX:
+        # Imported here: the resource module does not exist on Windows
+        import resource
+
+        limit = int(limit_mb * MB)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _solve(sheets: dict, settings: dict) -> dict:
+    """Pool worker: solve and send back the compact result plus this worker's RSS"""
+    from backend.model import solve_clinker_model
+
+    try:
+        result = compact_result(solve_clinker_model(sheets, settings))
+    except MemoryError:
+        result = {"success": False, "message": "Solve exceeded the worker memory limit"}
+    result["worker_rss_mb"] = round(_rss_mb(), 1)
+    return result
+
+
+# ==================================================
+# POOL
+# ==================================================
+def new_executor(workers: int, max_tasks: int = None, memory_limit_mb: float = None) -> ProcessPoolExecutor:
+    """
+    A process pool for solves: spawned workers (no copy of the API's
+    heap), each capped at memory_limit_mb of address space and replaced
+    after max_tasks solves (on Python 3.11+; see PER_CHILD_RECYCLING)
+    """
+    options = {"max_tasks_per_child": max_tasks or None} if PER_CHILD_RECYCLING else {}
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_limit_memory,
+        initargs=(memory_limit_mb,),
+        **options,
+    )
+
+
+def _pool() -> ProcessPoolExecutor:
+    global _executor, _executor_key, _executor_solves
+    key = (config.SOLVE_WORKERS, config.SOLVE_MAX_TASKS_PER_CHILD, config.SOLVE_MEMORY_LIMIT_MB)
+    with _lock:
+        if _executor is None or _executor_key != key:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = new_executor(*key)
+            _executor_key = key
+            _executor_solves = 0
+        return _executor
+
+
+def _pool_used_up() -> bool:
+    """Without per-child recycling: has the pool run max_tasks solves per worker?"""
+    global _executor_solves
+    if PER_CHILD_RECYCLING or not config.SOLVE_MAX_TASKS_PER_CHILD:
+        return False
+    with _lock:
+        _executor_solves += 1
+        return _executor_solves >= config.SOLVE_MAX_TASKS_PER_CHILD * config.SOLVE_WORKERS
+
+
+def _retire(executor: ProcessPoolExecutor, counter: str) -> None:
+    """Swap in a fresh pool; the old one finishes its running solves and exits"""
+    global _executor
+    with _lock:
+        if _executor is executor:
+            _executor = None
+            stats[counter] += 1
+    executor.shutdown(wait=False)
+
+
+def solve(sheets: dict, settings: dict = None) -> dict:
+    """
+    Solve in an isolated worker process (see config.SOLVE_*).
+
+    The Pyomo model is built, solved and freed in the worker; only the
+    compact result crosses back. A worker that ends above
+    SOLVE_RECYCLE_RSS_MB is retired with its pool. SOLVE_WORKERS = 0
+    solves in this process instead.
+
+    Returns:
+        dict: Same shape as model.solve_clinker_model, without "model"
+    """
+    if not config.SOLVE_WORKERS:
+        from backend.model import solve_clinker_model
+
+        result = solve_clinker_model(sheets, settings)
+        result.pop("model", None)
+        return result
+
+    executor = _pool()
+    try:
+        result = executor.submit(_solve, sheets, settings or {}).result()
+    except BrokenProcessPool:
+        _retire(executor, "broken")
+        return {"success": False, "message": "Solve worker died (out of memory?)"}
+    oversized = config.SOLVE_RECYCLE_RSS_MB and result.get("worker_rss_mb", 0) > config.SOLVE_RECYCLE_RSS_MB
+    if _pool_used_up() or oversized:
+        _retire(executor, "recycled")
+    return result
+
+
+def shutdown() -> None:
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
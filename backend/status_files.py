@@ -0,0 +1,37 @@
+import json
+import os
+import tempfile
+
+
+# ==================================================
+# JSON STATUS FILES
+# ==================================================
+# Batch and job status live in small JSON files so that every API worker
+# process can answer polls for work started by another one.
+def write_json(path: str, data: dict) -> None:
+    """Write atomically: readers see the old file or the new one, never half"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, staging = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(staging, path)
+    except BaseException:
+        if os.path.exists(staging):
+            os.remove(staging)
+        raise
+
+
+def read_json(path: str) -> dict:
+    """Parsed file, or None if it does not exist (yet)"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def valid_id(status_id: str) -> bool:
+    """Ids are hex tokens; anything else could escape the directory"""
+    return bool(status_id) and status_id.isalnum()
@@ -0,0 +1,185 @@
+import hashlib
+import os
+import re
+import tempfile
+import zipfile
+
+
+# ==================================================
+# CONFIG
+# ==================================================
+CHUNK_SIZE = 1024 * 1024
+
+# Leading bytes of each accepted format
+SIGNATURES = {
+    ".xlsx": b"PK\x03\x04",                          # zip container
+    ".xls": b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1",     # OLE2 compound file
+}
+
+# Parts every .xlsx package has
+_XLSX_PARTS = ("[Content_Types].xml", "xl/workbook.xml")
+
+# Names the store writes: <sha256>.<ext>; anything else is left alone
+_STORED_NAME = re.compile(r"[0-9a-f]{64}(" + "|".join(re.escape(e) for e in SIGNATURES) + r")")
+
+
+class UploadRejected(ValueError):
+    """An upload that is too large or not a workbook; status_code is the HTTP status to answer with"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# ==================================================
+# VALIDATION
+# ==================================================
+def check_xlsx(path: str, max_uncompressed: int) -> None:
+    """
+    Validate an .xlsx from its zip central directory only.
+
+    Reads the directory at the end of the file, not the members, so a
+    truncated file, a non-workbook zip or a zip bomb is rejected before
+    pandas decompresses anything.
+
+    Raises:
+        UploadRejected: if the file is not a plausible workbook
+    """
+    try:
+        with zipfile.ZipFile(path) as archive:
+            infos = archive.infolist()
+    except (zipfile.BadZipFile, OSError):
+        raise UploadRejected("File is not a valid .xlsx workbook (unreadable zip directory)")
+
+    names = {info.filename for info in infos}
+    missing = [part for part in _XLSX_PARTS if part not in names]
+    if missing:
+        raise UploadRejected(f"File is not an Excel workbook (missing {', '.join(missing)})")
+    if sum(info.file_size for info in infos) > max_uncompressed:
+        raise UploadRejected("Workbook unpacks to more than the allowed size", status_code=413)
+
+
+# ==================================================
+# STORE
+# ==================================================
+def store(fileobj, store_dir: str, extension: str, max_bytes: int,
+          max_uncompressed: int = None, budget_bytes: int = None, pinned=None) -> tuple:
+    """
+    Stream an upload into the store under its SHA-256.
+
+    The file is hashed while it is copied to a temporary file, so it is
+    read once; a wrong signature or more than max_bytes aborts the copy
+    early. Identical content is stored once (the existing copy is kept
+    and marked as recently used).
+
+    Args:
+        fileobj: Binary file-like object to read
+        store_dir (str): Store directory
+        extension (str): ".xlsx" or ".xls"
+        max_bytes (int): Largest accepted upload
+        max_uncompressed (int): Zip-bomb limit for .xlsx (None = no check)
+        budget_bytes (int): Evict least recently used files beyond this
+        pinned: callable() -> digests never to evict (see evict)
+
+    Returns:
+        tuple: (sha256 hex digest, path of the stored file)
+
+    Raises:
+        UploadRejected: if the upload is too large or malformed
+    """
+    extension = extension.lower()
+    if extension not in SIGNATURES:
+        raise UploadRejected(f"Only {' or '.join(SIGNATURES)} files are supported")
+    os.makedirs(store_dir, exist_ok=True)
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, staging = tempfile.mkstemp(dir=store_dir, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = fileobj.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                if size == 0 and not chunk.startswith(SIGNATURES[extension][:len(chunk)]):
+                    raise UploadRejected(f"File content is not a {extension} workbook")
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadRejected(f"Upload exceeds {max_bytes:,} bytes", status_code=413)
+                digest.update(chunk)
+                out.write(chunk)
+        if size == 0:
+            raise UploadRejected("Uploaded file is empty")
+        if extension == ".xlsx" and max_uncompressed is not None:
+            check_xlsx(staging, max_uncompressed)
+
+        sha = digest.hexdigest()
+        final = os.path.join(store_dir, sha + extension)
+        if os.path.exists(final):
+            os.remove(staging)
+            os.utime(final)
+        else:
+            os.replace(staging, final)
+    except BaseException:
+        if os.path.exists(staging):
+            os.remove(staging)
+        raise
+
+    if budget_bytes is not None:
+        evict(store_dir, budget_bytes, keep=final, pinned=pinned)
+    return sha, final
+
+
+def path_for(store_dir: str, sha: str) -> str:
+    """Stored file for a digest (marked as recently used), or None"""
+    if not sha or not all(c in "0123456789abcdef" for c in sha.lower()):
+        return None
+    for extension in SIGNATURES:
+        path = os.path.join(store_dir, sha.lower() + extension)
+        if os.path.exists(path):
+            os.utime(path)
+            return path
+    return None
+
+
+def evict(store_dir: str, budget_bytes: int, keep: str = None, pinned=None) -> list:
+    """
+    Delete least recently used uploads (by mtime) until the store fits
+    in budget_bytes; keep is never evicted. Only <sha256>.<ext> files
+    written by store count or are deleted; other files in the
+    directory are never touched.
+
+    pinned is a callable returning the digests of uploads still needed
+    (queued or running jobs and batches); it is only called when the
+    store is over budget, and those files are skipped however old.
+
+    Returns:
+        list: Paths removed
+    """
+    entries = []
+    for name in os.listdir(store_dir):
+        path = os.path.join(store_dir, name)
+        if not _STORED_NAME.fullmatch(name) or not os.path.isfile(path):
+            continue
+        stat = os.stat(path)
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    if total <= budget_bytes:
+        return []
+    needed = set(pinned()) if pinned is not None else set()
+    removed = []
+    for _, size, path in sorted(entries):
+        if total <= budget_bytes:
+            break
+        if keep is not None and os.path.abspath(path) == os.path.abspath(keep):
+            continue
+        if os.path.splitext(os.path.basename(path))[0] in needed:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed.append(path)
+    return removed
@@ -0,0 +1,83 @@
+import threading
+import time
+
+
+# ==================================================
+# STATE
+# ==================================================
+# Timings of this process's warm-up (served on /health as "warm")
+state = {
+    "started": None,
+    "finished": None,
+    "import_seconds": None,
+    "preload_seconds": None,
+    "solve_seconds": None,
+    "error": None,
+}
+
+
+def tiny_sheets() -> dict:
+    """One IU, one GU, one period, one lane: the smallest model the solver path accepts"""
+    import pandas as pd
+
+    return {
+        "ClinkerDemand": pd.DataFrame({
+            "IUGU CODE": ["IU_1", "GU_1"], "TIME PERIOD": [1, 1],
+            "DEMAND": [0, 3000], "MIN FULFILLMENT (%)": [0, 0],
+        }),
+        "ClinkerCapacity": pd.DataFrame({"IU CODE": ["IU_1"], "TIME PERIOD": [1], "CAPACITY": [6000]}),
+        "ProductionCost": pd.DataFrame({"IU CODE": ["IU_1"], "TIME PERIOD": [1], "PRODUCTION COST": [1500]}),
+        "LogisticsIUGU": pd.DataFrame({
+            "FROM IU CODE": ["IU_1"], "TO IUGU CODE": ["GU_1"], "TRANSPORT CODE": ["T2"],
+            "TIME PERIOD": [1], "FREIGHT COST": [900.0], "HANDLING COST": [0.0],
+            "QUANTITY MULTIPLIER": [3000],
+        }),
+        "IUGUOpeningStock": pd.DataFrame({"IUGU CODE": ["IU_1", "GU_1"], "OPENING STOCK": [0.0, 0.0]}),
+        "IUGUType": pd.DataFrame({"IUGU CODE": ["IU_1", "GU_1"], "PLANT TYPE": ["IU", "GU"]}),
+    }
+
+
+# ==================================================
+# WARM-UP
+# ==================================================
+def warm_up(default_excel_path: str = None) -> dict:
+    """
+    Load what the first solve would otherwise wait for: pandas and Pyomo
+    imports, the default workbook, and a solve worker process with the
+    CBC binary paged in (one tiny solve through solve_worker).
+
+    Best-effort: a failure is recorded in state["error"], never raised.
+
+    Returns:
+        dict: The updated state
+    """
+    state["started"] = time.time()
+    try:
+        start = time.perf_counter()
+        import backend.model  # noqa: F401 (parsing and estimates need it here too)
+        from backend import solve_worker
+        state["import_seconds"] = round(time.perf_counter() - start, 3)
+
+        if default_excel_path:
+            from backend.default_dataset import preload
+
+            start = time.perf_counter()
+            preload(default_excel_path)
+            state["preload_seconds"] = round(time.perf_counter() - start, 3)
+
+        start = time.perf_counter()
+        result = solve_worker.solve(tiny_sheets())
+        state["solve_seconds"] = round(time.perf_counter() - start, 3)
+        if not result.get("success"):
+            state["error"] = result.get("message")
+    except Exception as e:
+        state["error"] = str(e)
+    state["finished"] = time.time()
+    return state
+
+
+def start(default_excel_path: str = None) -> threading.Thread:
+    """Run warm_up() on a daemon thread (startup does not wait for it)"""
+    thread = threading.Thread(target=warm_up, args=(default_excel_path,), daemon=True, name="warm-up")
+    thread.start()
+    return thread
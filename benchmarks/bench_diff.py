@@ -0,0 +1,58 @@
+"""
+Benchmark: /runs/{a}/diff/{b} on large archived plans.
+
+Writes two synthetic runs with N shipment rows each (10% of lanes
+changed, 5% dropped, 5% new) and times run_diff.diff_runs.
+
+Usage:
+    python -m benchmarks.bench_diff
+"""
+import tempfile
+import time
+
+import numpy as np
+
+from backend.run_diff import diff_runs
+from backend.solution_archive import write_run
+
+SIZES = [10_000, 100_000, 500_000]
+
+
+def make_plan(n: int, rng, offset: int = 0) -> dict:
+    lane = np.arange(offset, offset + n)
+    qty = rng.uniform(1, 50_000, n).round(2)
+    return {
+        "shipments": [
+            {"from": f"IU_{k % 97:03d}", "to": f"GU_{k // 97:05d}", "mode": "T1" if k % 2 else "T2",
+             "period": str(k % 3 + 1), "quantity": float(q), "trips": int(q // 3000) + 1}
+            for k, q in zip(lane.tolist(), qty.tolist())
+        ],
+    }
+
+
+# ==================================================
+# ENTRY POINT
+# ==================================================
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>9}{'write_s':>9}{'diff_s':>9}{'changed':>10}")
+    for n in SIZES:
+        root = tempfile.mkdtemp()
+        plan_a = make_plan(n, rng)
+        plan_b = make_plan(n, rng, offset=n // 20)   # shift: 5% dropped, 5% new
+        # Keep most overlapping lanes identical, change 10%
+        overlap = {(s["from"], s["to"], s["mode"], s["period"]): s for s in plan_a["shipments"]}
+        for k, s in enumerate(plan_b["shipments"]):
+            key = (s["from"], s["to"], s["mode"], s["period"])
+            if key in overlap and k % 10:
+                s.update(quantity=overlap[key]["quantity"], trips=overlap[key]["trips"])
+
+        start = time.perf_counter()
+        write_run(root, 1, plan_a)
+        write_run(root, 2, plan_b)
+        write_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        diff = diff_runs(root, {"id": 1}, {"id": 2}, top=20)
+        diff_s = time.perf_counter() - start
+        print(f"{n:>9,}{write_s:>9.2f}{diff_s:>9.3f}{diff['shipments']['changed']:>10,}")
@@ -0,0 +1,100 @@
+"""
+Benchmark: calibrate and check backend.estimator against real builds.
+
+Each synthetic network is prepared, built and solved (CBC, short time
+limit) in a fresh process, recording the model's actual variable, row
+and nonzero counts, peak Python memory over the baseline, the CBC
+child's peak memory and the build time. Predictions are printed next to
+the measurements, followed by least-squares fits of the estimator's
+coefficients.
+
+Usage:
+    python -m benchmarks.bench_estimate
+"""
+import multiprocessing
+import resource
+import time
+
+import numpy as np
+
+from backend import estimator
+from benchmarks.synthetic import make_sheets
+
+# (IUs, GUs, periods, lanes per GU)
+CASES = [(10, 20, 3, 4), (20, 60, 3, 4), (30, 150, 4, 4), (40, 300, 6, 4), (60, 500, 6, 5)]
+TIME_LIMIT = 20
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / estimator.MB
+
+
+def measure(case: tuple) -> dict:
+    """Build and solve one case; runs in its own process so peaks are its own"""
+    from pyomo.core.expr.visitor import identify_variables
+    from pyomo.environ import Constraint, SolverFactory, Var
+
+    from backend.model import SETTINGS, build_model, prepare_inputs
+    from backend.scaling import compute_scaling
+
+    n_iu, n_gu, n_periods, lanes = case
+    sheets = make_sheets(n_iu, n_gu, n_periods, lanes, min_fulfill_pct=50)
+    predicted = estimator.estimate(sheets)["engines"]["cbc"]
+
+    baseline = _rss_mb()
+    start = time.perf_counter()
+    inputs = prepare_inputs(sheets)
+    model = build_model(inputs, SETTINGS, compute_scaling(inputs, SETTINGS))
+    build_seconds = time.perf_counter() - start
+    python_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 - baseline
+
+    rows = list(model.component_data_objects(Constraint, active=True))
+    actual = {
+        "variables": model.nvariables(),
+        "integers": sum(1 for v in model.component_data_objects(Var) if v.is_integer()),
+        "rows": len(rows),
+        "nonzeros": sum(len(list(identify_variables(c.body, include_fixed=False))) for c in rows),
+    }
+
+    solver = SolverFactory("cbc")
+    solver.options["seconds"] = TIME_LIMIT
+    start = time.perf_counter()
+    solver.solve(model, tee=False)
+    solve_seconds = time.perf_counter() - start
+    cbc_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return {
+        "case": case, "predicted": predicted, "actual": actual,
+        "python_mb": python_mb, "cbc_mb": cbc_mb,
+        "build_seconds": build_seconds, "solve_seconds": solve_seconds,
+    }
+
+
+# ==================================================
+# ENTRY POINT
+# ==================================================
+if __name__ == "__main__":
+    context = multiprocessing.get_context("spawn")
+    results = []
+    print(f"{'case':<18}{'vars':>9}{'pred':>9}{'rows':>9}{'pred':>9}{'nnz':>10}{'pred':>10}"
+          f"{'py_mb':>8}{'pred':>8}{'cbc_mb':>8}{'pred':>8}{'build_s':>8}{'pred':>7}{'solve_s':>8}")
+    for case in CASES:
+        with context.Pool(1, maxtasksperchild=1) as pool:
+            r = pool.apply(measure, (case,))
+        results.append(r)
+        a, p = r["actual"], r["predicted"]
+        print(f"{str(case):<18}{a['variables']:>9,}{p['variables']:>9,}{a['rows']:>9,}{p['rows']:>9,}"
+              f"{a['nonzeros']:>10,}{p['nonzeros']:>10,}{r['python_mb']:>8.0f}{p['api_memory_mb']:>8.0f}"
+              f"{r['cbc_mb']:>8.0f}{p['solver_memory_mb']:>8.0f}{r['build_seconds']:>8.2f}"
+              f"{p['build_seconds']:>7.2f}{r['solve_seconds']:>8.2f}")
+
+    # Fits on the actual counts
+    X = np.array([[r["actual"]["variables"], r["actual"]["nonzeros"]] for r in results], dtype=float)
+    py = np.array([r["python_mb"] for r in results]) * estimator.MB
+    per_var, per_nnz = np.linalg.lstsq(X, py, rcond=None)[0]
+    nnz = X[:, 1]
+    cbc_fit = np.polyfit(nnz, np.array([r["cbc_mb"] for r in results]), 1)
+    build_fit = np.linalg.lstsq(nnz[:, None], np.array([r["build_seconds"] for r in results]), rcond=None)[0][0]
+    print(f"\nfit: PYTHON_BYTES_PER_VARIABLE={per_var:.0f} PYTHON_BYTES_PER_NONZERO={per_nnz:.0f}")
+    print(f"fit: CBC_BASE_MB={cbc_fit[1]:.1f} CBC_BYTES_PER_NONZERO={cbc_fit[0] * estimator.MB:.0f}")
+    print(f"fit: BUILD_SECONDS_PER_NONZERO={build_fit:.2e}")
@@ -0,0 +1,60 @@
+"""
+Benchmark: /optimize payload size and encode time per response format.
+
+Builds a synthetic result with N shipment rows (plus production and
+inventory) and encodes it with every format and content encoding.
+
+Usage:
+    python -m benchmarks.bench_formats
+"""
+import time
+
+import numpy as np
+
+from backend.response_formats import available_formats, compress, encode, negotiate_encoding
+
+SIZES = [10_000, 100_000]
+ENCODINGS = [None, "gzip", "br"]
+
+
+def make_response(n: int, rng) -> dict:
+    qty = rng.uniform(1, 50_000, n).round(2).tolist()
+    return {
+        "status": "success",
+        "success": True,
+        "objective_value": 1.0e9,
+        "shipments": [
+            {"from": f"IU_{k % 97:03d}", "to": f"GU_{k // 97:05d}", "mode": "T1" if k % 2 else "T2",
+             "period": str(k % 12 + 1), "quantity": q, "trips": int(q // 3000) + 1}
+            for k, q in enumerate(qty)
+        ],
+        "production": [
+            {"node": f"IU_{k % 97:03d}", "period": str(k // 97 + 1), "quantity": q}
+            for k, q in enumerate(qty[: 97 * 12])
+        ],
+        "inventory": [
+            {"node": f"GU_{k:05d}", "period": str(p + 1), "quantity": 100.0}
+            for k in range(n // 97) for p in range(12)
+        ],
+    }
+
+
+# ==================================================
+# ENTRY POINT
+# ==================================================
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>9}  {'format':<10}{'encoding':<10}{'bytes':>13}{'vs json':>9}{'encode_s':>10}")
+    for n in SIZES:
+        response = make_response(n, rng)
+        baseline = None
+        for fmt in available_formats():
+            for encoding in ENCODINGS:
+                if encoding and negotiate_encoding(encoding) != encoding:
+                    continue
+                start = time.perf_counter()
+                body = compress(encode(response, fmt), encoding)
+                elapsed = time.perf_counter() - start
+                baseline = baseline or len(body)
+                print(f"{n:>9,}  {fmt:<10}{encoding or 'identity':<10}{len(body):>13,}"
+                      f"{len(body) / baseline:>9.2f}{elapsed:>10.3f}")
@@ -0,0 +1,54 @@
+"""
+Benchmark: full MIP vs aggregate-then-disaggregate (ENGINE="hierarchical").
+
+Reports wall time for both and the hierarchical plan's cost gap over
+the full model's optimum (positive = hierarchical is dearer). The full
+model runs under TIME_LIMIT; where it does not finish the gap shows
+n/a, and lp_gap (over the Trips-relaxed LP, a lower bound) still bounds
+how far from optimal the hierarchical plan can be.
+
+Usage:
+    python -m benchmarks.bench_hierarchical
+"""
+import time
+
+from backend.model import solve_clinker_model
+from benchmarks.synthetic import make_sheets
+
+TIME_LIMIT = 300
+
+CASES = [(10, 40, 3), (20, 100, 3), (20, 200, 3), (40, 400, 3)]
+
+
+def timed(sheets, settings):
+    start = time.perf_counter()
+    result = solve_clinker_model(sheets, settings)
+    return result, time.perf_counter() - start
+
+
+# ==================================================
+# ENTRY POINT
+# ==================================================
+if __name__ == "__main__":
+    header = f"{'case':<16}{'full_s':>9}{'hier_s':>9}{'clusters':>10}{'gap_%':>9}{'lp_gap_%':>10}{'unmet_full':>13}{'unmet_hier':>13}"
+    print(header)
+    print("-" * len(header))
+    for n_iu, n_gu, n_t in CASES:
+        sheets = make_sheets(n_iu, n_gu, n_t)
+        full, full_s = timed(sheets, {"SOLVER_TIME_LIMIT": TIME_LIMIT})
+        hier, hier_s = timed(sheets, {"ENGINE": "hierarchical", "SOLVER_TIME_LIMIT": TIME_LIMIT})
+        lp, _ = timed(sheets, {"RELAX_TRIPS": True})
+
+        if full.get("success") and hier.get("success"):
+            gap = f"{100 * (hier['objective_value'] / full['objective_value'] - 1):.2f}"
+        else:
+            gap = "n/a"
+        if lp.get("success") and hier.get("success"):
+            lp_gap = f"{100 * (hier['objective_value'] / lp['objective_value'] - 1):.2f}"
+        else:
+            lp_gap = "n/a"
+        unmet_full = full.get("unmet_demand", float("nan"))
+        unmet_hier = hier.get("unmet_demand", float("nan"))
+        clusters = hier.get("hierarchy", {}).get("clusters", 0)
+        print(f"{f'{n_iu}x{n_gu}x{n_t}':<16}{full_s:>9.2f}{hier_s:>9.2f}{clusters:>10}{gap:>9}{lp_gap:>10}"
+              f"{unmet_full:>13,.0f}{unmet_hier:>13,.0f}")
@@ -0,0 +1,64 @@
+"""
+Benchmark: parameter prep, model build and solution extraction on a
+large synthetic network, timing each stage and the process's peak RSS
+after it.
+
+Variables are given values directly (no solve), so extraction sees a
+dense plan. Each repeat runs in a fresh interpreter.
+
+Usage:
+    python -m benchmarks.bench_ids
+"""
+import json
+import subprocess
+import sys
+
+# (IUs, GUs, periods, lanes per GU)
+CASE = (80, 2500, 6, 5)
+REPEATS = 3
+
+_RUN = """
+import json, pickle, resource, time
+from pyomo.environ import Var
+from backend.model import SETTINGS, build_model, extract_solution, prepare_inputs
+from backend.scaling import compute_scaling
+from benchmarks.synthetic import make_sheets
+
+def peak():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+sheets = make_sheets(*%r, min_fulfill_pct=50)
+out = {"base_mb": peak()}
+start = time.perf_counter()
+inputs = prepare_inputs(sheets)
+out["prep_s"] = time.perf_counter() - start
+out["prep_mb"] = peak()
+scaling = compute_scaling(inputs, SETTINGS)
+start = time.perf_counter()
+model = build_model(inputs, SETTINGS, scaling)
+out["build_s"] = time.perf_counter() - start
+out["build_mb"] = peak()
+for var in model.component_data_objects(Var):
+    var.set_value(1.0, skip_validation=True)
+start = time.perf_counter()
+solution = extract_solution(model, scaling, inputs["index"])
+out["extract_s"] = time.perf_counter() - start
+out["extract_mb"] = peak()
+out["solution_kb"] = len(pickle.dumps(solution)) / 1024
+out["variables"] = model.nvariables()
+print(json.dumps(out))
+"""
+
+# ==================================================
+# ENTRY POINT
+# ==================================================
+if __name__ == "__main__":
+    runs = []
+    for _ in range(REPEATS):
+        out = subprocess.run([sys.executable, "-c", _RUN % (CASE,)], capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    best = {k: min(r[k] for r in runs) for k in runs[0]}
+    print(f"case {CASE}: {best['variables']:,} variables, best of {REPEATS}")
+    for stage in ("prep", "build", "extract"):
+        print(f"  {stage:<8}{best[stage + '_s']:>8.2f}s   peak RSS {best[stage + '_mb']:>7.0f} MB")
+    print(f"  baseline peak RSS {best['base_mb']:.0f} MB, pickled solution {best['solution_kb']:,.0f} KB")
@@ -0,0 +1,52 @@
+"""
+Benchmark: min-cost-flow engine vs the Pyomo LP relaxation.
+
+Both solve the same Trips-relaxed model (MinFulfill and IUGU rows off),
+so objectives must agree; reports wall time for the LP, the OR-Tools
+backend and, on the smaller cases, the pure-Python backend.
+
+Usage:
+    python -m benchmarks.bench_network
+"""
+import os
+import time
+
+from backend.model import load_workbook, solve_clinker_model
+from benchmarks.synthetic import make_sheets
+
+SAMPLE_DATASET = os.path.join(
+    os.path.dirname(__file__), "..", "backend", "data", "dataset.xlsx"
+)
+
+RELAXED = {"ENABLE_MIN_FULFILL": False, "ENABLE_IUGU_CONSTRAINTS": False}
+
+# The pure-Python backend is only run up to this many GUs
+PYTHON_MAX_GU = 60
+
+
+def timed(sheets, settings):
+    start = time.perf_counter()
+    result = solve_clinker_model(sheets, {**RELAXED, **settings})
+    return result, time.perf_counter() - start
+
+
+# ==================================================
+# ENTRY POINT
+# ==================================================
+if __name__ == "__main__":
+    cases = [("dataset.xlsx", load_workbook(SAMPLE_DATASET), 0)]
+    for n_iu, n_gu, n_t in [(20, 60, 6), (50, 200, 6), (100, 400, 12)]:
+        cases.append((f"synthetic {n_iu}x{n_gu}x{n_t}", make_sheets(n_iu, n_gu, n_t), n_gu))
+
+    header = f"{'case':<26}{'lp_s':>9}{'ortools_s':>11}{'python_s':>10}{'rel_gap':>11}"
+    print(header)
+    print("-" * len(header))
+    for name, sheets, n_gu in cases:
+        lp, lp_s = timed(sheets, {"RELAX_TRIPS": True})
+        fast, fast_s = timed(sheets, {"ENGINE": "network", "NETWORK_BACKEND": "ortools"})
+        py_s = float("nan")
+        if n_gu <= PYTHON_MAX_GU:
+            _, py_s = timed(sheets, {"ENGINE": "network", "NETWORK_BACKEND": "python"})
+
+        gap = abs(lp["objective_value"] - fast["objective_value"]) / lp["objective_value"]
+        print(f"{name:<26}{lp_s:>9.3f}{fast_s:>11.3f}{py_s:>10.3f}{gap:>11.2e}")
@@ -0,0 +1,66 @@
+"""
+Benchmark: Network Flow render payload with and without level of detail.
+
+Builds a synthetic plan with N (from, to) lanes over two modes and a few
+periods, then measures the JSON the browser receives for the Sankey
+(node / link arrays) and the flow table: every lane at once versus the
+top-N lanes with "other" links and one table page.
+
+Usage:
+    python -m benchmarks.bench_sankey
+"""
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from client.flow_lod import PAGE_SIZE, aggregate_flows, sankey_data, table_page, top_lanes
+
+LANES = [1_000, 10_000]
+TOP = [40, 100, 200]
+IUS = 97
+
+
+def make_shipments(lanes: int, rng) -> pd.DataFrame:
+    """lanes distinct (from, to) pairs, each shipped in 1-3 periods by one of two modes"""
+    repeats = rng.integers(1, 4, lanes)
+    lane = np.repeat(np.arange(lanes), repeats)
+    # Long-tailed volumes: a few lanes carry most of the clinker
+    quantity = rng.pareto(1.5, len(lane)) * 3000 + 100
+    return pd.DataFrame({
+        "from": [f"IU_{k % IUS:03d}" for k in lane],
+        "to": [f"GU_{k // IUS:05d}" for k in lane],
+        "mode": np.where(lane % 3 == 0, "T1", "T2"),
+        "period": (np.arange(len(lane)) % 12 + 1).astype(str),
+        "quantity": quantity.round(2),
+        "trips": (quantity // 3000 + 1).astype(int),
+    })
+
+
+def payload_bytes(data) -> int:
+    return len(json.dumps(data, default=float).encode())
+
+
+# ==================================================
+# ENTRY POINT
+# ==================================================
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    print(f"{'lanes':>7}  {'view':<16}{'links':>7}{'bytes':>12}{'vs full':>9}{'build_s':>9}")
+    for lanes in LANES:
+        flows = aggregate_flows(make_shipments(lanes, rng))
+
+        start = time.perf_counter()
+        full = payload_bytes(sankey_data(flows)) + payload_bytes(table_page(flows, 1, len(flows)).to_dict("list"))
+        elapsed = time.perf_counter() - start
+        print(f"{lanes:>7,}  {'full':<16}{len(flows):>7,}{full:>12,}{1:>9.2f}{elapsed:>9.3f}")
+
+        for n in TOP:
+            start = time.perf_counter()
+            shown = top_lanes(flows, n)
+            size = payload_bytes(sankey_data(shown)) + payload_bytes(table_page(flows, 1).to_dict("list"))
+            elapsed = time.perf_counter() - start
+            print(f"{lanes:>7,}  {f'top {n} + page':<16}{len(shown):>7,}{size:>12,}"
+                  f"{size / full:>9.3f}{elapsed:>9.3f}")
+    print(f"(table page = {PAGE_SIZE} rows; full = every lane in the Sankey and the table)")
@@ -0,0 +1,119 @@
+"""
+Benchmark: objective/coefficient scaling on vs off.
+
+For each instance the model is solved with and without the scaling
+layer, over a few slightly perturbed copies of the data, and we report
+solve time, termination, delivered cost, unmet tons and the largest
+inventory-balance residual in tons (a direct view of tolerance noise).
+
+Runs that hit TIME_LIMIT count as TIME_LIMIT seconds in the median
+solve time (a censored median: a ">" means at least half the runs
+timed out), so a mode that times out more often cannot look faster by
+leaving its slow runs out.
+
+Usage:
+    python -m benchmarks.bench_scaling
+"""
+import os
+import statistics
+
+import numpy as np
+from pyomo.environ import value
+
+from backend.model import load_workbook, solve_clinker_model
+from benchmarks.synthetic import make_sheets
+
+SAMPLE_DATASET = os.path.join(
+    os.path.dirname(__file__), "..", "backend", "data", "dataset.xlsx"
+)
+
+MODES = {
+    "scaled": {"ENABLE_SCALING": True},
+    "unscaled": {"ENABLE_SCALING": False},
+}
+
+# Runs that hit this limit count as TIME_LIMIT seconds in the median
+TIME_LIMIT = 60
+
+
+# ==================================================
+# HELPERS
+# ==================================================
+def perturb(sheets: dict, seed: int, rel: float = 1e-6) -> dict:
+    """Copy of the sheets with demand nudged by a tiny relative amount"""
+    if seed == 0:
+        return sheets
+    rng = np.random.default_rng(seed)
+    out = dict(sheets)
+    demand = sheets["ClinkerDemand"].copy()
+    demand["DEMAND"] = demand["DEMAND"] * (1 + rel * rng.standard_normal(len(demand)))
+    out["ClinkerDemand"] = demand
+    return out
+
+
+def max_balance_residual(result: dict) -> float:
+    """Largest |lhs - rhs| over InvBalance rows, in tons"""
+    model = result["model"]
+    q = result["scaling"]["quantity"]
+    return max(
+        abs(value(con.body) - value(con.upper)) * q
+        for con in model.InvBalance.values()
+    )
+
+
+def run_case(name: str, sheets: dict, repeats: int = 3) -> list:
+    rows = []
+    for mode, settings in MODES.items():
+        times, costs, unmet, residuals, timeouts, failures = [], [], [], [], 0, 0
+        for seed in range(repeats):
+            result = solve_clinker_model(
+                perturb(sheets, seed), {**settings, "SOLVER_TIME_LIMIT": TIME_LIMIT}
+            )
+            if not result.get("success"):
+                if "maxTimeLimit" in result.get("message", ""):
+                    timeouts += 1
+                    times.append(TIME_LIMIT)
+                else:
+                    failures += 1
+                continue
+            times.append(result["timings"]["solve"])
+            costs.append(sum(result["cost_breakdown"].values()))
+            unmet.append(result["unmet_demand"])
+            residuals.append(max_balance_residual(result))
+
+        rows.append({
+            "case": name,
+            "mode": mode,
+            "solve_s": statistics.median(times) if times else float("nan"),
+            "timeouts": timeouts,
+            "failures": failures,
+            "cost": statistics.mean(costs) if costs else float("nan"),
+            "cost_spread": (max(costs) - min(costs)) / max(statistics.mean(costs), 1) if costs else float("nan"),
+            "unmet_t": statistics.mean(unmet) if unmet else float("nan"),
+            "max_residual_t": max(residuals) if residuals else float("nan"),
+        })
+    return rows
+
+
+# ==================================================
+# ENTRY POINT
+# ==================================================
+if __name__ == "__main__":
+    cases = [("dataset.xlsx", load_workbook(SAMPLE_DATASET))]
+    for n_iu, n_gu, n_t in [(10, 20, 3), (15, 30, 3), (20, 40, 3)]:
+        cases.append((f"synthetic {n_iu}x{n_gu}x{n_t}", make_sheets(n_iu, n_gu, n_t)))
+
+    header = (
+        f"{'case':<26}{'mode':<10}{'solve_s':>9}{'t/o':>5}{'fail':>6}"
+        f"{'cost':>18}{'spread':>10}{'unmet_t':>14}{'resid_t':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+    for name, sheets in cases:
+        for r in run_case(name, sheets):
+            censored = ">" if r["solve_s"] >= TIME_LIMIT else ""
+            print(
+                f"{r['case']:<26}{r['mode']:<10}{censored + format(r['solve_s'], '.3f'):>9}"
+                f"{r['timeouts']:>5}{r['failures']:>6}"
+                f"{r['cost']:>18,.0f}{r['cost_spread']:>10.2e}{r['unmet_t']:>14,.1f}{r['max_residual_t']:>10.2e}"
+            )
@@ -0,0 +1,45 @@
+"""
+Benchmark: in-memory footprint of a large workbook's sheets as read
+(object codes, int64 / float64 numbers) vs typed by backend.sheet_schema,
+plus the time to type them and to prepare model inputs from each.
+
+Sizes are pandas' deep memory_usage, which counts every code string
+once per row.
+
+Usage:
+    python -m benchmarks.bench_schema
+"""
+import time
+
+from backend.model import prepare_inputs
+from backend.sheet_schema import apply_schema, memory_mb
+from benchmarks.synthetic import make_sheets
+
+# (IUs, GUs, periods, lanes per GU)
+CASE = (80, 2500, 6, 5)
+
+
+# ==================================================
+# ENTRY POINT
+# ==================================================
+if __name__ == "__main__":
+    raw = make_sheets(*CASE, min_fulfill_pct=50)
+    # As read_excel returns them: a Python str per code cell
+    for df in raw.values():
+        for column in df.columns:
+            if "CODE" in column or "TYPE" in column:
+                df[column] = df[column].astype(object)
+
+    start = time.perf_counter()
+    typed = {name: apply_schema(name, df.copy()) for name, df in raw.items()}
+    typing_s = time.perf_counter() - start
+
+    print(f"case {CASE}: {sum(len(df) for df in raw.values()):,} rows")
+    for name in raw:
+        print(f"  {name:<18}{memory_mb({name: raw[name]}):>8.1f} MB -> {memory_mb({name: typed[name]}):>6.1f} MB")
+    print(f"  {'total':<18}{memory_mb(raw):>8.1f} MB -> {memory_mb(typed):>6.1f} MB, typed in {typing_s:.2f}s")
+
+    for label, sheets in (("as read", raw), ("typed", typed)):
+        start = time.perf_counter()
+        prepare_inputs(sheets)
+        print(f"  prepare_inputs ({label}): {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,63 @@
+"""
+Benchmark: API-process memory under repeated solves, in process vs in
+isolated solve workers (backend.solve_worker).
+
+Each mode runs in a fresh interpreter and solves the same synthetic
+network ROUNDS times, printing the calling process's RSS after each
+solve, plus the pickled size of a result's solution as records vs id arrays.
+
+Usage:
+    python -m benchmarks.bench_workers
+"""
+import pickle
+import subprocess
+import sys
+
+ROUNDS = 8
+CASE = (40, 300, 6, 4)
+# LP (continuous Trips) so every round solves to optimality quickly
+SETTINGS = {"RELAX_TRIPS": True}
+
+_RUN = """
+import json, resource
+from backend import config, solve_worker
+from benchmarks.synthetic import make_sheets
+
+def rss():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+
+config.SOLVE_WORKERS = %d
+sheets = make_sheets(*%r, min_fulfill_pct=0)
+settings = %r
+out = []
+for _ in range(%d):
+    assert solve_worker.solve(sheets, settings)["success"]
+    out.append(round(rss(), 1))
+print(json.dumps(out))
+"""
+
+
+def run(workers: int) -> list:
+    out = subprocess.run(
+        [sys.executable, "-c", _RUN % (workers, CASE, SETTINGS, ROUNDS)], capture_output=True, text=True, check=True,
+    )
+    return out.stdout.strip().splitlines()[-1]
+
+
+# ==================================================
+# ENTRY POINT
+# ==================================================
+if __name__ == "__main__":
+    from backend.model import solve_clinker_model
+    from backend.network_index import decode_solution
+    from benchmarks.synthetic import make_sheets
+
+    print(f"case {CASE}, {ROUNDS} solves; API-process RSS (MB) after each")
+    print(f"  in process: {run(0)}")
+    print(f"  worker:     {run(1)}")
+
+    result = solve_clinker_model(make_sheets(*CASE, min_fulfill_pct=0), SETTINGS)
+    records = len(pickle.dumps(decode_solution(result["solution"])))
+    arrays = len(pickle.dumps(result["solution"]))
+    print(f"solution pickle: records {records / 1024:.0f} KB, id arrays {arrays / 1024:.0f} KB")
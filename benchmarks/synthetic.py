@@ -0,0 +1,109 @@
+"""
+Synthetic clinker networks for benchmarks and scale tests.
+
+Produces the same sheet DataFrames as backend.model.load_workbook, so
+anything that accepts loaded sheets can be benchmarked on networks far
+larger than the bundled dataset.
+"""
+import numpy as np
+import pandas as pd
+
+
+# ==================================================
+# GENERATOR
+# ==================================================
+def make_sheets(n_iu: int = 20, n_gu: int = 40, n_periods: int = 3,
+                lanes_per_gu: int = 4, seed: int = 0,
+                min_fulfill_pct: float = None) -> dict:
+    """
+    Generate a random but well-formed clinker network.
+
+    Args:
+        n_iu (int): Integrated units (plants with capacity)
+        n_gu (int): Grinding units (demand-only nodes)
+        n_periods (int): Planning periods
+        lanes_per_gu (int): Supplying IUs per GU (each with T1 and T2)
+        seed (int): Random seed
+        min_fulfill_pct (float): If set, each demand row gets a random
+            MIN FULFILLMENT (%) between 0 and this value
+
+    Returns:
+        dict: DataFrames keyed by sheet name
+    """
+    rng = np.random.default_rng(seed)
+    ius = [f"IU_{k:03d}" for k in range(1, n_iu + 1)]
+    gus = [f"GU_{k:03d}" for k in range(1, n_gu + 1)]
+    nodes = ius + gus
+    periods = np.arange(1, n_periods + 1)
+
+    type_df = pd.DataFrame({
+        "IUGU CODE": nodes,
+        "PLANT TYPE": ["IU"] * n_iu + ["GU"] * n_gu,
+    })
+
+    node_col = np.repeat(nodes, n_periods)
+    demand_df = pd.DataFrame({
+        "IUGU CODE": node_col,
+        "TIME PERIOD": np.tile(periods, len(nodes)),
+        "DEMAND": rng.integers(50_000, 300_000, len(node_col)),
+        "MIN FULFILLMENT (%)": (
+            rng.uniform(0, min_fulfill_pct, len(node_col)).round(1)
+            if min_fulfill_pct else np.nan
+        ),
+    })
+
+    iu_col = np.repeat(ius, n_periods)
+    iu_period = np.tile(periods, n_iu)
+    # Enough capacity overall that most demand can be served
+    total_demand = demand_df["DEMAND"].sum()
+    mean_cap = 1.2 * total_demand / (n_iu * n_periods)
+    capacity_df = pd.DataFrame({
+        "IU CODE": iu_col,
+        "TIME PERIOD": iu_period,
+        "CAPACITY": rng.integers(int(0.5 * mean_cap), int(1.5 * mean_cap), len(iu_col)),
+    })
+    prod_cost_df = pd.DataFrame({
+        "IU CODE": iu_col,
+        "TIME PERIOD": iu_period,
+        "PRODUCTION COST": rng.integers(1400, 2300, len(iu_col)),
+    })
+
+    # Each GU is served by a few IUs; IUs also feed a neighbouring IU
+    src = np.concatenate([
+        rng.choice(ius, size=(n_gu, min(lanes_per_gu, n_iu))).ravel(),
+        ius,
+    ])
+    dst = np.concatenate([
+        np.repeat(gus, min(lanes_per_gu, n_iu)),
+        np.roll(ius, 1),
+    ])
+    lanes = pd.DataFrame({"FROM IU CODE": src, "TO IUGU CODE": dst}).drop_duplicates()
+    lanes = lanes[lanes["FROM IU CODE"] != lanes["TO IUGU CODE"]]
+
+    rows = []
+    for mode, cap, cost_lo, cost_hi in [("T1", 1, 300, 2400), ("T2", 3000, 700, 3600)]:
+        block = lanes.loc[lanes.index.repeat(n_periods)].copy()
+        block["TRANSPORT CODE"] = mode
+        block["TIME PERIOD"] = np.tile(periods, len(lanes))
+        block["FREIGHT COST"] = rng.uniform(cost_lo, cost_hi, len(block)).round(2)
+        block["HANDLING COST"] = 0
+        block["QUANTITY MULTIPLIER"] = cap
+        rows.append(block)
+    logistics_df = pd.concat(rows, ignore_index=True)[[
+        "FROM IU CODE", "TO IUGU CODE", "TRANSPORT CODE", "TIME PERIOD",
+        "FREIGHT COST", "HANDLING COST", "QUANTITY MULTIPLIER",
+    ]]
+
+    opening_df = pd.DataFrame({
+        "IUGU CODE": nodes,
+        "OPENING STOCK": rng.uniform(0, 50_000, len(nodes)).round(2),
+    })
+
+    return {
+        "ClinkerDemand": demand_df,
+        "ClinkerCapacity": capacity_df,
+        "ProductionCost": prod_cost_df,
+        "LogisticsIUGU": logistics_df,
+        "IUGUOpeningStock": opening_df,
+        "IUGUType": type_df,
+    }
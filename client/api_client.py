@@ -2,8 +2,14 @@
 API Client for connecting Streamlit frontend to FastAPI backend
 """
 import os
+import threading
+import time
 import requests
 import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+from collections import OrderedDict
 from typing import Dict, List, Optional, Any
 
 # Check st.secrets first (for Streamlit Cloud), then os.environ (for Docker), then fallback to localhost
@@ -12,6 +18,41 @@ try:
 except Exception:
     _DEFAULT_BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
 
+# Seconds to open a connection; read timeouts are set per call
+CONNECT_TIMEOUT = 5
+# How long a successful health check is trusted
+HEALTH_TTL = 30
+# Connections kept alive to the backend
+POOL_SIZE = 10
+# Revalidatable GET payloads kept (least recently used dropped first)
+VALIDATOR_CACHE_SIZE = 64
+
+# Compact /optimize format: per-table columns with dictionary-encoded codes
+COLUMNAR_MEDIA_TYPE = "application/vnd.clinker.columnar+json"
+_RESULT_TABLES = ("production", "shipments", "inventory")
+_CODE_DICTIONARY = {"node": "nodes", "from": "nodes", "to": "nodes", "mode": "modes", "period": "periods"}
+
+
+def decode_columnar(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turn a columnar /optimize response back into the plain JSON shape
+    (lists of record dicts) the pages work with
+    """
+    if payload.get("format") != "columnar":
+        return payload
+    dictionary = payload.get("dictionary", {})
+    result = {k: v for k, v in payload.items() if k not in _RESULT_TABLES + ("format", "dictionary")}
+    for table in _RESULT_TABLES:
+        columns = dict(payload.get(table) or {})
+        columns.pop("length", None)
+        for col, values in columns.items():
+            if col in _CODE_DICTIONARY:
+                codes = dictionary[_CODE_DICTIONARY[col]]
+                columns[col] = [codes[i] for i in values]
+        names = list(columns)
+        result[table] = [dict(zip(names, row)) for row in zip(*columns.values())]
+    return result
+
 
 class BackendAPIClient:
     """Client for communicating with the optimization backend"""
@@ -25,28 +66,117 @@ class BackendAPIClient:
                       Defaults to BACKEND_URL env var or http://localhost:8000.
         """
         self.base_url = base_url.rstrip("/")
+        # (url, params) -> (ETag, payload) of the last 200 for each GET;
+        # bounded LRU, shared by every session's thread (st.cache_resource)
+        self._validators: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._validators_lock = threading.Lock()
+        self._healthy_at: Optional[float] = None
+
+        # One keep-alive pool for every call. Connection failures are
+        # retried for any method (nothing was sent); read errors and
+        # 502/503/504 only for GETs, so a solve is never submitted twice.
+        retry = Retry(
+            total=3, connect=3, read=2, status=2,
+            backoff_factor=0.5,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _get_json(self, path: str, params: Optional[Dict[str, Any]] = None, timeout: float = 10):
+        """
+        GET with revalidation: resend the cached ETag as If-None-Match and
+        reuse the cached payload on 304 (no body transferred)
+
+        Returns:
+            (status_code, payload) - payload is None unless status is 200/304
+        """
+        key = (path, tuple(sorted((params or {}).items())))
+        with self._validators_lock:
+            cached = self._validators.get(key)
+            if cached:
+                self._validators.move_to_end(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        response = self.session.get(
+            f"{self.base_url}{path}", params=params, headers=headers, timeout=(CONNECT_TIMEOUT, timeout)
+        )
+        if response.status_code == 304 and cached:
+            return 200, cached[1]
+        if response.status_code != 200:
+            return response.status_code, None
+        payload = response.json()
+        if response.headers.get("ETag"):
+            with self._validators_lock:
+                self._validators[key] = (response.headers["ETag"], payload)
+                self._validators.move_to_end(key)
+                while len(self._validators) > VALIDATOR_CACHE_SIZE:
+                    self._validators.popitem(last=False)
+        return 200, payload
     
-    def health_check(self) -> bool:
+    def health_check(self, max_age: float = HEALTH_TTL) -> bool:
         """
         Check if the backend is reachable
-        
+
+        A success is remembered for max_age seconds, so back-to-back
+        actions do not each pay a round trip; failures are not cached.
+
         Returns:
             True if backend is healthy, False otherwise
         """
+        if self._healthy_at is not None and time.monotonic() - self._healthy_at < max_age:
+            return True
         try:
             # Render free tier can take up to 50s to wake up from sleep
-            response = requests.get(f"{self.base_url}/health", timeout=60)
-            return response.status_code == 200 and response.json().get("status") == "ok"
+            response = self.session.get(f"{self.base_url}/health", timeout=(CONNECT_TIMEOUT, 60))
+            healthy = response.status_code == 200 and response.json().get("status") == "ok"
         except requests.exceptions.RequestException:
-            return False
+            healthy = False
+        self._healthy_at = time.monotonic() if healthy else None
+        return healthy
     
-    def run_optimization(self, uploaded_file: Optional[Any] = None) -> Dict[str, Any]:
+    def upload_input(self, uploaded_file: Any) -> Dict[str, Any]:
+        """
+        Upload and parse a workbook once (POST /inputs)
+
+        Args:
+            uploaded_file: Streamlit UploadedFile object (Excel file)
+
+        Returns:
+            Dictionary with 'input_id' and a summary of the parsed sheets,
+            or a dict with an 'error' key if the upload failed
+        """
+        try:
+            uploaded_file.seek(0)
+            response = self.session.post(
+                f"{self.base_url}/inputs",
+                files={"file": (uploaded_file.name, uploaded_file, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")},
+                timeout=(CONNECT_TIMEOUT, 120),
+            )
+            if response.status_code == 200:
+                return response.json()
+            try:
+                detail = response.json().get("detail")
+            except ValueError:
+                detail = None
+            return {"error": detail or f"Server returned status code {response.status_code}"}
+        except requests.exceptions.RequestException as e:
+            return {"error": str(e)}
+
+    def run_optimization(self, uploaded_file: Optional[Any] = None, input_id: Optional[str] = None,
+                         **scenario) -> Dict[str, Any]:
         """
         Send optimization request to backend
         
         Args:
             uploaded_file: Optional Streamlit UploadedFile object (Excel file)
                           If None, backend will use default Excel file
+            input_id: Id from upload_input(); solves the stored workbook
+                      without re-sending it (takes precedence over the file)
+            **scenario: Optional demand_scale / freight_scale factors
         
         Returns:
             Dictionary containing optimization results:
@@ -59,28 +189,47 @@ class BackendAPIClient:
                 "message": str (if error)
             }
         """
+        # Columnar body, compressed with whatever urllib3 can decode (gzip, br
+        # when brotli is installed); decoded back to records here
+        headers = {
+            "Accept": f"{COLUMNAR_MEDIA_TYPE}, application/json;q=0.9",
+            "Accept-Encoding": ACCEPT_ENCODING,
+        }
+        params = {k: v for k, v in scenario.items() if v is not None}
         try:
-            if uploaded_file:
+            if input_id:
+                # Workbook already on the server: nothing to upload or parse
+                response = self.session.post(
+                    f"{self.base_url}/optimize",
+                    params={"input_id": input_id, **params},
+                    headers=headers,
+                    timeout=(CONNECT_TIMEOUT, 300)
+                )
+            elif uploaded_file:
                 # Prepare Excel file for upload
                 uploaded_file.seek(0)
                 files = {
                     "file": (uploaded_file.name, uploaded_file, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
                 }
                 
-                response = requests.post(
+                response = self.session.post(
                     f"{self.base_url}/optimize",
                     files=files,
-                    timeout=300  # 5 minutes timeout for optimization
+                    params=params,
+                    headers=headers,
+                    timeout=(CONNECT_TIMEOUT, 300)  # 5 minutes timeout for optimization
                 )
             else:
-                # No file, backend will use default Excel
-                response = requests.post(
+                # No file, backend will use its preloaded default Excel
+                response = self.session.post(
                     f"{self.base_url}/optimize",
-                    timeout=300
+                    params={"input_id": "default", **params},
+                    headers=headers,
+                    timeout=(CONNECT_TIMEOUT, 300)
                 )
             
             if response.status_code == 200:
-                return response.json()
+                return decode_columnar(response.json())
             else:
                 return {
                     "status": "error",
@@ -103,20 +252,146 @@ class BackendAPIClient:
                 "message": f"Unexpected error: {str(e)}"
             }
 
-    def get_history(self) -> Dict[str, Any]:
+    def submit_optimization(self, uploaded_file: Optional[Any] = None, input_id: Optional[str] = None,
+                            **scenario) -> Dict[str, Any]:
         """
-        Fetch the list of past optimization runs from the backend
+        Submit an optimization as a background job (POST /jobs); returns
+        at once instead of holding the request open for the whole solve
+
+        Args:
+            uploaded_file: Optional Streamlit UploadedFile object (Excel file)
+            input_id: Id from upload_input() (takes precedence over the file)
+            **scenario: Optional engine / demand_scale / freight_scale
 
         Returns:
-            Dictionary with a 'runs' key containing a list of run records,
-            or an error dict if the request fails.
+            The job's status dict ('job_id', 'status', ...), or a dict
+            with an 'error' key if it could not be submitted
         """
+        params = {k: v for k, v in scenario.items() if v is not None}
+        files = None
+        if input_id:
+            params["input_id"] = input_id
+        elif uploaded_file:
+            uploaded_file.seek(0)
+            files = {"file": (uploaded_file.name, uploaded_file, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")}
         try:
-            response = requests.get(f"{self.base_url}/history", timeout=10)
+            response = self.session.post(
+                f"{self.base_url}/jobs", params=params, files=files, timeout=(CONNECT_TIMEOUT, 120)
+            )
             if response.status_code == 200:
                 return response.json()
+            try:
+                detail = response.json().get("detail")
+            except ValueError:
+                detail = None
+            return {"error": detail or f"Server returned status code {response.status_code}",
+                    "status_code": response.status_code}
+        except requests.exceptions.RequestException as e:
+            return {"error": str(e)}
+
+    def get_job(self, job_id: str) -> Dict[str, Any]:
+        """
+        Status of a submitted job
+
+        Returns:
+            Dictionary with 'status' (queued, running, done, failed),
+            or a dict with an 'error' key if the request fails (plus
+            'status_code' if the server answered)
+        """
+        try:
+            response = self.session.get(f"{self.base_url}/jobs/{job_id}", timeout=(CONNECT_TIMEOUT, 10))
+            if response.status_code == 200:
+                return response.json()
+            return {"error": f"Server returned status code {response.status_code}",
+                    "status_code": response.status_code}
+        except requests.exceptions.RequestException as e:
+            return {"error": str(e)}
+
+    def get_job_result(self, job_id: str) -> Dict[str, Any]:
+        """
+        Result of a finished job, in the same shape as run_optimization()
+        """
+        headers = {
+            "Accept": f"{COLUMNAR_MEDIA_TYPE}, application/json;q=0.9",
+            "Accept-Encoding": ACCEPT_ENCODING,
+        }
+        try:
+            response = self.session.get(
+                f"{self.base_url}/jobs/{job_id}/result", headers=headers, timeout=(CONNECT_TIMEOUT, 60)
+            )
+            if response.status_code == 200:
+                return decode_columnar(response.json())
+            return {"status": "error", "message": f"Server returned status code {response.status_code}"}
+        except requests.exceptions.RequestException as e:
+            return {"status": "error", "message": str(e)}
+
+    def export_run(self, run_id: int, fmt: str = "csv") -> Optional[bytes]:
+        """
+        Download a run's plan from the backend's streaming export
+
+        Args:
+            run_id: History id of the run
+            fmt: "csv" or "ndjson"
+
+        Returns:
+            The exported file as bytes, or None if the export failed
+        """
+        try:
+            with self.session.get(
+                f"{self.base_url}/runs/{run_id}/export",
+                params={"format": fmt},
+                stream=True,
+                timeout=(CONNECT_TIMEOUT, 60),
+            ) as response:
+                if response.status_code != 200:
+                    return None
+                return b"".join(response.iter_content(chunk_size=64 * 1024))
+        except requests.exceptions.RequestException:
+            return None
+
+    def get_flows(self, run_id: int, **params) -> Dict[str, Any]:
+        """
+        Fetch aggregated shipment flows of a run
+
+        Args:
+            run_id: History id of the run
+            **params: Optional group_by, iu, gu, mode, period_from,
+                      period_to, top (see GET /runs/{id}/flows)
+
+        Returns:
+            Dictionary with 'rows', 'sources' and 'totals', or a dict
+            with an 'error' key if the request fails.
+        """
+        params = {k: v for k, v in params.items() if v is not None}
+        try:
+            status, payload = self._get_json(f"/runs/{run_id}/flows", params, timeout=30)
+            if status == 200:
+                return payload
+            return {"rows": [], "error": f"Server returned {status}"}
+        except requests.exceptions.RequestException as e:
+            return {"rows": [], "error": str(e)}
+
+    def get_history(self, limit: int = 20, offset: int = 0, **filters) -> Dict[str, Any]:
+        """
+        Fetch one page of past optimization runs from the backend
+
+        Args:
+            limit: Page size
+            offset: Runs to skip (newest first)
+            **filters: Optional filename, status, since, until
+
+        Returns:
+            Dictionary with a 'runs' key containing a list of run records
+            and 'total' matching runs, or an error dict if the request fails.
+        """
+        params = {"limit": limit, "offset": offset}
+        params.update({k: v for k, v in filters.items() if v})
+        try:
+            status, payload = self._get_json("/history", params, timeout=10)
+            if status == 200:
+                return payload
             else:
-                return {"runs": [], "error": f"Server returned {response.status_code}"}
+                return {"runs": [], "error": f"Server returned {status}"}
         except requests.exceptions.ConnectionError:
             return {"runs": [], "error": "Cannot connect to backend"}
         except Exception as e:
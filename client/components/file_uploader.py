@@ -1,51 +1,35 @@
-import io
+import hashlib
+import logging
+
 import streamlit as st
 import pandas as pd
-from api_client import BackendAPIClient
+from api_client import get_api_client
+from view_models import result_csv
 
-def convert_result_to_csv(result):
-    """Convert optimization result to CSV format"""
-    output = io.StringIO()
-    
-    # Summary Section
-    output.write("=== OPTIMIZATION SUMMARY ===\n")
-    output.write(f"Status,{result.get('status')}\n")
-    output.write(f"Objective Value,{result.get('objective_value')}\n")
-    output.write(f"Solver,{result.get('solver')}\n")
-    output.write(f"Message,{result.get('message')}\n")
-    
-    if "summary" in result:
-        summary = result["summary"]
-        output.write(f"Total Production,{summary.get('total_production')}\n")
-        output.write(f"Total Shipments,{summary.get('total_shipments')}\n")
-        output.write(f"Total Trips,{summary.get('total_trips')}\n")
-        output.write(f"Number of Nodes,{summary.get('num_nodes')}\n")
-        output.write(f"Number of Periods,{summary.get('num_periods')}\n")
-    
-    output.write("\n")
-    
-    # Production Section
-    if result.get("production"):
-        output.write("=== PRODUCTION ===\n")
-        df_prod = pd.DataFrame(result["production"])
-        df_prod.to_csv(output, index=False)
-        output.write("\n")
-    
-    # Shipments Section
-    if result.get("shipments"):
-        output.write("=== SHIPMENTS ===\n")
-        df_ship = pd.DataFrame(result["shipments"])
-        df_ship.to_csv(output, index=False)
-        output.write("\n")
-    
-    # Inventory Section
-    if result.get("inventory"):
-        output.write("=== INVENTORY ===\n")
-        df_inv = pd.DataFrame(result["inventory"])
-        df_inv.to_csv(output, index=False)
-        output.write("\n")
-    
-    return output.getvalue()
+logger = logging.getLogger(__name__)
+
+def _content_key(uploaded_file):
+    """SHA-256 of the file's bytes (the server's input id for the same content)"""
+    return hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+
+def get_input_id(api_client, uploaded_file):
+    """
+    Input id of an uploaded file, uploading and parsing it on the server
+    the first time; later runs and scenarios send only the id.
+    Cached by content, so an edited workbook re-uploaded under the same
+    name (and size) is uploaded again.
+    Returns None if the upload failed (the file is then sent with the run).
+    """
+    if "input_ids" not in st.session_state:
+        st.session_state.input_ids = {}
+    key = _content_key(uploaded_file)
+    if key not in st.session_state.input_ids:
+        info = api_client.upload_input(uploaded_file)
+        if "input_id" not in info:
+            return None
+        st.session_state.input_ids[key] = info["input_id"]
+    st.session_state.input_id = st.session_state.input_ids[key]
+    return st.session_state.input_id
 
 def display_uploader_and_button(nav_right_col):
     """Display file uploader and optimization button"""
@@ -96,8 +80,15 @@ def display_uploader_and_button(nav_right_col):
         with col_btn2:
             backend_result = st.session_state.get("optimization_result")
             if backend_result and backend_result.get("status") == "success":
-                # Convert backend data to CSV
-                csv_data = convert_result_to_csv(backend_result)
+                # Stream the archived run from the backend (once per run);
+                # re-serialize the session result only if it was not archived
+                run_id = backend_result.get("run_id")
+                if run_id is not None and st.session_state.get("export_run_id") != run_id:
+                    st.session_state.export_file = get_api_client().export_run(run_id)
+                    st.session_state.export_run_id = run_id
+                csv_data = st.session_state.get("export_file") if run_id is not None else None
+                if csv_data is None:
+                    csv_data = result_csv(backend_result)
                 st.download_button(
                     label="Export CSV",
                     data=csv_data,
@@ -147,7 +138,7 @@ def display_uploader_and_button(nav_right_col):
     return False
 
 def handle_optimization():
-    """Handle optimization button click and call backend"""
+    """Handle optimization button click: submit a backend job and return at once"""
     
     # Get uploaded file from session state
     uploaded_file = st.session_state.get("uploaded_file")
@@ -157,8 +148,8 @@ def handle_optimization():
         st.error("❌ Please upload an Excel file before running optimization")
         return
     
-    # Initialize API client
-    api_client = BackendAPIClient()
+    # Shared client: pooled keep-alive session, health cached for a few seconds
+    api_client = get_api_client()
     
     # Check backend health
     with st.spinner("Connecting to backend..."):
@@ -166,64 +157,80 @@ def handle_optimization():
             st.error(f"❌ Backend is not running at `{api_client.base_url}`. Please start the backend server:\n\n`uvicorn backend.main:app --reload`")
             return
     
-    # Run optimization
-    with st.spinner("Running optimization... This may take a few minutes."):
-        try:
-            # Call backend with uploaded file
-            import sys
-            print(f"🔄 Calling /optimize endpoint with file: {uploaded_file.name}", file=sys.stderr, flush=True)
-            result = api_client.run_optimization(uploaded_file)
-            
-            # Log the response
-            print("=" * 60, file=sys.stderr, flush=True)
-            print("📦 BACKEND RESPONSE FROM /optimize:", file=sys.stderr, flush=True)
-            print("=" * 60, file=sys.stderr, flush=True)
-            print(f"Status: {result.get('status')}", file=sys.stderr, flush=True)
-            print(f"Success: {result.get('success')}", file=sys.stderr, flush=True)
-            print(f"Message: {result.get('message')}", file=sys.stderr, flush=True)
-            print(f"Objective Value: {result.get('objective_value')}", file=sys.stderr, flush=True)
-            
-            if "production" in result:
-                print(f"Production records: {len(result['production'])}", file=sys.stderr, flush=True)
-                if result['production']:
-                    print(f"Sample production: {result['production'][0]}", file=sys.stderr, flush=True)
-            
-            if "shipments" in result:
-                print(f"Shipment records: {len(result['shipments'])}", file=sys.stderr, flush=True)
-                if result['shipments']:
-                    print(f"Sample shipment: {result['shipments'][0]}", file=sys.stderr, flush=True)
-            
-            if "inventory" in result:
-                print(f"Inventory records: {len(result['inventory'])}", file=sys.stderr, flush=True)
-                if result['inventory']:
-                    print(f"Sample inventory: {result['inventory'][0]}", file=sys.stderr, flush=True)
-            
-            if "summary" in result:
-                print(f"Summary: {result['summary']}", file=sys.stderr, flush=True)
-            
-            print("=" * 60, file=sys.stderr, flush=True)
-            
-            # Check result status
-            if result.get("status") == "success":
-                # Store result in session state for display in tabs
-                st.session_state.optimization_result = result
-                st.session_state.backend_connected = True
-                
-                st.success("✅ Optimization completed successfully!")
+    # Submit the solve; poll_optimization_job() picks up the result while
+    # the tabs of the previous run stay usable
+    input_id = get_input_id(api_client, uploaded_file)
+    job = api_client.submit_optimization(uploaded_file, input_id=input_id)
+    if input_id and job.get("status_code") == 404:
+        # Stored input evicted on the server: forget it and send the file
+        st.session_state.input_ids.pop(_content_key(uploaded_file), None)
+        job = api_client.submit_optimization(uploaded_file)
+    
+    if "error" in job:
+        st.error(f"❌ Error: {job['error']}")
+        logger.warning("Submitting %s to /jobs failed: %s", uploaded_file.name, job["error"])
+        return
+    st.session_state.job_id = job["job_id"]
+    st.session_state.job_notice = None
+
+
+def _log_result(result):
+    """Log a finished job's outcome (status, objective, record counts)"""
+    counts = {table: len(result[table]) for table in ("production", "shipments", "inventory") if table in result}
+    logger.info(
+        "Job result: %s (%s), objective %s, records %s",
+        result.get("status"), result.get("message"), result.get("objective_value"), counts,
+    )
+
+
+@st.fragment(run_every=2)
+def poll_optimization_job():
+    """
+    Status of the submitted optimization, re-run every 2 seconds on its
+    own; once the job finishes its result replaces the displayed one and
+    the whole page re-renders.
+    """
+    job_id = st.session_state.get("job_id")
+    if job_id is None:
+        # Outcome of the job that just finished (shown once)
+        notice = st.session_state.pop("job_notice", None)
+        if notice:
+            level, text = notice
+            getattr(st, level)(text)
+            if level == "success":
                 st.balloons()
-                
-                # Display key results
-                if "objective_value" in result:
-                    st.metric("Total Cost", f"₹{result['objective_value']:,.2f}")
-                
-            elif result.get("status") == "error":
-                st.error(f"❌ Error: {result.get('message', 'Unknown error')}")
-                print(f"❌ ERROR: {result.get('message', 'Unknown error')}", file=sys.stderr, flush=True)
-                
-            elif result.get("status") == "failed":
-                st.warning(f"⚠️ Optimization failed: {result.get('message', 'Solver failed')}")
-                print(f"⚠️ FAILED: {result.get('message', 'Solver failed')}", file=sys.stderr, flush=True)
-                
-        except Exception as e:
-            st.error(f"❌ Unexpected error: {str(e)}")
-            print(f"❌ EXCEPTION: {str(e)}", file=sys.stderr, flush=True)
\ No newline at end of file
+        return
+
+    api_client = get_api_client()
+    job = api_client.get_job(job_id)
+    status = job.get("status")
+    if status in ("queued", "running"):
+        st.info(f"⏳ Optimization {status}... You can keep exploring the current results.")
+        return
+    if "error" in job and job.get("status_code") != 404:
+        # Network blip or busy backend: the job may still be running, so
+        # keep its id and ask again on the next tick; only 404 means it is gone
+        logger.warning("Polling job %s failed: %s", job_id, job["error"])
+        st.info("⏳ Waiting for the backend to answer... The optimization is still tracked.")
+        return
+
+    st.session_state.job_id = None
+    if status == "done":
+        result = api_client.get_job_result(job_id)
+        # Keys the cached view models of a result that was not archived
+        result["job_id"] = job_id
+        _log_result(result)
+        if result.get("status") == "success":
+            # Store result in session state for display in tabs
+            st.session_state.optimization_result = result
+            st.session_state.backend_connected = True
+            st.session_state.job_notice = (
+                "success", f"✅ Optimization completed successfully! Total Cost: ₹{result['objective_value']:,.2f}"
+            )
+        else:
+            st.session_state.job_notice = ("error", f"❌ Error: {result.get('message', 'Unknown error')}")
+    elif status == "failed":
+        st.session_state.job_notice = ("warning", f"⚠️ Optimization failed: {job.get('message') or 'Solver failed'}")
+    else:
+        st.session_state.job_notice = ("error", f"❌ Error: {job.get('error', 'Unknown job status')}")
+    st.rerun()
@@ -1,4 +1,5 @@
 import streamlit as st
+from view_models import view_model
 
 def display_kpi_cards():
     """Display KPI cards row"""
@@ -7,16 +8,14 @@ def display_kpi_cards():
     backend_result = st.session_state.get("optimization_result")
     
     if backend_result and backend_result.get("status") == "success":
-        # Use backend data
-        total_cost = backend_result.get("objective_value", 0)
-        solver_status = "optimal" if backend_result.get("success") else "failed"
-        solver_name = backend_result.get("solver", "CBC")
+        # Use backend data (totals computed once per result)
+        kpis = view_model(backend_result)["kpis"]
+        total_cost = kpis["total_cost"]
+        solver_status = "optimal" if kpis["success"] else "failed"
+        solver_name = kpis["solver"]
         
-        production = backend_result.get("production", [])
-        summary = backend_result.get("summary", {})
-        
-        active_plants = len(set(p["node"] for p in production))
-        total_plants = summary.get("num_nodes", active_plants)
+        active_plants = kpis["active_plants"]
+        total_plants = kpis["total_plants"]
         
         cost_display = f"₹{total_cost/1e9:.2f}B" if total_cost > 1e9 else f"₹{total_cost/1e6:.2f}M"
         plants_display = f"{active_plants}/{total_plants}"
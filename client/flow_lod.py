@@ -0,0 +1,126 @@
+"""
+Level of detail for flow charts and tables
+
+A plan with thousands of lanes makes a Sankey nobody can read and a
+payload the browser struggles with. These helpers keep the largest lanes
+and fold the rest into "other" links, and page through the full list.
+Plain pandas (no Streamlit) so benchmarks can measure them.
+"""
+import math
+from typing import Dict, List, Sequence
+
+import pandas as pd
+
+# ==================================================
+# CONFIG
+# ==================================================
+# The dashboard's cost proxy: 10 per MT shipped or held
+COST_PER_UNIT = 10
+
+# Lanes drawn individually in the Sankey by default
+DEFAULT_TOP_LANES = 40
+# Rows per page of the flow table
+PAGE_SIZE = 50
+
+# Nodes the folded lanes flow from / to
+OTHER_SOURCES = "Other IUs"
+OTHER_TARGETS = "Other destinations"
+
+# Sankey colors: IU (plants) darker, GU (warehouses) lighter, folded lanes grey
+IU_COLOR = "#5A7863"
+GU_COLOR = "#90AB8B"
+OTHER_COLOR = "#B8C2BC"
+
+_VALUES = ["trips", "quantity", "cost"]
+
+
+# ==================================================
+# AGGREGATION
+# ==================================================
+def aggregate_flows(shipments: pd.DataFrame, keys: Sequence[str] = ("from", "to")) -> pd.DataFrame:
+    """
+    Shipments summed over everything not in keys (periods, modes, ...):
+    one row per key, indexed by it, with trips, quantity and cost
+    """
+    keys = list(keys)
+    if shipments.empty:
+        return pd.DataFrame(
+            {column: [] for column in _VALUES},
+            index=pd.MultiIndex.from_tuples([], names=keys),
+        )
+    if "cost" not in shipments:
+        shipments = shipments.assign(cost=shipments["quantity"] * COST_PER_UNIT)
+    # sort=False keeps first-appearance order, like the old dict aggregation
+    return shipments.groupby(keys, sort=False)[_VALUES].sum()
+
+
+def top_lanes(flows: pd.DataFrame, n: int = DEFAULT_TOP_LANES) -> pd.DataFrame:
+    """
+    The n largest (from, to) lanes by quantity; the rest folded into one
+    "other" link per shown source (so its outflow stays exact) plus one
+    link from OTHER_SOURCES for sources not shown at all.
+
+    Returns at most 2n + 1 rows, indexed like flows.
+    """
+    if len(flows) <= n:
+        return flows
+    ranked = flows.sort_values("quantity", ascending=False)
+    top = ranked.iloc[:n]
+    rest = ranked.iloc[n:].reset_index()
+    shown = top.index.get_level_values("from").unique()
+    rest["from"] = rest["from"].where(rest["from"].isin(shown), OTHER_SOURCES)
+    rest["to"] = OTHER_TARGETS
+    other = rest.groupby(["from", "to"], sort=False)[_VALUES].sum()
+    return pd.concat([top, other])
+
+
+# ==================================================
+# RENDER DATA
+# ==================================================
+def _node_color(node: str) -> str:
+    if node in (OTHER_SOURCES, OTHER_TARGETS):
+        return OTHER_COLOR
+    return IU_COLOR if node.startswith("IU") else GU_COLOR
+
+
+def sankey_data(flows: pd.DataFrame, value_scale: float = 0.25) -> Dict[str, List]:
+    """
+    Node and link arrays for a Plotly Sankey of (from, to) flows
+
+    Link values are scaled by value_scale so ribbons stay thin; the real
+    quantities ride along as customdata for the hover text.
+    """
+    sources = flows.index.get_level_values("from")
+    targets = flows.index.get_level_values("to")
+    labels = list(dict.fromkeys(sources.tolist() + targets.tolist()))
+    position = {node: i for i, node in enumerate(labels)}
+    values = flows["quantity"]
+    return {
+        "labels": labels,
+        "colors": [_node_color(node) for node in labels],
+        "source": [position[node] for node in sources],
+        "target": [position[node] for node in targets],
+        "value": (values * value_scale).tolist(),
+        "customdata": values.tolist(),
+    }
+
+
+def page_count(rows: int, page_size: int = PAGE_SIZE) -> int:
+    return max(1, math.ceil(rows / page_size))
+
+
+def table_page(flows: pd.DataFrame, page: int, page_size: int = PAGE_SIZE) -> pd.DataFrame:
+    """
+    One page (1-based) of the flow table, largest lanes first, with
+    display column names
+    """
+    ranked = flows.sort_values("quantity", ascending=False)
+    start = (page - 1) * page_size
+    rows = ranked.iloc[start:start + page_size].reset_index()
+    return pd.DataFrame({
+        "Source": rows["from"],
+        "Target": rows["to"],
+        "Qty (MT)": rows["quantity"],
+        "Trips": rows["trips"],
+        "Cost (₹)": rows["cost"],
+    })
@@ -6,7 +6,7 @@ from config import setup_page, setup_plotly_theme, apply_styles
 # Import components
 from components.navbar import display_navbar, display_section_nav
 from components.kpi_cards import display_kpi_cards
-from components.file_uploader import display_uploader_and_button, handle_optimization
+from components.file_uploader import display_uploader_and_button, handle_optimization, poll_optimization_job
 from components.footer import display_footer
 
 # Import pages
@@ -122,6 +122,9 @@ with col_actions:
 if optimize_clicked:
     handle_optimization()
 
+# Progress of a submitted run (refreshes itself, not the page)
+poll_optimization_job()
+
 # ===== Tabs Content =====
 if selected_tab == "Overview":
     display_overview_tab()
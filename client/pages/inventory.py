@@ -1,6 +1,7 @@
 import streamlit as st
 import plotly.graph_objects as go
 import pandas as pd
+from view_models import inventory_frame, view_model
 
 def display_inventory_tab():
     """Display Inventory tab content"""
@@ -11,12 +12,9 @@ def display_inventory_tab():
     backend_result = st.session_state.get("optimization_result")
     
     if backend_result and backend_result.get("status") == "success":
-        # Use backend data - convert to expected format
-        inventory = backend_result.get("inventory", [])
-        inventory_data = [
-            (i["node"], int(i["period"]), i["quantity"] * 10)  # multiply by 10 for cost proxy
-            for i in inventory
-        ]
+        # Use backend data - indexed by (node, period) once per run
+        model = view_model(backend_result)
+        inventory, all_nodes = model["inventory"], model["inventory_nodes"]
     else:
         # Fallback to mock data
         # Format: (node, period, cost)
@@ -45,22 +43,21 @@ def display_inventory_tab():
         ('GU_011', 1, 543.21),
         ('GU_012', 1, 1876.54),
         ('GU_013', 2, 987.43),
-    ]
+        ]
+        inventory = inventory_frame(pd.DataFrame(inventory_data, columns=["node", "period", "cost"]).assign(quantity=0))
+        all_nodes = sorted(inventory.index.get_level_values("node").unique())
     
-    # Get all unique nodes for selector
-    all_nodes = sorted(set([row[0] for row in inventory_data]))
+    # Node selector
     node = st.selectbox("Select Node", all_nodes)
     
-    # Filter data for selected node
-    node_data = [row for row in inventory_data if row[0] == node]
-    
-    if not node_data:
+    if node is None:
         st.warning(f"No inventory cost data for {node}")
         return
     
-    # Extract periods and costs
-    periods = [row[1] for row in node_data]
-    costs = [row[2] for row in node_data]
+    # Periods and costs of the selected node (index lookup, no scan)
+    node_data = inventory.xs(node, level="node")
+    periods = node_data.index.tolist()
+    costs = node_data["cost"].tolist()
     
     # Calculate metrics
     total_unmet = sum(costs)
@@ -1,6 +1,43 @@
 import streamlit as st
 import plotly.graph_objects as go
 import pandas as pd
+from api_client import get_api_client
+from flow_lod import DEFAULT_TOP_LANES, PAGE_SIZE, aggregate_flows, page_count, sankey_data, table_page, top_lanes
+from view_models import view_model
+
+
+@st.cache_data(show_spinner=False)
+def _fetch_flows(run_id, iu=None, mode=None):
+    """
+    Flows of an archived run aggregated by source->target on the server,
+    cached per run, IU and mode as a frame indexed like view_model()["flows"]
+    """
+    result = get_api_client().get_flows(run_id, group_by="from,to", iu=iu, mode=mode)
+    if "error" in result:
+        # Raise so failures are not cached
+        raise RuntimeError(result["error"])
+    rows = pd.DataFrame(result["rows"], columns=["from", "to", "trips", "quantity"])
+    return {"flows": aggregate_flows(rows), "sources": result["sources"], "modes": result.get("modes", [])}
+
+
+def _server_flows(run_id, iu=None, mode=None):
+    """Server-side flows, or None if the run is not archived / backend unreachable"""
+    if run_id is None:
+        return None
+    try:
+        return _fetch_flows(run_id, iu, mode)
+    except RuntimeError:
+        return None
+
+
+def _drill_down(lanes, iu, mode):
+    """(from, to) flows of session / mock lanes for one IU and / or mode"""
+    if mode != "All":
+        lanes = lanes[lanes.index.get_level_values("mode") == mode]
+    if iu != "All":
+        lanes = lanes[lanes.index.get_level_values("from") == iu]
+    return lanes.groupby(level=["from", "to"], sort=False).sum()
+
 
 def display_network_flow_tab():
     """Display Network Flow tab content"""
@@ -11,13 +48,15 @@ def display_network_flow_tab():
     backend_result = st.session_state.get("optimization_result")
     
     if backend_result and backend_result.get("status") == "success":
-        # Use backend data - convert to expected format
-        shipments = backend_result.get("shipments", [])
-        transport_data = [
-            (s["from"], s["to"], s["mode"], int(s["period"]), s["trips"], s["quantity"], s["quantity"] * 10)
-            for s in shipments
-        ]
+        # Aggregated on the server when the run is archived; otherwise
+        # the session result's flows, aggregated once per run
+        server = _server_flows(backend_result.get("run_id"))
+        if server is None:
+            model = view_model(backend_result)
+            lanes, all_flows = model["lanes"], model["flows"]
+            all_ius, all_modes = model["sources"], model["modes"]
     else:
+        server = None
         # Fallback to mock data
         # Format: (source, target, mode, period, trips, qty, cost)
         transport_data = [
@@ -82,13 +121,20 @@ def display_network_flow_tab():
         ('IU_005', 'GU_010', 'T2', 2, 6, 18000.00, 5438.76),
         ('IU_017', 'GU_024', 'T2', 2, 24764, 24764.00, 40786308.00),
         ('IU_019', 'GU_013', 'T2', 1, 9, 27000.00, 6233.76),
-    ]
+        ]
+        lanes = aggregate_flows(pd.DataFrame(
+            transport_data, columns=["from", "to", "mode", "period", "trips", "quantity", "cost"]
+        ), ("from", "to", "mode"))
+        all_flows = lanes.groupby(level=["from", "to"], sort=False).sum()
+        all_ius = sorted(lanes.index.get_level_values("from").unique())
+        all_modes = sorted(lanes.index.get_level_values("mode").unique())
 
     # Selector for IU node with search feature
-    all_ius = sorted(set([t[0] for t in transport_data]))
+    if server:
+        all_ius, all_modes = server["sources"], server["modes"]
     
-    # Create search and dropdown in columns
-    col_search, col_dropdown = st.columns([0.8, 1.2])
+    # Create search and dropdowns in columns
+    col_search, col_dropdown, col_mode, col_top = st.columns([0.8, 1.2, 0.8, 1.2])
     
     with col_search:
         search_text = st.text_input("Search IU", placeholder="e.g., IU_001", label_visibility="collapsed")
@@ -103,64 +149,50 @@ def display_network_flow_tab():
     
     with col_dropdown:
         choice = st.selectbox("Production Node", ["All"] + filtered_ius, index=0, label_visibility="collapsed")
+    with col_mode:
+        mode = st.selectbox("Mode", ["All"] + list(all_modes), index=0, label_visibility="collapsed")
 
-    # Filter data if a specific IU is chosen
-    if choice != "All":
-        filtered_data = [t for t in transport_data if t[0] == choice]
+    # Drill down: filtered and aggregated on the server for archived runs
+    if server:
+        if choice != "All" or mode != "All":
+            server = _server_flows(
+                backend_result.get("run_id"),
+                None if choice == "All" else choice,
+                None if mode == "All" else mode,
+            ) or {"flows": server["flows"].iloc[:0]}
+        flows = server["flows"]
+    elif choice == "All" and mode == "All":
+        flows = all_flows
     else:
-        filtered_data = transport_data
+        flows = _drill_down(lanes, choice, mode)
 
-    if not filtered_data:
+    if flows.empty:
         st.warning("No flows for the selected production node.")
         return
-    
-    # Aggregate flows by source->target (sum trips/qty/cost across all periods/modes)
-    flow_dict = {}
-    for source, target, mode, period, trips, qty, cost in filtered_data:
-        key = (source, target)
-        if key not in flow_dict:
-            flow_dict[key] = {'trips': 0, 'qty': 0, 'cost': 0}
-        flow_dict[key]['trips'] += trips
-        flow_dict[key]['qty'] += qty
-        flow_dict[key]['cost'] += cost
-    
-    sources = [k[0] for k in flow_dict.keys()]
-    targets = [k[1] for k in flow_dict.keys()]
-    values = [flow['qty'] for flow in flow_dict.values()]
-    
-    # Create node labels
-    all_nodes = list(dict.fromkeys(sources + targets))
-    node_dict = {node: idx for idx, node in enumerate(all_nodes)}
-    
-    # Map to indices
-    source_indices = [node_dict[s] for s in sources]
-    target_indices = [node_dict[t] for t in targets]
-    
-    # Color nodes: IU (plants) are darker, GU (warehouses) are lighter
-    node_colors = []
-    for node in all_nodes:
-        if node.startswith('IU'):
-            node_colors.append('#5A7863')  # Dark green for IU
-        else:
-            node_colors.append('#90AB8B')  # Light green for GU
-    
-    # Scale link thickness down so ribbons appear thinner while keeping original volumes in hover
-    value_scale = 0.25
-    scaled_values = [v * value_scale for v in values]
+
+    # Level of detail: the largest lanes drawn, the rest folded into "other"
+    with col_top:
+        top_n = DEFAULT_TOP_LANES
+        if len(flows) > DEFAULT_TOP_LANES:
+            top_n = st.slider("Lanes shown", 10, min(len(flows), 200), DEFAULT_TOP_LANES, step=10,
+                              label_visibility="collapsed", help="Largest lanes drawn; the rest are grouped as other")
+    sankey = sankey_data(top_lanes(flows, top_n))
+    if len(flows) > top_n:
+        st.caption(f"Showing the {top_n} largest of {len(flows):,} lanes; the rest are grouped as other.")
 
     fig_sankey = go.Figure(data=[go.Sankey(
         node=dict(
             pad=28,
             thickness=12,
             line=dict(color="white", width=2),
-            label=all_nodes,
-            color=node_colors
+            label=sankey["labels"],
+            color=sankey["colors"]
         ),
         link=dict(
-            source=source_indices,
-            target=target_indices,
-            value=scaled_values,
-            customdata=values,
+            source=sankey["source"],
+            target=sankey["target"],
+            value=sankey["value"],
+            customdata=sankey["customdata"],
             color='rgba(90, 120, 99, 0.32)',
             hovertemplate='%{source.label} → %{target.label}<br>Volume: %{customdata} trips<extra></extra>'
         )
@@ -176,69 +208,20 @@ def display_network_flow_tab():
     
     st.plotly_chart(fig_sankey, use_container_width=True)
     
-    # Data table
+    # Data table: every lane, one page at a time (largest first)
     st.markdown("### Flow Details")
-
-    # Create the DataFrame with actual transport data
-    df_flow = pd.DataFrame({
-        'Source': sources,
-        'Target': targets,
-        'Qty (MT)': [flow['qty'] for flow in flow_dict.values()],
-        'Trips': [flow['trips'] for flow in flow_dict.values()],
-        'Cost (₹)': [flow['cost'] for flow in flow_dict.values()]
-    })
-    
-    # Format columns with thousand separators
-    df_flow['Qty (MT)'] = df_flow['Qty (MT)'].apply(lambda x: f"{int(x):,}")
-    df_flow['Trips'] = df_flow['Trips'].apply(lambda x: f"{int(x):,}")
-    df_flow['Cost (₹)'] = df_flow['Cost (₹)'].apply(lambda x: f"{int(x):,}")
-
-    # Enhanced styling for the DataFrame
-    styled_df = (
-        df_flow.style
-        .set_properties(**{
-            'color': '#1F3D2B',
-            'border': '1px solid #E0E6E2',
-            'padding': '12px',
-            'font-size': '14px',
-            'text-align': 'center'
-        })
-        .set_table_styles([
-            {
-                'selector': 'th',
-                'props': [
-                    ('background-color', '#2d5f3f'),
-                    ('color', '#FFFFFF'),
-                    ('font-weight', '700'),
-                    ('font-size', '13px'),
-                    ('border', '1px solid #1f4529'),
-                    ('padding', '14px'),
-                    ('text-align', 'center'),
-                    ('letter-spacing', '0.5px')
-                ]
-            },
-            {
-                'selector': 'td',
-                'props': [
-                    ('padding', '12px 14px'),
-                    ('background-color', '#f9faf9'),
-                    ('border-bottom', '1px solid #E0E6E2'),
-                ]
-            },
-            {
-                'selector': 'tr:nth-child(even)',
-                'props': [
-                    ('background-color', '#f0f4f2'),
-                ]
-            },
-            {
-                'selector': 'tr:hover',
-                'props': [
-                    ('background-color', '#e8f0eb'),
-                    ('box-shadow', '0 2px 4px rgba(31, 69, 41, 0.1)')
-                ]
-            }
-        ])
+    pages = page_count(len(flows))
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1)
+    st.dataframe(
+        table_page(flows, page),
+        hide_index=True,
+        use_container_width=True,
+        height=min(PAGE_SIZE, len(flows)) * 35 + 38,
+        column_config={
+            "Qty (MT)": st.column_config.NumberColumn(format="%,d"),
+            "Trips": st.column_config.NumberColumn(format="%,d"),
+            "Cost (₹)": st.column_config.NumberColumn(format="%,d"),
+        },
     )
-
-    st.table(styled_df)
@@ -123,19 +123,28 @@ def display_history_panel():
     st.subheader("Optimization History")
     st.caption("Previous run results")
 
-    # Fetch real history from backend
-    from api_client import BackendAPIClient
-    client = BackendAPIClient()
-    data = client.get_history()
+    # Fetch one page of real history from backend
+    # Shared client: its ETag cache turns unchanged pages into 304s
+    from api_client import get_api_client
+    client = get_api_client()
+    page_size = 10
+    page = st.session_state.get("history_page", 1)
+    data = client.get_history(limit=page_size, offset=(page - 1) * page_size)
     runs = data.get("runs", [])
+    total = data.get("total", len(runs))
 
     if not runs:
         st.info("No optimization runs recorded yet. Run an optimization to see history here.")
         return
 
+    if total > page_size:
+        pages = (total + page_size - 1) // page_size
+        st.number_input("Page", min_value=1, max_value=pages, step=1, key="history_page")
+        st.caption(f"Page {page} of {pages} · {total} runs")
+
     # Build display table
     history_data = {
-        'Run #': [f"#{i+1}" for i in range(len(runs))],
+        'Run #': [f"#{r['id']}" if r.get("id") else f"#{i+1}" for i, r in enumerate(runs)],
         'Date': [r.get("timestamp", "—") for r in runs],
         'File': [r.get("filename", "—") for r in runs],
         'Total (₹B)': [
@@ -193,7 +202,7 @@ def display_history_panel():
     st.markdown("### Summary")
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Runs", len(runs))
+        st.metric("Total Runs", total)
     with col2:
         st.metric("Best Cost", f"₹{best_cost/1e9:.2f}B" if best_cost else "—")
     with col3:
@@ -1,4 +1,5 @@
 import streamlit as st
+from api_client import get_api_client
 
 def display_scenarios_tab():
     """Display Scenario Analysis tab content"""
@@ -29,25 +30,54 @@ def display_scenarios_tab():
                 else "Fuel Cost +15%"
             )
 
-            new_cost = 5.10 if demand_up else (3.61 if demand_down else 4.89)
-            delta = "+20%" if demand_up else ("-15%" if demand_down else "+15%")
+            # Real what-if solve of the uploaded workbook, by input id
+            input_id = st.session_state.get("input_id")
+            baseline = (st.session_state.get("optimization_result") or {}).get("objective_value")
+            if input_id and baseline:
+                scale = (
+                    {"demand_scale": 1.20} if demand_up
+                    else {"demand_scale": 0.85} if demand_down
+                    else {"freight_scale": 1.15}
+                )
+                with st.spinner(f"Running scenario '{scenario_name}'..."):
+                    result = get_api_client().run_optimization(input_id=input_id, **scale)
 
-            st.success(f"Scenario '{scenario_name}' completed")
+                if result.get("status") == "success":
+                    new_cost = result["objective_value"]
+                    st.success(f"Scenario '{scenario_name}' completed")
+                    col_x, col_y = st.columns(2)
+                    with col_x:
+                        st.metric(label="Baseline", value=f"₹{baseline:,.0f}", delta="Current")
+                    with col_y:
+                        st.metric(
+                            label="Scenario Result",
+                            value=f"₹{new_cost:,.0f}",
+                            delta=f"{(new_cost - baseline) / baseline:+.1%}",
+                            delta_color="inverse"
+                        )
+                else:
+                    st.error(f"❌ Scenario failed: {result.get('message', 'Unknown error')}")
+            else:
+                # No uploaded run yet: illustrative figures
+                new_cost = 5.10 if demand_up else (3.61 if demand_down else 4.89)
+                delta = "+20%" if demand_up else ("-15%" if demand_down else "+15%")
 
-            col_x, col_y = st.columns(2)
-            with col_x:
-                st.metric(
-                    label="Baseline",
-                    value="$4.25M",
-                    delta="Current"
-                )
-            with col_y:
-                st.metric(
-                    label="Scenario Result",
-                    value=f"${new_cost}M",
-                    delta=delta,
-                    delta_color="inverse"
-                )
+                st.success(f"Scenario '{scenario_name}' completed")
+
+                col_x, col_y = st.columns(2)
+                with col_x:
+                    st.metric(
+                        label="Baseline",
+                        value="$4.25M",
+                        delta="Current"
+                    )
+                with col_y:
+                    st.metric(
+                        label="Scenario Result",
+                        value=f"${new_cost}M",
+                        delta=delta,
+                        delta_color="inverse"
+                    )
         else:
             st.info("**Baseline:** $4.25M (Current)")
             st.caption("Run a scenario to see results")
@@ -0,0 +1,145 @@
+"""
+View models: indexed frames built once per optimization result
+
+Pages used to rebuild sets, loop aggregations, DataFrames and the CSV
+export from the raw result lists on every rerun. Each builder here is
+cached with st.cache_data under the result's key (run id, or the job id
+for a run that was not archived); the raw result is passed with a
+leading underscore so it is never hashed.
+"""
+import io
+from typing import Any, Dict, Optional
+
+import pandas as pd
+import streamlit as st
+
+from flow_lod import COST_PER_UNIT, aggregate_flows
+
+# Results whose view models stay cached (one per run browsed this session)
+MAX_CACHED_RESULTS = 16
+
+_INVENTORY_KEY = ["node", "period"]
+
+
+def result_key(result: Dict[str, Any]) -> Optional[Any]:
+    """Cache key of a result: its run id, else the id of the job that produced it"""
+    if result.get("run_id") is not None:
+        return ("run", result["run_id"])
+    if result.get("job_id") is not None:
+        return ("job", result["job_id"])
+    return None
+
+
+# ==================================================
+# BUILDERS
+# ==================================================
+def inventory_frame(inventory: pd.DataFrame) -> pd.DataFrame:
+    """Inventory indexed by (node, period) with quantity and cost"""
+    if inventory.empty:
+        return pd.DataFrame(
+            {"quantity": [], "cost": []},
+            index=pd.MultiIndex.from_tuples([], names=_INVENTORY_KEY),
+        )
+    if "cost" not in inventory:
+        inventory = inventory.assign(cost=inventory["quantity"] * COST_PER_UNIT)
+    frame = inventory.assign(period=inventory["period"].astype(int))
+    return frame.groupby(_INVENTORY_KEY)[["quantity", "cost"]].sum()
+
+
+def _kpis(result: Dict[str, Any], production: pd.DataFrame) -> Dict[str, Any]:
+    active_plants = int(production["node"].nunique()) if not production.empty else 0
+    return {
+        "total_cost": result.get("objective_value") or 0,
+        "solver": result.get("solver", "CBC"),
+        "success": bool(result.get("success")),
+        "active_plants": active_plants,
+        "total_plants": (result.get("summary") or {}).get("num_nodes", active_plants),
+    }
+
+
+# ==================================================
+# CACHED VIEW MODELS
+# ==================================================
+def _build(result: Dict[str, Any]) -> Dict[str, Any]:
+    production = pd.DataFrame(result.get("production") or [])
+    shipments = pd.DataFrame(result.get("shipments") or [])
+    inventory = pd.DataFrame(result.get("inventory") or [])
+    lanes = aggregate_flows(shipments, ("from", "to", "mode"))
+    flows = lanes.groupby(level=["from", "to"], sort=False).sum()
+    stock = inventory_frame(inventory)
+    return {
+        "kpis": _kpis(result, production),
+        "lanes": lanes,
+        "modes": sorted(lanes.index.get_level_values("mode").unique()),
+        "flows": flows,
+        "sources": sorted(flows.index.get_level_values("from").unique()),
+        "inventory": stock,
+        "inventory_nodes": sorted(stock.index.get_level_values("node").unique()),
+    }
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CACHED_RESULTS)
+def _cached_build(key, _result: Dict[str, Any]) -> Dict[str, Any]:
+    return _build(_result)
+
+
+def view_model(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Indexed frames of a result:
+        kpis: total_cost, solver, success, active_plants, total_plants
+        lanes: trips / quantity / cost by (from, to, mode)
+        modes: sorted transport modes of lanes
+        flows: lanes summed over modes, by (from, to)
+        sources: sorted source nodes of flows
+        inventory: quantity / cost by (node, period)
+        inventory_nodes: sorted nodes of inventory
+
+    Built once per result key; a result without a key is built each time.
+    """
+    key = result_key(result)
+    if key is None:
+        return _build(result)
+    return _cached_build(key, result)
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CACHED_RESULTS)
+def _csv(key, _result: Dict[str, Any]) -> str:
+    return convert_result_to_csv(_result)
+
+
+def result_csv(result: Dict[str, Any]) -> str:
+    """The result as the dashboard's sectioned CSV export, rendered once per result key"""
+    key = result_key(result)
+    if key is None:
+        return convert_result_to_csv(result)
+    return _csv(key, result)
+
+
+def convert_result_to_csv(result: Dict[str, Any]) -> str:
+    """Convert optimization result to CSV format"""
+    output = io.StringIO()
+
+    # Summary Section
+    output.write("=== OPTIMIZATION SUMMARY ===\n")
+    output.write(f"Status,{result.get('status')}\n")
+    output.write(f"Objective Value,{result.get('objective_value')}\n")
+    output.write(f"Solver,{result.get('solver')}\n")
+    output.write(f"Message,{result.get('message')}\n")
+
+    if "summary" in result:
+        summary = result["summary"]
+        output.write(f"Total Production,{summary.get('total_production')}\n")
+        output.write(f"Total Shipments,{summary.get('total_shipments')}\n")
+        output.write(f"Total Trips,{summary.get('total_trips')}\n")
+        output.write(f"Number of Nodes,{summary.get('num_nodes')}\n")
+        output.write(f"Number of Periods,{summary.get('num_periods')}\n")
+
+    output.write("\n")
+
+    for table in ("production", "shipments", "inventory"):
+        if result.get(table):
+            output.write(f"=== {table.upper()} ===\n")
+            pd.DataFrame(result[table]).to_csv(output, index=False)
+            output.write("\n")
+
+    return output.getvalue()
@@ -3,13 +3,34 @@ Tests for the FastAPI backend endpoints.
 
 Uses httpx's TestClient (built into FastAPI) — no running server needed.
 """
+import io
+import os
+import time
+import zipfile
+
 import pytest
 from fastapi.testclient import TestClient
 
+from backend import batch, config, input_store
 from backend.main import app
 
 client = TestClient(app)
 
+DATASET = os.path.join(config.DATA_DIR, "dataset.xlsx")
+
+
+@pytest.fixture
+def isolated_store(tmp_path, monkeypatch):
+    """Uploads, history and archive under tmp_path; empty parsed-input cache"""
+    monkeypatch.setattr(config, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(config, "HISTORY_DB_PATH", str(tmp_path / "history.db"))
+    monkeypatch.setattr(config, "ARCHIVE_DIR", str(tmp_path / "archive"))
+    monkeypatch.setattr(config, "BATCH_DIR", str(tmp_path / "batches"))
+    monkeypatch.setattr(config, "JOB_DIR", str(tmp_path / "jobs"))
+    input_store.cache.clear()
+    yield
+    input_store.cache.clear()
+
 
 # ==================================================
 # HEALTH CHECK
@@ -37,13 +58,13 @@ def test_home_returns_200():
 # ==================================================
 # HISTORY ENDPOINT
 # ==================================================
-def test_history_returns_200():
+def test_history_returns_200(isolated_store):
     """GET /history should always return 200 (even when no runs exist yet)"""
     response = client.get("/history")
     assert response.status_code == 200
 
 
-def test_history_returns_runs_list():
+def test_history_returns_runs_list(isolated_store):
     """GET /history response should contain a 'runs' key with a list"""
     response = client.get("/history")
     data = response.json()
@@ -61,3 +82,339 @@ def test_optimize_rejects_non_excel():
         files={"file": ("data.csv", b"col1,col2\n1,2", "text/csv")}
     )
     assert response.status_code == 400
+
+
+def test_optimize_rejects_unknown_engine():
+    """POST /optimize should return 400 for an unknown engine"""
+    response = client.post(
+        "/optimize?engine=gurobi",
+        files={"file": ("data.xlsx", b"not really excel", "application/octet-stream")}
+    )
+    assert response.status_code == 400
+
+
+def test_optimize_rejects_malformed_workbook():
+    """POST /optimize should return 400 for an .xlsx that is not a workbook"""
+    response = client.post(
+        "/optimize",
+        files={"file": ("data.xlsx", b"not really excel", "application/octet-stream")}
+    )
+    assert response.status_code == 400
+
+
+def test_optimize_requires_file_or_input_id():
+    """POST /optimize without a file or input_id should return 400"""
+    response = client.post("/optimize")
+    assert response.status_code == 400
+
+
+def test_optimize_unknown_input_returns_404(isolated_store):
+    """POST /optimize?input_id= should return 404 for an input never uploaded"""
+    response = client.post("/optimize", params={"input_id": "ab" * 32})
+    assert response.status_code == 404
+
+
+# ==================================================
+# INPUTS
+# ==================================================
+def test_input_uploaded_once_then_solved_by_id(isolated_store):
+    """POST /inputs parses once; /optimize?input_id= solves without re-sending"""
+    with open(DATASET, "rb") as f:
+        created = client.post("/inputs", files={"file": ("dataset.xlsx", f)})
+    assert created.status_code == 200
+    info = created.json()
+    assert info["sheets"]["ClinkerDemand"]["rows"] > 0
+    assert info["num_iu"] > 0 and not info["cached"]
+
+    result = client.post("/optimize", params={"input_id": info["input_id"], "engine": "network"}).json()
+    assert result["status"] == "success"
+    assert result["input_hash"] == info["input_id"]
+    assert result["lower_bound"] and set(result["relaxed"]) == {"min_fulfill", "rows"}
+
+    scenario = client.post("/optimize", params={
+        "input_id": info["input_id"], "engine": "network", "demand_scale": 1.2,
+    }).json()
+    assert scenario["scenario"]["demand_scale"] == 1.2
+    assert scenario["objective_value"] > result["objective_value"]
+
+
+def test_identical_uploads_keep_their_own_names(isolated_store):
+    """Same bytes under two names: one stored file, but each run keeps its name"""
+    with open(DATASET, "rb") as f:
+        data = f.read()
+    first = client.post("/optimize", params={"engine": "network"}, files={"file": ("north.xlsx", data)}).json()
+    second = client.post("/optimize", params={"engine": "network"}, files={"file": ("south.xlsx", data)}).json()
+    assert first["input_hash"] == second["input_hash"]
+
+    names = {run["id"]: run["filename"] for run in client.get("/history").json()["runs"]}
+    assert names[first["run_id"]] == "north.xlsx"
+    assert names[second["run_id"]] == "south.xlsx"
+
+    created = client.post("/inputs", files={"file": ("east.xlsx", data)}).json()
+    assert created["cached"] and created["filename"] == "east.xlsx"
+
+
+def test_input_with_bad_types_rejected(isolated_store, tmp_path):
+    """POST /inputs should return 400 naming the sheet, column and row of a bad value"""
+    import pandas as pd
+
+    sheets = pd.read_excel(DATASET, sheet_name=None)
+    demand = sheets["ClinkerDemand"]
+    demand["DEMAND"] = demand["DEMAND"].astype(object)
+    demand.loc[0, "DEMAND"] = "lots"
+    path = tmp_path / "bad.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+
+    with open(path, "rb") as f:
+        response = client.post("/inputs", files={"file": ("bad.xlsx", f)})
+    assert response.status_code == 400
+    assert "ClinkerDemand: column 'DEMAND' must be numeric; row 2" in response.json()["detail"]
+
+
+# ==================================================
+# BATCH
+# ==================================================
+def test_batch_solves_files_and_zips(isolated_store):
+    """POST /batch fans out workbooks (plain and zipped) and zips the results"""
+    with open(DATASET, "rb") as f:
+        data = f.read()
+    bundle = io.BytesIO()
+    with zipfile.ZipFile(bundle, "w") as archive:
+        archive.writestr("north.xlsx", data)
+        archive.writestr("notes.txt", "ignored")
+        archive.writestr("broken.xlsx", b"not a workbook")
+
+    created = client.post("/batch", params={"engine": "network"}, files=[
+        ("files", ("south.xlsx", data)),
+        ("files", ("plans.zip", bundle.getvalue())),
+    ])
+    assert created.status_code == 200
+    batch_id = created.json()["batch_id"]
+
+    for _ in range(120):
+        state = client.get(f"/batch/{batch_id}").json()
+        if state["status"] == "done":
+            break
+        time.sleep(0.5)
+    statuses = {item["name"]: item["status"] for item in state["items"]}
+    assert statuses == {"south.xlsx": "success", "north.xlsx": "success", "broken.xlsx": "rejected"}
+    assert state["summary"]["succeeded"] == 2
+    assert len(state["table"]) == 3
+
+    archive = zipfile.ZipFile(io.BytesIO(client.get(f"/batch/{batch_id}/archive").content))
+    names = archive.namelist()
+    assert names[0] == "summary.csv" and len(names) == 3
+    assert b"=== SHIPMENTS ===" in archive.read(names[1])
+
+
+def _wait_for_batch(batch_id: str) -> dict:
+    for _ in range(120):
+        state = client.get(f"/batch/{batch_id}").json()
+        if state["status"] != "running":
+            return state
+        time.sleep(0.5)
+    return state
+
+
+def test_batch_items_admission_checked(isolated_store, monkeypatch):
+    """A batch workbook predicted too large is rejected like /optimize would"""
+    monkeypatch.setattr(config, "MAX_MODEL_MEMORY_MB", 1)
+    monkeypatch.setattr(config, "ADMISSION_FALLBACK", None)
+    with open(DATASET, "rb") as f:
+        created = client.post("/batch", files=[("files", ("big.xlsx", f.read()))])
+    state = _wait_for_batch(created.json()["batch_id"])
+    assert state["status"] == "done"
+    item = state["items"][0]
+    assert item["status"] == "rejected" and item["message"].startswith("Model too large")
+    # Checked in the worker: the API process never parsed the workbook
+    assert input_store.cache.get(item["input_hash"]) == (None, False)
+
+
+def test_batch_items_rerouted_by_admission(isolated_store, monkeypatch):
+    """A batch workbook over the integer limit is solved with the fallback engine"""
+    monkeypatch.setattr(config, "MAX_INTEGER_VARS", 1)
+    monkeypatch.setattr(config, "ADMISSION_FALLBACK", "network")
+    with open(DATASET, "rb") as f:
+        created = client.post("/batch", files=[("files", ("wide.xlsx", f.read()))])
+    state = _wait_for_batch(created.json()["batch_id"])
+    item = state["items"][0]
+    assert item["status"] == "success", item.get("message")
+    assert item["engine"] == "network" and item["admission"]["requested"] == "cbc"
+
+
+def test_batch_marked_failed_when_pool_cannot_start(isolated_store, monkeypatch):
+    """A batch whose pool fails to start still finishes, every item failed"""
+    def broken_pool(*args, **kwargs):
+        raise TypeError("no pool here")
+
+    monkeypatch.setattr(batch, "new_executor", broken_pool)
+    with open(DATASET, "rb") as f:
+        created = client.post("/batch", params={"engine": "network"}, files=[("files", ("a.xlsx", f.read()))])
+    state = _wait_for_batch(created.json()["batch_id"])
+    assert state["status"] == "failed"
+    assert [item["status"] for item in state["items"]] == ["failed"]
+    assert "no pool here" in state["items"][0]["message"]
+    assert state["summary"]["failed"] == 1
+
+
+def test_batch_unknown_id_returns_404(isolated_store):
+    response = client.get("/batch/doesnotexist")
+    assert response.status_code == 404
+
+
+def test_job_submitted_then_polled(isolated_store):
+    """POST /jobs returns at once; the result is served once the job is done"""
+    with open(DATASET, "rb") as f:
+        created = client.post("/jobs", params={"engine": "network"}, files={"file": ("dataset.xlsx", f)})
+    assert created.status_code == 200
+    job_id = created.json()["job_id"]
+    assert created.json()["status"] in ("queued", "running", "done")
+
+    for _ in range(120):
+        state = client.get(f"/jobs/{job_id}").json()
+        if state["status"] in ("done", "failed"):
+            break
+        time.sleep(0.5)
+    assert state["status"] == "done"
+    assert state["run_id"] is not None
+
+    result = client.get(f"/jobs/{job_id}/result")
+    assert result.status_code == 200
+    assert result.json()["run_id"] == state["run_id"]
+    assert len(result.json()["shipments"]) > 0
+
+
+def test_live_jobs_and_batches_pin_their_uploads(isolated_store):
+    """Uploads of queued / running work are never evicted; finished work releases them"""
+    from backend import jobs
+    from backend.main import _live_inputs
+    from backend.status_files import write_json
+
+    job = jobs.new_job({"input_hash": "aa" * 32})
+    write_json(os.path.join(config.JOB_DIR, f"{job['job_id']}.json"), job)
+    done = {**jobs.new_job({"input_hash": "bb" * 32}), "status": "done"}
+    write_json(os.path.join(config.JOB_DIR, f"{done['job_id']}.json"), done)
+    state = batch.new_batch([
+        {"name": "a.xlsx", "status": "queued", "input_hash": "cc" * 32},
+        {"name": "b.xlsx", "status": "success", "input_hash": "dd" * 32},
+    ], "cbc")
+    batch.save_state(config.BATCH_DIR, state)
+    assert _live_inputs() == {"aa" * 32, "cc" * 32}
+
+
+def test_job_unknown_id_or_input_returns_404(isolated_store):
+    assert client.get("/jobs/doesnotexist").status_code == 404
+    assert client.get("/jobs/doesnotexist/result").status_code == 404
+    assert client.post("/jobs", params={"input_id": "ab" * 32}).status_code == 404
+
+
+def test_default_input_uses_preloaded_workbook():
+    """input_id=default solves the default workbook /debug/sheets reads"""
+    sheets = client.get("/debug/sheets")
+    assert sheets.status_code == 200
+    assert "LogisticsIUGU" in sheets.json()["sheets"]
+    assert client.get("/debug/sheet-preview/NoSuchSheet").status_code == 404
+
+    summary = client.get("/inputs/default")
+    assert summary.status_code == 200
+    assert summary.json()["num_lanes"] > 0
+
+
+def test_estimate_and_admission(isolated_store, monkeypatch):
+    """/inputs/{id}/estimate predicts sizes; oversized solves are routed or rejected"""
+    estimate = client.get("/inputs/default/estimate")
+    assert estimate.status_code == 200
+    body = estimate.json()
+    assert body["engines"]["cbc"]["integers"] > 0
+    assert body["admission"]["cbc"]["admitted"]
+    assert client.get("/inputs/" + "ab" * 32 + "/estimate").status_code == 404
+
+    monkeypatch.setattr(config, "MAX_INTEGER_VARS", 0)
+    monkeypatch.setattr(config, "ADMISSION_FALLBACK", "network")
+    routed = client.post("/optimize", params={"input_id": "default", "engine": "cbc"})
+    assert routed.status_code == 200
+    assert routed.json()["admission"]["engine"] == "network"
+
+    monkeypatch.setattr(config, "ADMISSION_FALLBACK", None)
+    rejected = client.post("/optimize", params={"input_id": "default", "engine": "cbc"})
+    assert rejected.status_code == 413
+    assert "integer" in rejected.json()["detail"]
+
+
+def test_optimize_rejects_unknown_format():
+    """POST /optimize should return 400 for an unsupported ?format="""
+    response = client.post(
+        "/optimize?format=xml",
+        files={"file": ("data.xlsx", b"not really excel", "application/octet-stream")}
+    )
+    assert response.status_code == 400
+
+
+def test_history_supports_pagination(isolated_store):
+    """GET /history should echo paging parameters and report a total"""
+    response = client.get("/history", params={"limit": 5, "offset": 0, "status": "success"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["limit"] == 5
+    assert isinstance(data["total"], int)
+    assert len(data["runs"]) <= 5
+
+
+def test_history_revalidates_with_etag(isolated_store):
+    """GET /history should answer a matching If-None-Match with an empty 304"""
+    first = client.get("/history", params={"limit": 5})
+    tag = first.headers["etag"]
+    again = client.get("/history", params={"limit": 5}, headers={"If-None-Match": tag})
+    assert again.status_code == 304
+    assert again.content == b""
+    # Different parameters are a different representation
+    other = client.get("/history", params={"limit": 6}, headers={"If-None-Match": tag})
+    assert other.status_code == 200
+
+
+def test_history_rejects_bad_limit(isolated_store):
+    """GET /history should validate the page size"""
+    response = client.get("/history", params={"limit": 0})
+    assert response.status_code == 422
+
+
+# ==================================================
+# ANALYTICS ENDPOINT
+# ==================================================
+def test_analytics_returns_rows(isolated_store):
+    """GET /analytics/shipments should answer even with an empty archive"""
+    response = client.get("/analytics/shipments", params={"group_by": "period", "last_runs": 5})
+    assert response.status_code == 200
+    assert "rows" in response.json()
+
+
+def test_analytics_rejects_unknown_table(isolated_store):
+    """GET /analytics/{table} should return 400 for an unknown table"""
+    response = client.get("/analytics/lanes")
+    assert response.status_code == 400
+
+
+def test_diff_unknown_runs_returns_404(isolated_store):
+    """GET /runs/{a}/diff/{b} should return 404 for runs that do not exist"""
+    response = client.get("/runs/999999/diff/999998")
+    assert response.status_code == 404
+
+
+def test_flows_unknown_run_returns_404(isolated_store):
+    """GET /runs/{id}/flows should return 404 for a run that does not exist"""
+    response = client.get("/runs/999999/flows", params={"iu": "IU_001", "top": 10})
+    assert response.status_code == 404
+
+
+def test_export_unknown_run_returns_404(isolated_store):
+    """GET /runs/{id}/export should return 404 for a run that does not exist"""
+    response = client.get("/runs/999999/export")
+    assert response.status_code == 404
+
+
+def test_export_rejects_unknown_format(isolated_store):
+    """GET /runs/{id}/export should return 400 for an unsupported format"""
+    response = client.get("/runs/1/export", params={"format": "xlsx"})
+    assert response.status_code == 400
@@ -0,0 +1,66 @@
+"""
+Tests for the frontend API client's conditional GETs, served by the
+real backend through FastAPI's TestClient.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+pytest.importorskip("streamlit")
+
+from backend import config
+from backend.history_store import save_run
+from backend.main import app
+from client.api_client import BackendAPIClient
+
+
+class BackendSession:
+    """Stands in for requests.Session: forwards GETs to the app, records each exchange"""
+
+    def __init__(self):
+        self.backend = TestClient(app)
+        self.exchanges = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        response = self.backend.get(url, params=params, headers=headers)
+        self.exchanges.append((dict(headers or {}), response.status_code))
+        return response
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "HISTORY_DB_PATH", str(tmp_path / "history.db"))
+    api = BackendAPIClient(base_url="")
+    api.session = BackendSession()
+    return api
+
+
+def test_not_modified_reuses_cached_payload(api):
+    status, first = api._get_json("/history", {"limit": 5})
+    assert status == 200
+    status, again = api._get_json("/history", {"limit": 5})
+
+    (sent, _), (revalidate, answered) = api.session.exchanges
+    assert "If-None-Match" not in sent
+    assert revalidate["If-None-Match"] and answered == 304
+    assert status == 200 and again is first
+
+
+def test_changed_version_replaces_cached_payload(api):
+    _, first = api._get_json("/history", {"limit": 5})
+    tag = next(iter(api._validators.values()))[0]
+    save_run(config.HISTORY_DB_PATH, {"timestamp": "2026-01-01 00:00:00", "filename": "plan.xlsx", "status": "success"})
+
+    status, fresh = api._get_json("/history", {"limit": 5})
+    assert api.session.exchanges[-1][1] == 200
+    assert status == 200 and fresh["total"] == first["total"] + 1
+    assert next(iter(api._validators.values()))[0] != tag
+
+
+def test_cache_keeps_only_recent_payloads(api, monkeypatch):
+    import client.api_client
+
+    monkeypatch.setattr(client.api_client, "VALIDATOR_CACHE_SIZE", 2)
+    for limit in (1, 2, 1, 3):
+        api._get_json("/history", {"limit": limit})
+    # limit=1 was used again after limit=2, so limit=2 is the one dropped
+    assert [dict(params)["limit"] for _, params in api._validators] == [1, 3]
@@ -0,0 +1,207 @@
+"""
+Tests for the IUGUConstraint / IUGUClosingStock compiler.
+"""
+import os
+
+import pandas as pd
+
+from backend.constraints import compile_constraints
+from backend.network_index import arc_lookup, build_index
+
+SAMPLE_DATASET = os.path.join(
+    os.path.dirname(__file__), "..", "backend", "data", "dataset.xlsx"
+)
+
+LANES = pd.DataFrame({
+    "FROM IU CODE": ["IU_1", "IU_1", "IU_1"],
+    "TO IUGU CODE": ["GU_1", "GU_1", "GU_2"],
+    "TRANSPORT CODE": ["T1", "T2", "T2"],
+})
+INDEX = build_index(["IU_1"], ["GU_1", "GU_2"], [1, 2], LANES)
+INPUTS = {"T": [1, 2], "N": INDEX["nodes"].tolist(), "index": INDEX}
+ARC = arc_lookup(INDEX)
+
+
+def x(i, j, m, t):
+    """Model index (arc id, period position) of X[i, j, m, t]"""
+    return (ARC[(i, j, m)], INPUTS["T"].index(t))
+
+
+def inv(n, t):
+    return (INPUTS["N"].index(n), INPUTS["T"].index(t))
+
+
+def constraint_sheet(rows):
+    return pd.DataFrame(rows, columns=[
+        "IU CODE", "TRANSPORT CODE", "IUGU CODE", "TIME PERIOD",
+        "BOUND TYPEID", "VALUE TYPEID", "Value",
+    ])
+
+
+# ==================================================
+# COMPILER CHECKS
+# ==================================================
+def test_single_variable_limit_becomes_bound():
+    """IU + mode + GU + period matches one X variable → bound, no row"""
+    sheet = constraint_sheet([["IU_1", "T2", "GU_2", 1, "L", "C", 500.0]])
+    compiled = compile_constraints(INPUTS, sheet)
+    assert compiled["x_bounds"] == {x("IU_1", "GU_2", "T2", 1): (None, 500.0)}
+    assert compiled["rows"] == []
+
+
+def test_wildcard_limit_becomes_sparse_row():
+    """IU + mode with a blank GU aggregates over the matching lanes only"""
+    sheet = constraint_sheet([["IU_1", "T2", None, 2, "G", "C", 100.0]])
+    compiled = compile_constraints(INPUTS, sheet)
+    assert compiled["x_bounds"] == {}
+    assert len(compiled["rows"]) == 1
+    row = compiled["rows"][0]
+    assert sorted(row["vars"]) == [x("IU_1", "GU_1", "T2", 2), x("IU_1", "GU_2", "T2", 2)]
+    assert row["lb"] == 100.0 and row["ub"] is None
+
+
+def test_single_lane_limits_snap_to_whole_trips():
+    """With integer Trips a lane limit must hold a whole number of trips"""
+    inputs = {**INPUTS, "trip_cap": [1.0, 3000.0, 3000.0]}
+    sheet = constraint_sheet([
+        ["IU_1", "T2", "GU_1", 1, "G", "C", 4500.0],   # → 6000
+        ["IU_1", "T2", "GU_2", 1, "L", "C", 4500.0],   # → 3000
+        ["IU_1", "T2", "GU_2", 2, "E", "C", 4500.0],   # no whole trips: skipped
+    ])
+    compiled = compile_constraints(inputs, sheet)
+    assert compiled["x_bounds"] == {
+        x("IU_1", "GU_1", "T2", 1): (6000.0, None),
+        x("IU_1", "GU_2", "T2", 1): (None, 3000.0),
+    }
+    assert compiled["stats"]["skipped"] == 1
+    assert compiled["warnings"] == [
+        "IUGUConstraint on IU_1 -> GU_2 T2 period 2 skipped: no whole number of 3000 t trips meets it"
+    ]
+
+
+def test_off_trip_equality_no_longer_infeasible():
+    """E 4500 on a 3000 t lane used to make the whole model infeasible"""
+    from backend.model import solve_clinker_model
+    from backend.warmup import tiny_sheets
+
+    sheets = tiny_sheets()
+    sheets["IUGUConstraint"] = constraint_sheet([["IU_1", "T2", "GU_1", 1, "E", "C", 4500.0]])
+    result = solve_clinker_model(sheets)
+    assert result.get("success") is True, result.get("message")
+    assert len(result["warnings"]) == 1
+
+
+def test_closing_stock_becomes_inventory_bounds():
+    """MIN/MAX CLOSE STOCK map to Inv bounds; blanks stay unbounded"""
+    closing = pd.DataFrame({
+        "IUGU CODE": ["GU_1", "GU_2"],
+        "TIME PERIOD": [1, 2],
+        "MIN CLOSE STOCK": [10.0, 5.0],
+        "MAX CLOSE STOCK": [50.0, None],
+    })
+    compiled = compile_constraints(INPUTS, closing_df=closing)
+    assert compiled["inv_bounds"] == {inv("GU_1", 1): (10.0, 50.0), inv("GU_2", 2): (5.0, None)}
+
+
+def test_solution_respects_compiled_limits():
+    """The bundled dataset's lane and stock limits hold in the optimal plan"""
+    from pyomo.environ import value
+    from backend.default_dataset import cache
+    from backend.model import prepare_inputs, solve_clinker_model
+
+    sheets = cache.get(SAMPLE_DATASET)["clean"]
+    result = solve_clinker_model(sheets)
+    assert result.get("success") is True, result.get("message")
+
+    model, q = result["model"], result["scaling"]["quantity"]
+    compiled = prepare_inputs(sheets)["compiled"]
+    assert compiled["stats"]["rows"] > 0 and compiled["stats"]["x_bounds"] > 0
+
+    checks = [
+        (sum(value(model.X[k]) for k in row["vars"]) * q, row["lb"], row["ub"])
+        for row in compiled["rows"]
+    ] + [
+        (value(model.Inv[k]) * q, lb, ub)
+        for k, (lb, ub) in compiled["inv_bounds"].items()
+    ]
+    for qty, lb, ub in checks:
+        assert lb is None or qty >= lb - 1e-3
+        assert ub is None or qty <= ub + 1e-3
+
+
+# ==================================================
+# LAZY ROW CHECKS
+# ==================================================
+LAZY_LIMITS = [
+    ["IU_001", None, None, 1, "G", "C", 150_000.0],   # all lanes out of IU_001
+    ["IU_002", None, None, 1, "L", "C", 1e9],         # never binding
+]
+
+
+class _ZeroPlanSolver:
+    """Stands in for CBC: reports optimal and leaves every variable unset (= 0)"""
+
+    def __init__(self):
+        self.warmstarts = []
+
+    def solve(self, model, tee=False, warmstart=False):
+        from types import SimpleNamespace
+        from pyomo.environ import TerminationCondition
+
+        self.warmstarts.append(warmstart)
+        return SimpleNamespace(solver=SimpleNamespace(termination_condition=TerminationCondition.optimal))
+
+
+def lazy_case(settings=None):
+    """Small synthetic network with LAZY_LIMITS, built with empty lazy families"""
+    from backend.model import SETTINGS, build_model, compute_scaling, prepare_inputs
+    from benchmarks.synthetic import make_sheets
+
+    sheets = make_sheets(n_iu=2, n_gu=4, n_periods=2, lanes_per_gu=2, min_fulfill_pct=80)
+    sheets["IUGUConstraint"] = constraint_sheet(LAZY_LIMITS)
+    settings = {**SETTINGS, "LAZY_ROWS": True, **(settings or {})}
+    inputs = prepare_inputs(sheets, settings)
+    scaling = compute_scaling(inputs, settings)
+    return sheets, inputs, settings, scaling, build_model(inputs, settings, scaling)
+
+
+def test_lazy_loop_adds_only_violated_rows():
+    """An all-zero plan violates every MinFulfill row and the G limit, not the L limit"""
+    from backend.lazy import solve_with_lazy_rows
+
+    _, inputs, settings, scaling, model = lazy_case()
+    assert len(inputs["compiled"]["rows"]) == 2
+    solver = _ZeroPlanSolver()
+    _, stats = solve_with_lazy_rows(model, inputs, settings, scaling, solver)
+
+    assert stats["iterations"] == 2 and solver.warmstarts == [False, True]
+    assert stats["candidate_rows"]["LaneLimit"] == 2
+    assert stats["rows_added"] == {"MinFulfill": stats["candidate_rows"]["MinFulfill"], "LaneLimit": 1}
+    assert list(model.LaneLimit.keys()) == [0]
+    assert len(model.MinFulfill) == stats["candidate_rows"]["MinFulfill"] > 0
+
+
+def test_lazy_loop_adds_all_rows_after_max_iterations():
+    """Out of rounds, every remaining candidate is added for the last solve"""
+    from backend.lazy import solve_with_lazy_rows
+
+    _, inputs, settings, scaling, model = lazy_case({"LAZY_MAX_ITERATIONS": 1})
+    _, stats = solve_with_lazy_rows(model, inputs, settings, scaling, _ZeroPlanSolver())
+
+    assert stats["iterations"] == 2
+    assert stats["rows_added"] == stats["candidate_rows"]
+    assert sorted(model.LaneLimit.keys()) == [0, 1]
+
+
+def test_lazy_objective_matches_full_model():
+    """Adding rows on demand reaches the same optimum as building them all"""
+    from backend.model import solve_clinker_model
+
+    sheets = lazy_case()[0]
+    full = solve_clinker_model(sheets)
+    lazy = solve_clinker_model(sheets, {"LAZY_ROWS": True})
+    assert full.get("success") and lazy.get("success"), lazy.get("message")
+
+    assert abs(full["objective_value"] - lazy["objective_value"]) <= 1e-6 * full["objective_value"]
+    # The G limit binds, so it is added; the L limit never is
+    assert lazy["lazy_rows"]["rows_added"]["LaneLimit"] == 1
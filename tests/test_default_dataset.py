@@ -0,0 +1,68 @@
+"""
+Tests for the preloaded default workbook cache.
+"""
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from backend import config
+from backend.default_dataset import DatasetCache
+
+DATASET = os.path.join(config.DATA_DIR, "dataset.xlsx")
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = str(tmp_path / "dataset.xlsx")
+    shutil.copy(DATASET, path)
+    return path
+
+
+def test_parsed_once_and_typed(workbook):
+    cache = DatasetCache()
+    first = cache.get(workbook)
+    assert cache.get(workbook) is first
+    assert cache.loads == 1
+    # Every sheet for /debug; the model's sheets cleaned for solving
+    assert "HubOpeningStock" in first["sheets"] and "HubOpeningStock" not in first["clean"]
+    types = first["clean"]["IUGUType"]
+    assert isinstance(types["PLANT TYPE"].dtype, pd.CategoricalDtype)
+    assert set(types["PLANT TYPE"].cat.categories) == {"IU", "GU"}
+
+
+def test_reloaded_only_when_content_changes(workbook):
+    cache = DatasetCache()
+    first = cache.get(workbook)
+
+    # Touched, same bytes: no parse
+    os.utime(workbook, (0, 0))
+    assert cache.get(workbook) is first
+    assert cache.loads == 1
+
+    with pd.ExcelWriter(workbook) as writer:
+        for name, df in first["sheets"].items():
+            (df.head(3) if name == "LogisticsIUGU" else df).to_excel(writer, sheet_name=name, index=False)
+    second = cache.get(workbook)
+    assert cache.loads == 2
+    assert second["sha256"] != first["sha256"]
+    assert len(second["sheets"]["LogisticsIUGU"]) == 3
+
+
+def test_other_paths_do_not_evict_default(workbook, tmp_path):
+    cache = DatasetCache(max_entries=2)
+    first = cache.get(workbook)
+    other = str(tmp_path / "other.xlsx")
+    shutil.copy(DATASET, other)
+    cache.get(other)
+    assert cache.get(workbook) is first
+    assert cache.loads == 2
+
+    # Bounded: a third path drops the least recently used (other)
+    third = str(tmp_path / "third.xlsx")
+    shutil.copy(DATASET, third)
+    cache.get(third)
+    assert cache.get(workbook) is first
+    cache.get(other)
+    assert cache.loads == 4
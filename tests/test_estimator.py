@@ -0,0 +1,48 @@
+"""
+Tests for the model size / memory estimator and admission control.
+"""
+import os
+
+from pyomo.core.expr.visitor import identify_variables
+from pyomo.environ import Constraint, Var
+
+from backend import config, estimator
+from backend.default_dataset import cache
+from backend.model import SETTINGS, build_model, prepare_inputs
+from backend.scaling import compute_scaling
+from benchmarks.synthetic import make_sheets
+
+DATASET = os.path.join(config.DATA_DIR, "dataset.xlsx")
+
+
+def _built(sheets):
+    inputs = prepare_inputs(sheets)
+    return build_model(inputs, SETTINGS, compute_scaling(inputs, SETTINGS))
+
+
+def test_counts_match_built_model():
+    """Variables, integers and rows are exact; nonzeros an upper bound"""
+    for sheets in (cache.get(DATASET)["clean"], make_sheets(8, 20, 3, 3, min_fulfill_pct=50)):
+        predicted = estimator.estimate(sheets, SETTINGS)["engines"]["cbc"]
+        model = _built(sheets)
+        rows = list(model.component_data_objects(Constraint, active=True))
+        nonzeros = sum(len(list(identify_variables(c.body, include_fixed=False))) for c in rows)
+        assert predicted["variables"] == model.nvariables()
+        assert predicted["integers"] == sum(1 for v in model.component_data_objects(Var) if v.is_integer())
+        assert predicted["rows"] >= len(rows)
+        assert nonzeros <= predicted["nonzeros"] <= nonzeros * 1.1
+
+
+def test_admit_routes_or_rejects():
+    estimates = estimator.estimate(make_sheets(20, 200, 4, 4), SETTINGS)
+    cbc = estimates["engines"]["cbc"]
+
+    fits = estimator.admit(estimates, "cbc", cbc["peak_memory_mb"], cbc["integers"], "hierarchical")
+    assert fits == {"admitted": True, "engine": "cbc", "requested": "cbc", "reason": None}
+
+    routed = estimator.admit(estimates, "cbc", cbc["peak_memory_mb"], cbc["integers"] - 1, "hierarchical")
+    assert routed["admitted"] and routed["engine"] == "hierarchical"
+    assert "integer" in routed["reason"]
+
+    rejected = estimator.admit(estimates, "cbc", cbc["peak_memory_mb"] - 1, cbc["integers"], None)
+    assert not rejected["admitted"] and "MB" in rejected["reason"]
@@ -0,0 +1,89 @@
+"""
+Tests for the SQLite run history store.
+
+Each test uses its own database file under pytest's tmp_path.
+"""
+import json
+import threading
+from datetime import datetime, timedelta
+
+from backend.history_store import (
+    TIMESTAMP_FORMAT, expire_runs, import_legacy_history, list_runs, save_run, version,
+)
+
+
+def make_run(filename="plan.xlsx", status="success", days_ago=0, objective=100.0):
+    stamp = (datetime.now() - timedelta(days=days_ago)).strftime(TIMESTAMP_FORMAT)
+    return {
+        "timestamp": stamp,
+        "filename": filename,
+        "status": status,
+        "objective_value": objective,
+        "cost_breakdown": {"production": 1, "transport": 2, "inventory": 3},
+        "summary": {"total_production": 4, "total_shipments": 5, "total_trips": 6},
+    }
+
+
+def test_runs_are_paged_newest_first(tmp_path):
+    db = str(tmp_path / "history.db")
+    for k in range(5):
+        save_run(db, make_run(days_ago=5 - k, objective=k))
+
+    runs, total = list_runs(db, limit=2, offset=1)
+    assert total == 5
+    assert [r["objective_value"] for r in runs] == [3, 2]
+    assert runs[0]["cost_breakdown"]["transport"] == 2
+    assert runs[0]["summary"]["total_trips"] == 6
+
+
+def test_filters_and_ttl(tmp_path):
+    db = str(tmp_path / "history.db")
+    save_run(db, make_run("a.xlsx", "success", days_ago=40))
+    save_run(db, make_run("a.xlsx", "failed", days_ago=2))
+    save_run(db, make_run("b.xlsx", "success", days_ago=1))
+
+    assert list_runs(db, filename="a.xlsx")[1] == 2
+    assert list_runs(db, status="success")[1] == 2
+    since = (datetime.now() - timedelta(days=3)).strftime("%Y-%m-%d")
+    assert list_runs(db, since=since)[1] == 2
+
+    # Retention is applied on write
+    save_run(db, make_run("c.xlsx"), ttl_days=30)
+    runs, total = list_runs(db)
+    assert total == 3
+    assert "a.xlsx" in {r["filename"] for r in runs}
+    assert all(r["timestamp"] >= since for r in runs)
+
+
+def test_concurrent_writers_do_not_lose_runs(tmp_path):
+    db = str(tmp_path / "history.db")
+    threads = [
+        threading.Thread(target=lambda: [save_run(db, make_run()) for _ in range(10)])
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert list_runs(db)[1] == 80
+
+
+def test_legacy_json_is_imported_once(tmp_path):
+    db = str(tmp_path / "history.db")
+    legacy = tmp_path / "history.json"
+    legacy.write_text(json.dumps([make_run(objective=2, days_ago=1), make_run(objective=1, days_ago=2)]))
+
+    assert import_legacy_history(db, str(legacy)) == 2
+    assert import_legacy_history(db, str(legacy)) == 0
+    runs, _ = list_runs(db)
+    assert [r["objective_value"] for r in runs] == [2, 1]
+
+
+def test_version_changes_on_insert_and_expiry(tmp_path):
+    db = str(tmp_path / "history.db")
+    empty = version(db)
+    save_run(db, {"timestamp": "2020-01-01 00:00:00", "status": "success"})
+    added = version(db)
+    assert added != empty
+    expire_runs(db, ttl_days=1)
+    assert version(db) not in (empty, added)
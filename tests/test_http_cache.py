@@ -0,0 +1,31 @@
+"""
+Tests for the ETag / If-None-Match helpers.
+"""
+from starlette.requests import Request
+
+from backend import http_cache
+
+
+def request_with(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_matching_tag_gets_bodiless_304():
+    tag = http_cache.etag("history", (3, 3), 20, 0)
+    for header in (tag, f"W/{tag}", f'"other", {tag}', "*"):
+        response = http_cache.not_modified(request_with(header), tag)
+        assert response.status_code == 304 and response.body == b""
+        assert response.headers["etag"] == tag
+        assert response.headers["cache-control"] == http_cache.CACHE_CONTROL
+
+    assert http_cache.not_modified(request_with(), tag) is None
+
+
+def test_changed_version_gets_new_tag():
+    """A run added (new history version) invalidates the client's copy"""
+    old = http_cache.etag("history", (3, 3), 20, 0)
+    new = http_cache.etag("history", (4, 4), 20, 0)
+    assert new != old
+    assert new == http_cache.etag("history", (4, 4), 20, 0)
+    assert http_cache.not_modified(request_with(old), new) is None
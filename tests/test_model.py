@@ -16,10 +16,16 @@ SAMPLE_DATASET = os.path.join(
 # ==================================================
 # HELPERS
 # ==================================================
+def sample_sheets():
+    """Sample dataset sheets, parsed once per session (shared, read-only)"""
+    from backend.default_dataset import cache
+    return cache.get(SAMPLE_DATASET)["clean"]
+
+
 def run_optimization():
     """Run the model on the sample dataset and return the result dict"""
-    from backend.model import run_clinker_optimization
-    return run_clinker_optimization(SAMPLE_DATASET)
+    from backend.model import solve_clinker_model
+    return solve_clinker_model(sample_sheets())
 
 
 # ==================================================
@@ -97,3 +103,125 @@ def test_model_object_has_expected_sets():
     assert len(list(model.IU)) > 0, "No IU (production) nodes found"
     assert len(list(model.N)) > 0,  "No nodes found"
     assert len(list(model.T)) > 0,  "No time periods found"
+
+
+# ==================================================
+# SCALING CHECKS
+# ==================================================
+def test_scaled_and_unscaled_runs_agree_on_costs():
+    """Scaling must not change the plan, only the numbers CBC sees"""
+    from backend.model import run_clinker_optimization
+    scaled = run_clinker_optimization(SAMPLE_DATASET, {"ENABLE_SCALING": True})
+    unscaled = run_clinker_optimization(SAMPLE_DATASET, {"ENABLE_SCALING": False})
+    assert scaled.get("success") and unscaled.get("success")
+
+    for key in ("production", "transport", "inventory"):
+        a = scaled["cost_breakdown"][key]
+        b = unscaled["cost_breakdown"][key]
+        assert abs(a - b) <= 1e-6 * max(abs(b), 1), f"{key}: {a} vs {b}"
+
+
+def test_unmet_penalty_is_derived_from_data():
+    """The auto penalty must exceed the worst cost of serving one ton"""
+    from backend.model import SETTINGS, prepare_inputs
+    from backend.scaling import compute_scaling
+
+    inputs = prepare_inputs(sample_sheets())
+    scaling = compute_scaling(inputs, {**SETTINGS, "ENABLE_SCALING": True, "AUTO_UNMET_PENALTY": True})
+    worst = inputs["prod_cost"].max() + inputs["trip_cost"].max()
+    assert worst < scaling["unmet_penalty"] < SETTINGS["UNMET_PENALTY"]
+    assert scaling["quantity"] == SETTINGS["QUANTITY_SCALE"]
+
+
+# ==================================================
+# LAZY ROW CHECKS
+# ==================================================
+def test_lazy_rows_match_full_model():
+    """The cutting-plane loop must reach the full model's optimum"""
+    from backend.model import solve_clinker_model
+    from benchmarks.synthetic import make_sheets
+
+    sheets = make_sheets(n_iu=4, n_gu=8, n_periods=2, min_fulfill_pct=80)
+    full = solve_clinker_model(sheets)
+    lazy = solve_clinker_model(sheets, {"LAZY_ROWS": True})
+    assert full.get("success") and lazy.get("success"), lazy.get("message")
+
+    assert abs(full["objective_value"] - lazy["objective_value"]) <= 1e-6 * full["objective_value"]
+    stats = lazy["lazy_rows"]
+    assert stats["iterations"] >= 1
+    assert stats["rows_added"]["MinFulfill"] <= stats["candidate_rows"]["MinFulfill"]
+
+
+# ==================================================
+# NETWORK FLOW ENGINE CHECKS
+# ==================================================
+RELAXED = {"ENABLE_MIN_FULFILL": False, "ENABLE_IUGU_CONSTRAINTS": False}
+
+
+@pytest.mark.parametrize("backend", ["python", "ortools"])
+def test_network_engine_matches_lp_relaxation(backend):
+    """Min-cost flow must reproduce the Pyomo LP with continuous Trips"""
+    if backend == "ortools":
+        pytest.importorskip("ortools")
+    from backend.model import solve_clinker_model
+    from benchmarks.synthetic import make_sheets
+
+    sheets = make_sheets(n_iu=4, n_gu=8, n_periods=3)
+    lp = solve_clinker_model(sheets, {**RELAXED, "RELAX_TRIPS": True})
+    flow = solve_clinker_model(sheets, {**RELAXED, "ENGINE": "network", "NETWORK_BACKEND": backend})
+    assert lp.get("success") and flow.get("success"), flow.get("message")
+
+    # ortools works in whole tons, so allow for rounding of supplies
+    tol = 1e-8 if backend == "python" else 1e-5
+    assert abs(lp["objective_value"] - flow["objective_value"]) <= tol * lp["objective_value"]
+    assert flow["network"]["backend"] == backend
+
+
+def test_network_engine_bounds_full_model():
+    """The relaxation is a lower bound on the MIP for the sample dataset"""
+    from backend.model import run_clinker_optimization
+
+    mip = run_clinker_optimization(SAMPLE_DATASET, RELAXED)
+    flow = run_clinker_optimization(SAMPLE_DATASET, {**RELAXED, "ENGINE": "network"})
+    assert mip.get("success") and flow.get("success")
+    assert flow["objective_value"] <= mip["objective_value"] * (1 + 1e-6)
+    assert len(flow["solution"]["shipments"]["quantity"]) > 0
+
+
+def test_network_engine_reports_relaxed_rows():
+    """The result says how many MinFulfill and lane rows the plan ignores"""
+    from backend.model import run_clinker_optimization, solve_clinker_model
+    from benchmarks.synthetic import make_sheets
+
+    sheets = make_sheets(n_iu=4, n_gu=8, n_periods=2, min_fulfill_pct=80)
+    flow = solve_clinker_model(sheets, {"ENGINE": "network"})
+    assert flow["relaxed"]["min_fulfill"] == int((sheets["ClinkerDemand"]["MIN FULFILLMENT (%)"] > 0).sum())
+    assert flow["relaxed"]["rows"] == 0
+
+    off = solve_clinker_model(sheets, {"ENGINE": "network", "ENABLE_MIN_FULFILL": False})
+    assert off["relaxed"]["min_fulfill"] == 0
+
+    sample = run_clinker_optimization(SAMPLE_DATASET, {"ENGINE": "network"})
+    assert sample["relaxed"]["rows"] == sample["network"]["dropped_rows"] > 0
+
+
+# ==================================================
+# HIERARCHICAL MODE CHECKS
+# ==================================================
+def test_hierarchical_plan_is_costed_against_full_model():
+    """The disaggregated plan uses real nodes and cannot beat the optimum"""
+    from backend.model import solve_clinker_model
+    from backend.hierarchical import CLUSTER_PREFIX
+    from backend.network_index import decode_solution
+    from benchmarks.synthetic import make_sheets
+
+    sheets = make_sheets(n_iu=4, n_gu=12, n_periods=2)
+    full = solve_clinker_model(sheets)
+    hier = solve_clinker_model(sheets, {"ENGINE": "hierarchical", "HIER_CLUSTER_SIZE": 4, "HIER_WORKERS": 1})
+    assert full.get("success") and hier.get("success"), hier.get("message")
+
+    assert hier["hierarchy"]["clusters"] == 3
+    assert hier["objective_value"] >= full["objective_value"] * (1 - 1e-6)
+    shipments = decode_solution(hier["solution"])["shipments"]
+    assert shipments
+    assert not any(s["to"].startswith(CLUSTER_PREFIX) for s in shipments)
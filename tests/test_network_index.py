@@ -0,0 +1,48 @@
+"""
+Tests for interned node / lane ids.
+"""
+import numpy as np
+import pandas as pd
+
+from backend.network_index import build_index, decode_solution, encode_records, grid, intern
+
+LANES = pd.DataFrame({
+    "FROM IU CODE": ["IU_2", "IU_1", "GU_1", "IU_1", "IU_1", "IU_1"],
+    "TO IUGU CODE": ["GU_1", "GU_1", "GU_2", "IU_1", "GU_9", "GU_1"],
+    "TRANSPORT CODE": ["T2", "T1", "T1", "T1", "T1", "T1"],
+})
+
+
+def test_index_numbers_ius_first_and_sorts_arcs():
+    index = build_index(["IU_1", "IU_2"], ["GU_1", "GU_2"], [1, 2, 3], LANES)
+    assert index["nodes"].tolist() == ["IU_1", "IU_2", "GU_1", "GU_2"]
+    assert index["n_iu"] == 2
+    assert index["modes"].tolist() == ["T1", "T2"]
+    # GU origin, self-loop and unknown GU dropped; the repeated lane keeps its last row
+    assert list(zip(index["arc_from"], index["arc_to"], index["arc_mode"])) == [(0, 2, 0), (1, 2, 1)]
+    assert index["arc_rows"].tolist() == [5, 0]
+    assert intern(["GU_2", "nope"], index["nodes"]).tolist() == [3, -1]
+
+
+def test_grid_last_row_wins_and_blanks_are_zero():
+    df = pd.DataFrame({
+        "IUGU CODE": ["GU_1", "GU_1", "GU_2", "GU_X"],
+        "TIME PERIOD": [1, 1, 2, 1],
+        "DEMAND": [5.0, 7.0, np.nan, 9.0],
+    })
+    out = grid(df, "IUGU CODE", ["GU_1", "GU_2"], [1, 2], "DEMAND")
+    assert out.tolist() == [[7.0, 0.0], [0.0, 0.0]]
+
+
+def test_records_round_trip_through_ids():
+    index = build_index(["IU_1", "IU_2"], ["GU_1", "GU_2"], [1, 2], LANES)
+    production = [{"node": "IU_1", "period": "2", "quantity": 10.5}]
+    shipments = [{"from": "IU_2", "to": "GU_1", "mode": "T2", "period": "1", "quantity": 3.0, "trips": 1}]
+    inventory = [{"node": "GU_1", "period": "1", "quantity": 0.25}]
+
+    solution = encode_records(index, production, shipments, inventory)
+    assert solution["shipments"]["from"].dtype == np.int32
+    assert decode_solution(solution) == {
+        "num_nodes": 4, "num_periods": 2,
+        "production": production, "shipments": shipments, "inventory": inventory,
+    }
@@ -0,0 +1,59 @@
+"""
+Tests for /optimize response format negotiation and encoders.
+"""
+import gzip
+
+import orjson
+import pyarrow as pa
+import pytest
+
+from backend.response_formats import negotiate_format, render, to_arrow_ipc, to_columnar
+
+
+RESPONSE = {
+    "status": "success",
+    "objective_value": 123.5,
+    "production": [{"node": "IU_001", "period": "1", "quantity": 500.0}] * 50,
+    "shipments": [
+        {"from": "IU_001", "to": "GU_001", "mode": "T1", "period": "1", "quantity": 100.0, "trips": 100},
+        {"from": "IU_001", "to": "GU_002", "mode": "T2", "period": "2", "quantity": 3000.0, "trips": 1},
+    ] * 50,
+    "inventory": [],
+}
+
+
+def test_negotiation_prefers_explicit_then_accept():
+    assert negotiate_format(None) == "json"
+    assert negotiate_format("text/html, application/vnd.apache.arrow.stream") == "arrow"
+    assert negotiate_format("application/json", explicit="columnar") == "columnar"
+    with pytest.raises(ValueError):
+        negotiate_format(explicit="xml")
+
+
+def test_columnar_dictionary_encodes_codes():
+    data = to_columnar(RESPONSE)
+    nodes = data["dictionary"]["nodes"]
+    assert sorted(nodes) == ["GU_001", "GU_002", "IU_001"]
+    shipments = data["shipments"]
+    assert shipments["length"] == 100
+    assert [nodes[i] for i in shipments["to"][:2]] == ["GU_001", "GU_002"]
+    assert shipments["trips"][:2] == [100, 1]
+    assert data["inventory"] == {"length": 0}
+    assert data["objective_value"] == 123.5
+
+
+def test_arrow_stream_carries_tables_and_scalars():
+    reader = pa.ipc.open_stream(to_arrow_ipc(RESPONSE))
+    table = reader.read_all()
+    assert table.num_rows == 150
+    assert orjson.loads(reader.schema.metadata[b"response"])["objective_value"] == 123.5
+
+
+def test_default_render_is_plain_json_and_compresses_when_asked():
+    plain = render(RESPONSE, {})
+    assert plain.media_type == "application/json"
+    assert orjson.loads(plain.body) == RESPONSE
+
+    packed = render(RESPONSE, {"accept-encoding": "gzip"})
+    assert packed.headers["content-encoding"] == "gzip"
+    assert orjson.loads(gzip.decompress(packed.body)) == RESPONSE
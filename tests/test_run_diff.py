@@ -0,0 +1,37 @@
+"""
+Tests for the run-to-run plan diff.
+"""
+from backend.run_diff import diff_runs
+from backend.solution_archive import write_run
+
+
+def ship(dst, mode, qty, trips):
+    return {"from": "IU_001", "to": dst, "mode": mode, "period": "1", "quantity": qty, "trips": trips}
+
+
+def test_diff_ranks_lane_changes_and_costs(tmp_path):
+    root = str(tmp_path)
+    write_run(root, 1, {
+        "shipments": [ship("GU_1", "T1", 100, 100), ship("GU_2", "T2", 6000, 2), ship("GU_3", "T1", 5, 5)],
+        "production": [{"node": "IU_001", "period": "1", "quantity": 6105}],
+    })
+    write_run(root, 2, {
+        "shipments": [ship("GU_1", "T1", 400, 400), ship("GU_3", "T1", 5, 5), ship("GU_4", "T2", 3000, 1)],
+        "production": [{"node": "IU_001", "period": "1", "quantity": 3405}],
+    })
+    run_a = {"id": 1, "objective_value": 1000.0,
+             "cost_breakdown": {"production": 800, "transport": 190, "inventory": 10}}
+    run_b = {"id": 2, "objective_value": 900.0,
+             "cost_breakdown": {"production": 600, "transport": 280, "inventory": 20}}
+
+    diff = diff_runs(root, run_a, run_b, top=2)
+    assert diff["cost_delta"] == {"production": -200, "transport": 90, "inventory": 10, "objective": -100}
+
+    shipments = diff["shipments"]
+    assert (shipments["changed"], shipments["added"], shipments["removed"]) == (3, 1, 1)
+    assert shipments["tons_moved"] == 300 + 6000 + 3000
+    assert [(r["to"], r["delta"]) for r in shipments["top"]] == [("GU_2", -6000), ("GU_4", 3000)]
+    assert shipments["top"][0]["trips_delta"] == -2
+
+    assert diff["production"]["net_delta"] == -2700
+    assert diff["inventory"]["changed"] == 0
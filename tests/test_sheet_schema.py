@@ -0,0 +1,57 @@
+"""
+Tests for the typed input sheet schema.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.sheet_schema import apply_schema
+
+
+def test_sheet_typed_and_codes_stripped():
+    df = pd.DataFrame({
+        "FROM IU CODE": [" IU_1", "IU_1 ", 101],
+        "TO IUGU CODE": ["GU_1", "GU_2", np.nan],
+        "TRANSPORT CODE": ["T1", "T1", "T2"],
+        "TIME PERIOD": [1.0, 2.0, 3.0],
+        "FREIGHT COST": ["12.5", 7, None],
+        "NOTES": ["a", "b", "c"],
+    })
+    apply_schema("LogisticsIUGU", df)
+
+    assert df["FROM IU CODE"].tolist() == ["IU_1", "IU_1", "101"]
+    assert df["FROM IU CODE"].cat.categories.tolist() == ["IU_1", "101"]
+    assert df["TO IUGU CODE"].tolist() == ["GU_1", "GU_2", "nan"]
+    assert df["TIME PERIOD"].dtype == np.int16
+    assert df["FREIGHT COST"].dtype == np.float32
+    assert df["FREIGHT COST"].isna().tolist() == [False, False, True]
+    assert df["NOTES"].dtype == object
+
+    # Typed sheets pass through unchanged
+    codes = df["FROM IU CODE"].array
+    assert apply_schema("LogisticsIUGU", df)["FROM IU CODE"].array is codes
+
+
+def test_bad_numbers_rejected_with_row():
+    df = pd.DataFrame({"IUGU CODE": ["GU_1", "GU_2"], "TIME PERIOD": [1, 1], "DEMAND": [10, "ten"]})
+    with pytest.raises(ValueError, match=r"ClinkerDemand: column 'DEMAND' must be numeric; row 3 has 'ten'"):
+        apply_schema("ClinkerDemand", df)
+
+
+@pytest.mark.parametrize("period", [1.5, None, 40_000, -1])
+def test_bad_periods_rejected(period):
+    df = pd.DataFrame({"IU CODE": ["IU_1", "IU_1"], "TIME PERIOD": [1, period], "CAPACITY": [5, 5]})
+    with pytest.raises(ValueError, match="'TIME PERIOD' must be a whole number"):
+        apply_schema("ClinkerCapacity", df)
+
+
+def test_lead_time_whole_periods_blank_allowed():
+    df = pd.DataFrame({"LEAD TIME": [1, None, 2.0]})
+    apply_schema("LogisticsIUGU", df)
+    assert df["LEAD TIME"].dtype == pd.Int16Dtype()
+    assert df["LEAD TIME"].isna().tolist() == [False, True, False]
+
+    with pytest.raises(ValueError, match=r"'LEAD TIME' must be a whole number from 0 to 32767; row 3 has 1.7"):
+        apply_schema("LogisticsIUGU", pd.DataFrame({"LEAD TIME": [1, 1.7]}))
+    with pytest.raises(ValueError, match="'LEAD TIME' must be a whole number"):
+        apply_schema("LogisticsIUGU", pd.DataFrame({"LEAD TIME": [-1]}))
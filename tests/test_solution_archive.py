@@ -0,0 +1,90 @@
+"""
+Tests for the per-run Parquet solution archive and its analytics.
+
+Each test writes a few small plans to its own tmp_path archive.
+"""
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from backend.solution_archive import flows, list_run_ids, query, scan, write_run
+
+
+def ship(src, dst, mode, period, qty):
+    return {"from": src, "to": dst, "mode": mode, "period": str(period), "quantity": qty, "trips": int(qty)}
+
+
+@pytest.fixture
+def archive(tmp_path):
+    root = str(tmp_path)
+    write_run(root, 1, {
+        "shipments": [ship("IU_009", "GU_1", "T1", 1, 10), ship("IU_009", "GU_2", "T2", 1, 3000)],
+        "production": [{"node": "IU_009", "period": "1", "quantity": 3010}],
+    })
+    write_run(root, 2, {
+        "shipments": [ship("IU_009", "GU_1", "T1", 1, 30), ship("IU_009", "GU_1", "T1", 2, 5),
+                      ship("IU_001", "GU_1", "T1", 2, 7)],
+    })
+    write_run(root, 3, {"shipments": [ship("IU_009", "GU_1", "T1", 1, 20)]})
+    return root
+
+
+def test_scan_reads_only_requested_columns(archive):
+    table = scan(archive, "shipments", ["to", "quantity"], filters={"from": "IU_009"}, run_ids=[2])
+    assert table.column_names == ["to", "quantity"]
+    assert sorted(table["quantity"].to_pylist()) == [5, 30]
+    assert list_run_ids(archive) == [3, 2, 1]
+
+
+def test_tonnage_per_period_over_last_runs(archive):
+    result = query(archive, "shipments", ["period", "run_id"],
+                   filters={"from": "IU_009", "mode": "T1"}, last_runs=2)
+    rows = {(r["period"], r["run_id"]): r["value"] for r in result["rows"]}
+    assert rows == {(1, 2): 30, (2, 2): 5, (1, 3): 20}
+    assert result["runs"] == [3, 2]
+
+
+def test_lanes_that_changed_most(archive):
+    result = query(archive, "shipments", ["from", "to", "mode"], agg="range", top=2)
+    top = [(r["to"], r["mode"], r["value"]) for r in result["rows"]]
+    # GU_2 shipped 3000 in run 1 and nothing since; GU_1 T1 from IU_009 went 10 → 35 → 20
+    assert top == [("GU_2", "T2", 3000), ("GU_1", "T1", 25)]
+
+
+def test_unknown_table_or_column_is_rejected(archive):
+    with pytest.raises(ValueError):
+        query(archive, "lanes", ["period"])
+    with pytest.raises(ValueError):
+        query(archive, "shipments", ["plant"])
+
+
+def test_flows_group_filter_and_top(archive):
+    result = flows(archive, 2, group_by=["from", "to"], top=1)
+    assert result["rows"] == [{"from": "IU_009", "to": "GU_1", "quantity": 35, "trips": 35, "lanes": 2}]
+    assert result["groups"] == 2
+    assert result["sources"] == ["IU_001", "IU_009"]
+    assert result["modes"] == ["T1"]
+
+    late = flows(archive, 2, group_by=["period"], filters={"from": ["IU_009"]}, period_from=2)
+    assert late["rows"] == [{"period": 2, "quantity": 5, "trips": 5, "lanes": 1}]
+    assert late["totals"] == {"quantity": 5, "trips": 5}
+    with pytest.raises(ValueError):
+        flows(archive, 2, group_by=["plant"])
+
+
+def test_periods_sort_numerically(tmp_path):
+    root = str(tmp_path)
+    write_run(root, 1, {"shipments": [ship("IU_009", "GU_1", "T1", t, t) for t in (2, 10, 1)]})
+    # A partition archived when periods were stored as strings
+    legacy = os.path.join(root, "shipments", "run_id=2")
+    os.makedirs(legacy)
+    pq.write_table(pa.table({
+        "from": ["IU_009"], "to": ["GU_1"], "mode": ["T1"], "period": ["11"],
+        "quantity": [1.0], "trips": pa.array([1], pa.int64()),
+    }), os.path.join(legacy, "part-0.parquet"))
+
+    result = query(root, "shipments", ["period"], filters={"period": ["1", "2", "10", "11"]})
+    assert [r["period"] for r in result["rows"]] == [1, 2, 10, 11]
+    assert [r["period"] for r in flows(root, 1, group_by=["period"])["rows"]] == [1, 2, 10]
@@ -0,0 +1,58 @@
+"""
+Tests for streaming CSV / NDJSON export of archived runs.
+"""
+import orjson
+
+from backend import solution_export
+from backend.solution_archive import write_run
+
+
+SOLUTION = {
+    "production": [{"node": "IU_001", "period": "1", "quantity": 6105.5}],
+    "shipments": [
+        {"from": "IU_001", "to": f"GU_{k:03d}", "mode": "T1", "period": "1", "quantity": 10.0, "trips": 10}
+        for k in range(20_000)
+    ],
+    "inventory": [],
+}
+
+
+def test_table_csv_streams_in_batches(tmp_path):
+    root = str(tmp_path)
+    write_run(root, 1, SOLUTION)
+
+    chunks = list(solution_export.iter_csv(root, "shipments", 1))
+    assert len(chunks) > 1
+    lines = b"".join(chunks).decode().splitlines()
+    assert lines[0] == '"from","to","mode","period","quantity","trips"'
+    assert lines[1] == '"IU_001","GU_000","T1",1,10,10'
+    assert len(lines) == 20_001
+
+    assert list(solution_export.iter_csv(root, "inventory", 1)) == [b'"node","period","quantity"\n']
+
+
+def test_run_exports_keep_every_table(tmp_path):
+    root = str(tmp_path)
+    write_run(root, 1, SOLUTION)
+    run = {"id": 1, "status": "success", "objective_value": 42.0, "summary": {}}
+
+    csv_text = b"".join(solution_export.iter_run_csv(root, run)).decode()
+    assert csv_text.startswith("=== OPTIMIZATION SUMMARY ===\nRun,1\n")
+    assert '=== PRODUCTION ===\n"node","period","quantity"\n"IU_001",1,6105.5\n' in csv_text
+    assert "=== INVENTORY ===" not in csv_text
+
+    records = [orjson.loads(line) for line in b"".join(solution_export.iter_run_ndjson(root, run)).splitlines()]
+    assert records[0]["table"] == "run"
+    assert sum(r["table"] == "shipments" for r in records) == 20_000
+
+
+def test_run_csv_quotes_summary_values(tmp_path):
+    import csv
+
+    root = str(tmp_path)
+    write_run(root, 1, SOLUTION)
+    run = {"id": 1, "filename": 'plan, "v2".xlsx', "status": "success", "summary": {}}
+
+    csv_text = b"".join(solution_export.iter_run_csv(root, run)).decode()
+    summary = csv_text.split("\n\n")[0].splitlines()[1:]
+    assert dict(csv.reader(summary))["Filename"] == 'plan, "v2".xlsx'
@@ -0,0 +1,75 @@
+"""
+Tests for isolated solve worker processes.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from backend import config, solve_worker
+from backend.default_dataset import cache
+from backend.model import solve_clinker_model
+
+DATASET = os.path.join(config.DATA_DIR, "dataset.xlsx")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """One worker, fresh pool per test"""
+    monkeypatch.setattr(config, "SOLVE_WORKERS", 1)
+    solve_worker.shutdown()
+    yield
+    solve_worker.shutdown()
+
+
+def test_worker_solve_matches_in_process(pool):
+    sheets = cache.get(DATASET)["clean"]
+    local = solve_clinker_model(sheets)
+    remote = solve_worker.solve(sheets)
+    assert "model" not in remote
+    assert remote["objective_value"] == pytest.approx(local["objective_value"])
+    # The solution crosses back as id arrays, not records
+    total = lambda r: r["solution"]["shipments"]["quantity"].sum()
+    assert total(remote) == pytest.approx(total(local))
+    assert remote["worker_rss_mb"] > 0
+
+
+def test_worker_recycled_or_capped(pool, monkeypatch):
+    sheets = cache.get(DATASET)["clean"]
+    recycled = solve_worker.stats["recycled"]
+    monkeypatch.setattr(config, "SOLVE_RECYCLE_RSS_MB", 1)
+    assert solve_worker.solve(sheets)["success"]
+    assert solve_worker.stats["recycled"] == recycled + 1
+
+    # A worker capped below what a solve needs fails the solve, not the API
+    monkeypatch.setattr(config, "SOLVE_MEMORY_LIMIT_MB", 64)
+    assert not solve_worker.solve(sheets)["success"]
+    monkeypatch.setattr(config, "SOLVE_MEMORY_LIMIT_MB", 8192)
+    assert solve_worker.solve(sheets)["success"]
+
+
+def test_pool_retired_after_max_tasks_without_per_child_recycling(pool, monkeypatch):
+    """Python 3.10 has no max_tasks_per_child: the whole pool is replaced instead"""
+    monkeypatch.setattr(solve_worker, "PER_CHILD_RECYCLING", False)
+    monkeypatch.setattr(config, "SOLVE_MAX_TASKS_PER_CHILD", 2)
+    monkeypatch.setattr(config, "SOLVE_RECYCLE_RSS_MB", 0)
+    sheets = cache.get(DATASET)["clean"]
+    recycled = solve_worker.stats["recycled"]
+    assert solve_worker.solve(sheets)["success"]
+    assert solve_worker.stats["recycled"] == recycled
+    assert solve_worker.solve(sheets)["success"]
+    assert solve_worker.stats["recycled"] == recycled + 1
+
+
+def test_api_imports_without_resource_module():
+    """Windows has no resource module; importing the API must not need it"""
+    code = "import sys; sys.modules['resource'] = None; import backend.main"
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=ROOT)
+
+
+def test_memory_helpers_off_linux(monkeypatch):
+    monkeypatch.setattr(solve_worker, "LINUX", False)
+    assert solve_worker._rss_mb() == 0.0
+    solve_worker._limit_memory(64)  # no cap, no error
@@ -0,0 +1,57 @@
+"""
+Cold-start checks: the API imports and answers /health without pandas
+or Pyomo, and the warm-up loads them.
+
+Imports are timed in a fresh interpreter (this one already has
+everything loaded); run with -s to see the numbers.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from backend import config, warmup
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+DATASET = os.path.join(config.DATA_DIR, "dataset.xlsx")
+
+# Generous: the import takes well under a second here, slow CI boxes vary
+IMPORT_BUDGET_SECONDS = 5.0
+HEAVY_MODULES = ("pandas", "pyomo.environ", "backend.model")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import backend.main
+imported = time.perf_counter() - start
+from fastapi.testclient import TestClient
+client = TestClient(backend.main.app)
+start = time.perf_counter()
+status = client.get("/health").status_code
+health = time.perf_counter() - start
+print(json.dumps({
+    "import_seconds": imported, "health_seconds": health, "status": status,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def test_api_starts_without_solver_stack():
+    """Importing the API and answering /health loads neither pandas nor Pyomo"""
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE], cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    probe = json.loads(out.stdout.strip().splitlines()[-1])
+    print(f"\nimport backend.main: {probe['import_seconds']:.3f}s, /health: {probe['health_seconds'] * 1000:.1f}ms")
+    assert probe["status"] == 200
+    assert probe["loaded"] == []
+    assert probe["import_seconds"] < IMPORT_BUDGET_SECONDS
+
+
+def test_warm_up_loads_imports_workbook_and_solver():
+    state = warmup.warm_up(DATASET)
+    print(f"\nwarm-up: import {state['import_seconds']}s, preload {state['preload_seconds']}s, "
+          f"solve {state['solve_seconds']}s")
+    assert state["error"] is None
+    assert state["solve_seconds"] is not None and state["finished"] is not None
+    assert "backend.model" in sys.modules
@@ -0,0 +1,86 @@
+"""
+Tests for the content-addressed upload store.
+"""
+import io
+import os
+import zipfile
+
+import pytest
+
+from backend.upload_store import UploadRejected, evict, path_for, store
+
+
+def workbook(payload: bytes = b"") -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("[Content_Types].xml", "<Types/>")
+        archive.writestr("xl/workbook.xml", "<workbook/>")
+        archive.writestr("xl/worksheets/sheet1.xml", payload)
+    return buffer.getvalue()
+
+
+def test_identical_uploads_are_stored_once(tmp_path):
+    data = workbook(b"<sheet/>")
+    sha, path = store(io.BytesIO(data), str(tmp_path), ".xlsx", max_bytes=10_000, max_uncompressed=10_000)
+    sha_again, path_again = store(io.BytesIO(data), str(tmp_path), ".XLSX", max_bytes=10_000)
+    assert (sha, path) == (sha_again, path_again)
+    assert os.path.basename(path) == sha + ".xlsx"
+    assert os.listdir(tmp_path) == [sha + ".xlsx"]
+    assert path_for(str(tmp_path), sha) == path
+    assert path_for(str(tmp_path), "../etc/passwd") is None
+
+
+@pytest.mark.parametrize("data, limits, status", [
+    (b"col1,col2\n1,2", {}, 400),                                            # not a zip
+    (workbook()[:-30], {}, 400),                                              # truncated directory
+    (workbook(b"x" * 5_000), {"max_bytes": 1_000}, 413),                      # too large
+    (workbook(b"\0" * 50_000), {"max_uncompressed": 10_000}, 413),            # unpacks too large
+])
+def test_bad_uploads_are_rejected_and_not_kept(tmp_path, data, limits, status):
+    kwargs = {"max_bytes": 100_000, "max_uncompressed": 100_000, **limits}
+    with pytest.raises(UploadRejected) as err:
+        store(io.BytesIO(data), str(tmp_path), ".xlsx", **kwargs)
+    assert err.value.status_code == status
+    assert os.listdir(tmp_path) == []
+
+
+def test_least_recently_used_uploads_are_evicted(tmp_path):
+    root = str(tmp_path)
+    shas = []
+    for k in range(3):
+        sha, path = store(io.BytesIO(workbook(b"%d" % k * 2_000)), root, ".xlsx", max_bytes=100_000)
+        os.utime(path, (k, k))
+        shas.append(sha)
+    size = os.path.getsize(path)
+    # Using the oldest upload makes the second one least recently used
+    os.utime(path_for(root, shas[0]), (10, 10))
+    removed = evict(root, budget_bytes=2 * size + 100)
+    assert [os.path.basename(p) for p in removed] == [shas[1] + ".xlsx"]
+
+
+def test_pinned_uploads_are_not_evicted(tmp_path):
+    root = str(tmp_path)
+    shas = []
+    for k in range(3):
+        sha, path = store(io.BytesIO(workbook(b"%d" % k * 2_000)), root, ".xlsx", max_bytes=100_000)
+        os.utime(path, (k, k))
+        shas.append(sha)
+    size = os.path.getsize(path)
+    # The oldest upload is still needed by a queued job: the next oldest goes
+    removed = evict(root, budget_bytes=2 * size + 100, pinned=lambda: {shas[0]})
+    assert [os.path.basename(p) for p in removed] == [shas[1] + ".xlsx"]
+
+
+def test_only_stored_uploads_are_evicted(tmp_path):
+    root = str(tmp_path)
+    other = tmp_path / "Dataset_Dummy_Clinker_3MPlan.xlsx"
+    other.write_bytes(workbook(b"x" * 2_000))
+    os.utime(other, (0, 0))
+    sha, path = store(io.BytesIO(workbook(b"y" * 2_000)), root, ".xlsx", max_bytes=100_000)
+    os.utime(path, (1, 1))
+    _, newest = store(io.BytesIO(workbook(b"z" * 2_000)), root, ".xlsx", max_bytes=100_000)
+
+    # The hand-placed workbook is oldest but not the store's to delete
+    removed = evict(root, budget_bytes=os.path.getsize(newest) + 100, keep=newest)
+    assert removed == [path]
+    assert other.exists()